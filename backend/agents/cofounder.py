@@ -10,6 +10,7 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from llm import get_agent_llm
 from state import AgentState
+from context import build_context_messages
 
 
 # System prompt for the Cofounder Agent
@@ -26,7 +27,7 @@ Your role:
 Always respond in Korean unless the user asks otherwise."""
 
 
-def cofounder_node(state: AgentState) -> Dict[str, Any]:
+async def cofounder_node(state: AgentState) -> Dict[str, Any]:
     """
     Process message through the Cofounder Agent
     
@@ -36,26 +37,20 @@ def cofounder_node(state: AgentState) -> Dict[str, Any]:
     Returns:
         Updated state with agent response
     """
-    llm = get_agent_llm()
+    # Paraphrased first-turn questions are answered from the semantic cache when opted in
+    llm = get_agent_llm(agent="cofounder")
     
     # Get the last user message
     messages = state.get("messages", [])
     if not messages:
         return {"next": "FINISH"}
     
-    # Format messages with system prompt
-    formatted_messages = [SystemMessage(content=COFOUNDER_SYSTEM_PROMPT)]
-    
-    # Add conversation history
-    for msg in messages:
-        if isinstance(msg, HumanMessage):
-            formatted_messages.append(HumanMessage(content=msg.content))
-        elif isinstance(msg, AIMessage):
-            formatted_messages.append(AIMessage(content=msg.content))
+    # Format messages with system prompt and a token-budgeted history window
+    formatted_messages = build_context_messages("cofounder", COFOUNDER_SYSTEM_PROMPT, messages, state.get("summary", ""), state.get("summary_upto", 0))
     
     # Invoke LLM
     try:
-        response = llm.invoke(formatted_messages)
+        response = await llm.ainvoke(formatted_messages)
         
         # Add response to messages and finish (supervisor will handle next user message)
         return {
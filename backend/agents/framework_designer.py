@@ -9,8 +9,9 @@ import os
 import json
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from llm import get_agent_llm
+from llm import get_agent_llm, get_agent_structured_llm
 from state import AgentState
+from context import build_context_messages
 from models import LeanCanvasData, BusinessModelCanvasData
 
 
@@ -32,7 +33,7 @@ When creating a canvas:
 CRITICAL: All canvas field values MUST be written in Korean (한국어). Do not use English for the actual content values. Only use Korean text for all fields."""
 
 
-def framework_designer_node(state: AgentState) -> Dict[str, Any]:
+async def framework_designer_node(state: AgentState) -> Dict[str, Any]:
     """
     Process message through the Framework Designer Agent
     
@@ -42,7 +43,8 @@ def framework_designer_node(state: AgentState) -> Dict[str, Any]:
     Returns:
         Updated state with structured canvas data
     """
-    llm = get_agent_llm()
+    # Same idea + history -> same canvas: calls go through the response cache when opted in
+    llm = get_agent_llm(agent="framework_designer")
     
     # Get the last user message
     messages = state.get("messages", [])
@@ -58,15 +60,9 @@ def framework_designer_node(state: AgentState) -> Dict[str, Any]:
     is_lean_canvas = any(keyword in user_message_lower for keyword in ["lean canvas", "린 캔버스", "린캔버스"])
     is_bmc = any(keyword in user_message_lower for keyword in ["business model canvas", "bmc", "비즈니스 모델 캔버스", "비즈니스모델캔버스"])
     
-    # Format messages with system prompt
-    formatted_messages = [SystemMessage(content=FRAMEWORK_DESIGNER_SYSTEM_PROMPT)]
-    
-    # Add conversation history
-    for msg in messages[:-1]:  # Exclude the last message as we'll add it separately
-        if isinstance(msg, HumanMessage):
-            formatted_messages.append(HumanMessage(content=msg.content))
-        elif isinstance(msg, AIMessage):
-            formatted_messages.append(AIMessage(content=msg.content))
+    # Format messages with system prompt and a token-budgeted history window
+    # (the last message is added separately below)
+    formatted_messages = build_context_messages("framework_designer", FRAMEWORK_DESIGNER_SYSTEM_PROMPT, messages[:-1], state.get("summary", ""), state.get("summary_upto", 0))
     
     # Add the current user message with specific instruction
     if is_lean_canvas:
@@ -91,8 +87,8 @@ Lean Canvas의 9개 블록을 모두 채워주세요. **모든 내용은 반드
         
         try:
             # Use structured output for Lean Canvas
-            structured_llm = llm.with_structured_output(LeanCanvasData)
-            canvas_data = structured_llm.invoke(formatted_messages)
+            structured_llm = get_agent_structured_llm(LeanCanvasData, agent="framework_designer")
+            canvas_data = await structured_llm.ainvoke(formatted_messages)
             
             # Convert to JSON string for transmission
             canvas_json = {
@@ -148,8 +144,8 @@ Business Model Canvas의 9개 블록을 모두 채워주세요. **모든 내용
         
         try:
             # Use structured output for Business Model Canvas
-            structured_llm = llm.with_structured_output(BusinessModelCanvasData)
-            canvas_data = structured_llm.invoke(formatted_messages)
+            structured_llm = get_agent_structured_llm(BusinessModelCanvasData, agent="framework_designer")
+            canvas_data = await structured_llm.ainvoke(formatted_messages)
             
             # Convert to JSON string for transmission
             canvas_json = {
@@ -186,7 +182,7 @@ Business Model Canvas의 9개 블록을 모두 채워주세요. **모든 내용
     else:
         # Default: ask which canvas they want
         try:
-            response = llm.invoke(formatted_messages + [
+            response = await llm.ainvoke(formatted_messages + [
                 HumanMessage(content=f"{user_message}\n\n어떤 비즈니스 프레임워크를 작성하시겠습니까? 'Lean Canvas' 또는 'Business Model Canvas'를 선택해주세요.")
             ])
             
@@ -2,20 +2,27 @@
 Grant Hunter Agent - Finds government grants and funding opportunities
 """
 
+import asyncio
 from typing import Dict, Any
-from langchain_core.messages import HumanMessage, AIMessage, SystemMessage, ToolMessage
+from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
 from langchain_core.tools import tool
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from llm import get_agent_llm
 from state import AgentState
+from context import build_context_messages
 from tools import get_search_tool_instance
+from executor import AgentExecutor, search_handler
+from grant_index import grant_index, format_notices, GRANT_INDEX_ENABLED
+from grant_matcher import grant_matcher, extract_profile, format_matches
 
 
+# Search instruction (swapped out when local data answers the question)
+GRANT_HUNTER_SEARCH_INSTRUCTION = """IMPORTANT: You MUST use the search tool to find current grant information. Do not rely on general knowledge alone."""
+
 # System prompt for the Grant Hunter Agent
-GRANT_HUNTER_SYSTEM_PROMPT = """You are an expert in Korean Government Grants and K-Startup programs. 
+GRANT_HUNTER_SYSTEM_PROMPT = f"""You are an expert in Korean Government Grants and K-Startup programs. 
 You help startup founders find and apply for government funding opportunities.
 
 Your role:
@@ -25,12 +32,36 @@ Your role:
 - Provide actionable guidance on application processes
 - Focus on Korean government programs (K-Startup, 중소벤처기업부, 과학기술정보통신부 등)
 
-IMPORTANT: You MUST use the search tool to find current grant information. Do not rely on general knowledge alone.
+{GRANT_HUNTER_SEARCH_INSTRUCTION}
 
 Always respond in Korean unless the user asks otherwise."""
 
+# Appended when the local catalog answers the question (no web search)
+CATALOG_ANSWER_INSTRUCTION = """The notices below come from the up-to-date local grant catalog.
+Answer from them; do not invent programs that are not listed.
+For eligibility matches, explain the fit using the listed reasons and point out what the founder still needs to confirm.
+
+[Local grant catalog]
+{notices}"""
+
+# Appended when the catalog has partial or stale matches (web search still runs)
+CATALOG_HINT_INSTRUCTION = """Possibly outdated notices from the local grant catalog (verify with the search tool):
+{notices}"""
+
 
-def grant_hunter_node(state: AgentState) -> Dict[str, Any]:
+def format_catalog(notices, matches) -> str:
+    """Eligibility matches first, then other full-text hits"""
+    sections = []
+    if matches:
+        sections.append(f"[Eligibility matches for this founder]\n{format_matches(matches)}")
+    matched_ids = {match["notice"]["id"] for match in matches}
+    others = [notice for notice in notices if notice["id"] not in matched_ids]
+    if others:
+        sections.append(f"[Related notices]\n{format_notices(others)}")
+    return "\n\n".join(sections)
+
+
+async def grant_hunter_node(state: AgentState) -> Dict[str, Any]:
     """
     Process message through the Grant Hunter Agent with web search capability
     
@@ -40,93 +71,58 @@ def grant_hunter_node(state: AgentState) -> Dict[str, Any]:
     Returns:
         Updated state with agent response
     """
-    llm = get_agent_llm()
-    
     # Get search tool (may be None if API key not set)
     search_tool = get_search_tool_instance()
     
-    # Bind the search tool to the LLM if available
-    if search_tool:
-        llm_with_tools = llm.bind_tools([search_tool])
-    else:
-        llm_with_tools = llm
-    
     # Get the last user message
     messages = state.get("messages", [])
     if not messages:
         return {"next": "FINISH"}
     
-    # Format messages with system prompt
-    formatted_messages = [SystemMessage(content=GRANT_HUNTER_SYSTEM_PROMPT)]
+    # Look up the local catalog first; search the web unless it answered from fresh data
+    user_message = next((msg.content for msg in reversed(messages) if isinstance(msg, HumanMessage)), "")
+    founder_text = "\n".join(msg.content for msg in messages if isinstance(msg, HumanMessage) and isinstance(msg.content, str))
+    notices, matches, fresh = [], [], False
+    if GRANT_INDEX_ENABLED:
+        try:
+            notices, fresh = await asyncio.to_thread(grant_index.lookup, user_message)
+            # Deterministic eligibility filtering; the LLM only writes up the top hits
+            matches = await asyncio.to_thread(grant_matcher.match, extract_profile(founder_text))
+        except Exception as e:
+            print(f"Grant index lookup failed: {e}")
     
-    # Add conversation history
-    for msg in messages:
-        if isinstance(msg, HumanMessage):
-            formatted_messages.append(HumanMessage(content=msg.content))
-        elif isinstance(msg, AIMessage):
-            formatted_messages.append(AIMessage(content=msg.content))
-        elif isinstance(msg, ToolMessage):
-            formatted_messages.append(msg)
+    catalog = format_catalog(notices, matches)
+    system_prompt = GRANT_HUNTER_SYSTEM_PROMPT
+    # Eligibility matches alone do not answer the question; search stays on
+    # unless a fresh catalog had full-text hits for it
+    if notices and fresh:
+        system_prompt = system_prompt.replace(
+            GRANT_HUNTER_SEARCH_INSTRUCTION,
+            CATALOG_ANSWER_INSTRUCTION.format(notices=catalog)
+        )
+        search_tool = None
+    elif catalog:
+        system_prompt = f"{system_prompt}\n\n{CATALOG_HINT_INSTRUCTION.format(notices=catalog)}"
+    
+    # Format messages with system prompt and a token-budgeted history window
+    formatted_messages = build_context_messages("grant_hunter", system_prompt, messages, state.get("summary", ""), state.get("summary_upto", 0), include_tool_messages=True)
+    
+    # Searches go through the shared cache and pooled client
+    executor = AgentExecutor(
+        "grant_hunter",
+        tools=[search_tool],
+        handlers={search_tool.name: search_handler(search_tool, "grants")} if search_tool else None
+    )
     
     try:
-        # First invocation - LLM may decide to use the tool
-        response = llm_with_tools.invoke(formatted_messages)
+        # Let the LLM search (possibly over several rounds) and answer
+        content, _ = await executor.run(formatted_messages)
         
-        # Check if the LLM wants to use a tool
-        # Gemini uses response.tool_calls or response.additional_kwargs.get("tool_calls")
-        tool_calls = getattr(response, 'tool_calls', []) or response.additional_kwargs.get("tool_calls", [])
-        
-        if tool_calls:
-            # Execute tool calls
-            tool_messages = []
-            for tool_call in tool_calls:
-                # Handle different tool call formats
-                if isinstance(tool_call, dict):
-                    tool_name = tool_call.get("name") or tool_call.get("function", {}).get("name")
-                    tool_args = tool_call.get("args") or tool_call.get("function", {}).get("arguments", {})
-                    tool_id = tool_call.get("id") or tool_call.get("function", {}).get("name")
-                else:
-                    tool_name = getattr(tool_call, "name", None)
-                    tool_args = getattr(tool_call, "args", {})
-                    tool_id = getattr(tool_call, "id", None)
-                
-                # Parse tool_args if it's a string
-                if isinstance(tool_args, str):
-                    import json
-                    try:
-                        tool_args = json.loads(tool_args)
-                    except:
-                        tool_args = {"query": tool_args}
-                
-                if tool_name == "tavily_search_results_json" or "tavily" in str(tool_name).lower():
-                    # Execute search
-                    search_result = search_tool.invoke(tool_args)
-                    tool_messages.append(
-                        ToolMessage(
-                            content=str(search_result),
-                            tool_call_id=tool_id or "search"
-                        )
-                    )
-            
-            # Add tool messages and get final response
-            formatted_messages.append(response)
-            formatted_messages.extend(tool_messages)
-            
-            # Get final response from LLM with tool results
-            final_response = llm.invoke(formatted_messages)
-            
-            return {
-                "messages": [AIMessage(content=final_response.content)],
-                "next": "FINISH",
-                "last_agent": "grant_hunter"
-            }
-        else:
-            # No tool calls, return direct response
-            return {
-                "messages": [AIMessage(content=response.content)],
-                "next": "FINISH",
-                "last_agent": "grant_hunter"
-            }
+        return {
+            "messages": [AIMessage(content=content)],
+            "next": "FINISH",
+            "last_agent": "grant_hunter"
+        }
     
     except Exception as e:
         error_message = f"[Grant Hunter Agent Error] {str(e)}"
@@ -10,6 +10,7 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from llm import get_agent_llm
 from state import AgentState
+from context import build_context_messages
 
 
 # System prompt for the Legal Advisor Agent
@@ -33,7 +34,7 @@ Key principles:
 Always respond in Korean unless the user asks otherwise."""
 
 
-def legal_advisor_node(state: AgentState) -> Dict[str, Any]:
+async def legal_advisor_node(state: AgentState) -> Dict[str, Any]:
     """
     Process message through the Legal Advisor Agent
     
@@ -43,26 +44,19 @@ def legal_advisor_node(state: AgentState) -> Dict[str, Any]:
     Returns:
         Updated state with agent response
     """
-    llm = get_agent_llm()
+    llm = get_agent_llm(agent="legal_advisor")
     
     # Get the last user message
     messages = state.get("messages", [])
     if not messages:
         return {"next": "FINISH", "last_agent": "legal_advisor"}
     
-    # Format messages with system prompt
-    formatted_messages = [SystemMessage(content=LEGAL_ADVISOR_SYSTEM_PROMPT)]
-    
-    # Add conversation history
-    for msg in messages:
-        if isinstance(msg, HumanMessage):
-            formatted_messages.append(HumanMessage(content=msg.content))
-        elif isinstance(msg, AIMessage):
-            formatted_messages.append(AIMessage(content=msg.content))
+    # Format messages with system prompt and a token-budgeted history window
+    formatted_messages = build_context_messages("legal_advisor", LEGAL_ADVISOR_SYSTEM_PROMPT, messages, state.get("summary", ""), state.get("summary_upto", 0))
     
     # Invoke LLM
     try:
-        response = llm.invoke(formatted_messages)
+        response = await llm.ainvoke(formatted_messages)
         
         # Ensure disclaimer is included
         response_content = response.content
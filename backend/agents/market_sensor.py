@@ -2,19 +2,28 @@
 Market Sensor Agent - Analyzes competitors and market trends
 """
 
+import asyncio
 from typing import Dict, Any
-from langchain_core.messages import HumanMessage, AIMessage, SystemMessage, ToolMessage
+from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from llm import get_agent_llm
 from state import AgentState
+from context import build_context_messages
 from tools import get_search_tool_instance
+from executor import AgentExecutor, search_handler
+from watchlist import find_watched_competitors, load_competitor_snapshots, format_snapshots, watchlist_store, WATCHLIST_ENABLED
+from sentiment import analyze_reviews, format_sentiment, is_sentiment_question
+from trends import trend_tracker, format_trend_table, is_trend_question, TRENDS_ENABLED, TREND_RECENT_DAYS, TREND_BASELINE_DAYS
 
 
+# Search instruction (swapped out when local data answers the question)
+MARKET_SENSOR_SEARCH_INSTRUCTION = """IMPORTANT: You MUST use the search tool to find current market information, competitor data, and recent news. 
+Do not rely on general knowledge alone - always search for the latest information."""
+
 # System prompt for the Market Sensor Agent
-MARKET_SENSOR_SYSTEM_PROMPT = """You are a Market Intelligence Analyst specializing in competitive analysis and market trends.
+MARKET_SENSOR_SYSTEM_PROMPT = f"""You are a Market Intelligence Analyst specializing in competitive analysis and market trends.
 
 Your role:
 - Search for and analyze competitors in the user's market
@@ -23,13 +32,57 @@ Your role:
 - Provide competitive intelligence and strategic insights
 - Analyze market sentiment and emerging trends
 
-IMPORTANT: You MUST use the search tool to find current market information, competitor data, and recent news. 
-Do not rely on general knowledge alone - always search for the latest information.
+{MARKET_SENSOR_SEARCH_INSTRUCTION}
 
 Always respond in Korean unless the user asks otherwise."""
 
+# Used instead of the search instruction when every relevant competitor has fresh snapshots
+SNAPSHOT_ANSWER_INSTRUCTION = """The competitor snapshots below are kept up to date by the founder's watchlist.
+Answer from them and cite the collection time; do not invent facts that are not in the snapshots.
+
+[Competitor watchlist snapshots]
+{snapshots}"""
+
+# Appended when snapshots are partial or stale (web search still runs)
+SNAPSHOT_HINT_INSTRUCTION = """Older competitor snapshots from the founder's watchlist (refresh them with the search tool):
+{snapshots}"""
 
-def market_sensor_node(state: AgentState) -> Dict[str, Any]:
+# Appended for trend questions when the local time series shows rising terms
+TREND_INSTRUCTION = """Rising topics precomputed from every search and watchlist snapshot collected so far
+(recent {recent_days} days vs. the {baseline_days} days before). Base trend statements on this table
+and use search results only to explain the rising topics:
+{table}"""
+
+
+def format_watchlist_context(snapshots, user_message: str) -> str:
+    """
+    Snapshot block for the prompt
+
+    For review/sentiment questions the raw reviews are replaced by local
+    sentiment aggregates and the most polar excerpts.
+    """
+    if not is_sentiment_question(user_message):
+        return format_snapshots(snapshots)
+    reviews = {
+        competitor: [item["content"] for item in by_kind.get("reviews", {}).get("results", [])]
+        for competitor, by_kind in snapshots.items()
+    }
+    sentiment = analyze_reviews(reviews)
+    block = format_snapshots(snapshots, kinds=["news", "pricing"])
+    if sentiment:
+        block = f"{block}\n\n[Review sentiment (local analysis)]\n{format_sentiment(sentiment)}"
+    return block
+
+
+def load_trend_table(founder_id: str, limit: int = 10) -> str:
+    """Rising-topic table over the general market and the founder's watched competitors"""
+    topics = ["market"]
+    if WATCHLIST_ENABLED and founder_id:
+        topics += [entry["competitor_key"] for entry in watchlist_store.list(founder_id)]
+    return format_trend_table(trend_tracker.rising_terms(topics, limit=limit))
+
+
+async def market_sensor_node(state: AgentState) -> Dict[str, Any]:
     """
     Process message through the Market Sensor Agent with web search capability
     
@@ -39,93 +92,64 @@ def market_sensor_node(state: AgentState) -> Dict[str, Any]:
     Returns:
         Updated state with agent response
     """
-    llm = get_agent_llm()
-    
     # Get search tool (may be None if API key not set)
     search_tool = get_search_tool_instance()
     
-    # Bind the search tool to the LLM if available
-    if search_tool:
-        llm_with_tools = llm.bind_tools([search_tool])
-    else:
-        llm_with_tools = llm
-    
     # Get the last user message
     messages = state.get("messages", [])
     if not messages:
         return {"next": "FINISH"}
     
-    # Format messages with system prompt
-    formatted_messages = [SystemMessage(content=MARKET_SENSOR_SYSTEM_PROMPT)]
+    # Read warm watchlist snapshots first; search live only when they are missing or stale
+    system_prompt = MARKET_SENSOR_SYSTEM_PROMPT
+    founder_id = state.get("founder_id")
+    user_message = next((msg.content for msg in reversed(messages) if isinstance(msg, HumanMessage)), "")
+    if WATCHLIST_ENABLED and founder_id:
+        try:
+            entries = await asyncio.to_thread(find_watched_competitors, founder_id, user_message)
+            snapshots, fresh = await asyncio.to_thread(load_competitor_snapshots, entries)
+        except Exception as e:
+            print(f"Watchlist lookup failed: {e}")
+            snapshots, fresh = {}, False
+        if snapshots and fresh:
+            system_prompt = system_prompt.replace(
+                MARKET_SENSOR_SEARCH_INSTRUCTION,
+                SNAPSHOT_ANSWER_INSTRUCTION.format(snapshots=format_watchlist_context(snapshots, user_message))
+            )
+            search_tool = None
+        elif any(snapshots.values()):
+            system_prompt = f"{system_prompt}\n\n{SNAPSHOT_HINT_INSTRUCTION.format(snapshots=format_watchlist_context(snapshots, user_message))}"
+    
+    # Trend questions get the precomputed rising-topic table
+    if TRENDS_ENABLED and is_trend_question(user_message):
+        try:
+            table = await asyncio.to_thread(load_trend_table, founder_id)
+        except Exception as e:
+            print(f"Trend lookup failed: {e}")
+            table = ""
+        if table:
+            trend_block = TREND_INSTRUCTION.format(recent_days=TREND_RECENT_DAYS, baseline_days=TREND_BASELINE_DAYS, table=table)
+            system_prompt = f"{system_prompt}\n\n{trend_block}"
+    
+    # Format messages with system prompt and a token-budgeted history window
+    formatted_messages = build_context_messages("market_sensor", system_prompt, messages, state.get("summary", ""), state.get("summary_upto", 0), include_tool_messages=True)
     
-    # Add conversation history
-    for msg in messages:
-        if isinstance(msg, HumanMessage):
-            formatted_messages.append(HumanMessage(content=msg.content))
-        elif isinstance(msg, AIMessage):
-            formatted_messages.append(AIMessage(content=msg.content))
-        elif isinstance(msg, ToolMessage):
-            formatted_messages.append(msg)
+    # Searches go through the shared cache and pooled client
+    executor = AgentExecutor(
+        "market_sensor",
+        tools=[search_tool],
+        handlers={search_tool.name: search_handler(search_tool, "market")} if search_tool else None
+    )
     
     try:
-        # First invocation - LLM may decide to use the tool
-        response = llm_with_tools.invoke(formatted_messages)
+        # Let the LLM search (possibly over several rounds) and answer
+        content, _ = await executor.run(formatted_messages)
         
-        # Check if the LLM wants to use a tool
-        # Gemini uses response.tool_calls or response.additional_kwargs.get("tool_calls")
-        tool_calls = getattr(response, 'tool_calls', []) or response.additional_kwargs.get("tool_calls", [])
-        
-        if tool_calls:
-            # Execute tool calls
-            tool_messages = []
-            for tool_call in tool_calls:
-                # Handle different tool call formats
-                if isinstance(tool_call, dict):
-                    tool_name = tool_call.get("name") or tool_call.get("function", {}).get("name")
-                    tool_args = tool_call.get("args") or tool_call.get("function", {}).get("arguments", {})
-                    tool_id = tool_call.get("id") or tool_call.get("function", {}).get("name")
-                else:
-                    tool_name = getattr(tool_call, "name", None)
-                    tool_args = getattr(tool_call, "args", {})
-                    tool_id = getattr(tool_call, "id", None)
-                
-                # Parse tool_args if it's a string
-                if isinstance(tool_args, str):
-                    import json
-                    try:
-                        tool_args = json.loads(tool_args)
-                    except:
-                        tool_args = {"query": tool_args}
-                
-                if tool_name == "tavily_search_results_json" or "tavily" in str(tool_name).lower():
-                    # Execute search
-                    search_result = search_tool.invoke(tool_args)
-                    tool_messages.append(
-                        ToolMessage(
-                            content=str(search_result),
-                            tool_call_id=tool_id or "search"
-                        )
-                    )
-            
-            # Add tool messages and get final response
-            formatted_messages.append(response)
-            formatted_messages.extend(tool_messages)
-            
-            # Get final response from LLM with tool results
-            final_response = llm.invoke(formatted_messages)
-            
-            return {
-                "messages": [AIMessage(content=final_response.content)],
-                "next": "FINISH",
-                "last_agent": "market_sensor"
-            }
-        else:
-            # No tool calls, return direct response
-            return {
-                "messages": [AIMessage(content=response.content)],
-                "next": "FINISH",
-                "last_agent": "market_sensor"
-            }
+        return {
+            "messages": [AIMessage(content=content)],
+            "next": "FINISH",
+            "last_agent": "market_sensor"
+        }
     
     except Exception as e:
         error_message = f"[Market Sensor Agent Error] {str(e)}"
@@ -10,6 +10,7 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from llm import get_agent_llm
 from state import AgentState
+from context import build_context_messages
 
 
 # System prompt for the MVP Builder Agent
@@ -51,7 +52,7 @@ When asked to build something:
 Always respond in Korean for explanations, but code should be in the appropriate language."""
 
 
-def mvp_builder_node(state: AgentState) -> Dict[str, Any]:
+async def mvp_builder_node(state: AgentState) -> Dict[str, Any]:
     """
     Process message through the MVP Builder Agent
     
@@ -61,26 +62,19 @@ def mvp_builder_node(state: AgentState) -> Dict[str, Any]:
     Returns:
         Updated state with agent response
     """
-    llm = get_agent_llm()
+    llm = get_agent_llm(agent="mvp_builder")
     
     # Get the last user message
     messages = state.get("messages", [])
     if not messages:
         return {"next": "FINISH"}
     
-    # Format messages with system prompt
-    formatted_messages = [SystemMessage(content=MVP_BUILDER_SYSTEM_PROMPT)]
-    
-    # Add conversation history
-    for msg in messages:
-        if isinstance(msg, HumanMessage):
-            formatted_messages.append(HumanMessage(content=msg.content))
-        elif isinstance(msg, AIMessage):
-            formatted_messages.append(AIMessage(content=msg.content))
+    # Format messages with system prompt and a token-budgeted history window
+    formatted_messages = build_context_messages("mvp_builder", MVP_BUILDER_SYSTEM_PROMPT, messages, state.get("summary", ""), state.get("summary_upto", 0))
     
     # Invoke LLM
     try:
-        response = llm.invoke(formatted_messages)
+        response = await llm.ainvoke(formatted_messages)
         
         # Ensure response contains properly formatted code blocks
         response_content = response.content
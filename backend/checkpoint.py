@@ -0,0 +1,839 @@
+"""
+Persistent LangGraph checkpointer for FounderOS
+
+SQLite (WAL mode) store with an LRU in-memory front tier:
+- The latest checkpoint of each active thread is served from memory
+- Writes go to memory immediately and are flushed to SQLite by a background
+  writer thread, one transaction per batch (usually one per turn)
+- Threads idle longer than the retention period are deleted from disk
+
+BoundedMemorySaver is the in-process alternative: it keeps only the latest
+checkpoints per thread and evicts idle threads, optionally spilling them
+to a SQLiteCheckpointSaver.
+"""
+
+import asyncio
+import os
+import queue
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+)
+
+try:
+    from langgraph.checkpoint.base import WRITES_IDX_MAP
+except ImportError:
+    WRITES_IDX_MAP = {}
+
+
+DEFAULT_CHECKPOINT_DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "checkpoints.sqlite")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS checkpoints (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    checkpoint_id TEXT NOT NULL,
+    parent_checkpoint_id TEXT,
+    type TEXT,
+    checkpoint BLOB,
+    metadata_type TEXT,
+    metadata BLOB,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id)
+);
+CREATE TABLE IF NOT EXISTS writes (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    checkpoint_id TEXT NOT NULL,
+    task_id TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    channel TEXT NOT NULL,
+    type TEXT,
+    value BLOB,
+    task_path TEXT NOT NULL DEFAULT '',
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx)
+);
+CREATE INDEX IF NOT EXISTS checkpoints_updated_at ON checkpoints (updated_at);
+"""
+
+# Sentinel telling the writer thread to stop
+_STOP = object()
+
+
+class _HotCheckpoint:
+    """Latest serialized checkpoint of one (thread, namespace) plus its pending writes"""
+
+    __slots__ = ("checkpoint_id", "checkpoint", "metadata", "parent_id", "writes")
+
+    def __init__(self, checkpoint_id: str, checkpoint: Tuple[str, bytes], metadata: Tuple[str, bytes], parent_id: Optional[str]):
+        self.checkpoint_id = checkpoint_id
+        self.checkpoint = checkpoint
+        self.metadata = metadata
+        self.parent_id = parent_id
+        # (task_id, idx) -> (task_id, channel, (type, bytes), task_path)
+        self.writes: Dict[Tuple[str, int], Tuple[str, str, Tuple[str, bytes], str]] = {}
+
+
+class SQLiteCheckpointSaver(BaseCheckpointSaver):
+    """
+    SQLite-backed checkpointer with an in-memory LRU tier for hot threads
+
+    Args:
+        path: SQLite database file
+        hot_threads: Number of threads kept in the memory tier
+        retention_days: Delete threads not updated for this many days (0 = keep forever)
+        max_checkpoints_per_thread: Keep only the newest N checkpoints per thread (0 = keep all)
+        serde: Optional serializer (defaults to LangGraph's)
+    """
+
+    def __init__(
+        self,
+        path: str = DEFAULT_CHECKPOINT_DB_PATH,
+        hot_threads: int = 512,
+        retention_days: float = 30,
+        max_checkpoints_per_thread: int = 0,
+        *,
+        serde=None
+    ):
+        super().__init__(serde=serde)
+        self.path = path
+        self.hot_threads = hot_threads
+        self.retention_seconds = retention_days * 86400 if retention_days else 0
+        self.max_checkpoints_per_thread = max_checkpoints_per_thread
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._db_lock = threading.Lock()
+
+        # thread_id -> {checkpoint_ns: _HotCheckpoint}
+        self._hot: "OrderedDict[str, Dict[str, _HotCheckpoint]]" = OrderedDict()
+        self._hot_lock = threading.Lock()
+
+        self._queue: "queue.Queue" = queue.Queue()
+        self._last_retention_run = 0.0
+        self._stats = {"hot_hits": 0, "hot_misses": 0, "batches": 0, "rows_written": 0, "threads_expired": 0}
+        self._writer = threading.Thread(target=self._writer_loop, name="checkpoint-writer", daemon=True)
+        self._writer.start()
+
+    # ------------------------------------------------------------------ writer
+
+    def _writer_loop(self):
+        """Drain queued statements and commit them in one transaction per batch"""
+        while True:
+            item = self._queue.get()
+            batch = [item]
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            statements = [op for op in batch if op is not _STOP]
+            try:
+                if statements:
+                    with self._db_lock:
+                        self._conn.execute("BEGIN")
+                        try:
+                            for sql, params in statements:
+                                self._conn.execute(sql, params)
+                            self._conn.execute("COMMIT")
+                        except Exception:
+                            self._conn.execute("ROLLBACK")
+                            raise
+                    self._stats["batches"] += 1
+                    self._stats["rows_written"] += len(statements)
+                self._maybe_apply_retention()
+            except Exception as e:
+                print(f"Checkpoint writer error: {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+            if any(op is _STOP for op in batch):
+                return
+
+    def _enqueue(self, sql: str, params: tuple):
+        self._queue.put((sql, params))
+
+    def flush(self):
+        """Block until all queued writes are committed"""
+        self._queue.join()
+
+    def close(self):
+        """Flush pending writes and stop the writer thread"""
+        if self._writer.is_alive():
+            self._queue.put(_STOP)
+            self._writer.join()
+        self._conn.close()
+
+    def _maybe_apply_retention(self):
+        """Delete threads idle past the retention period (at most once an hour)"""
+        now = time.time()
+        if not self.retention_seconds or now - self._last_retention_run < 3600:
+            return
+        self._last_retention_run = now
+        self.prune_idle_threads(now - self.retention_seconds)
+
+    def prune_idle_threads(self, updated_before: float) -> int:
+        """
+        Delete threads whose newest checkpoint is older than a timestamp
+
+        Args:
+            updated_before: Unix timestamp
+
+        Returns:
+            Number of threads deleted
+        """
+        with self._db_lock:
+            rows = self._conn.execute(
+                "SELECT thread_id FROM checkpoints GROUP BY thread_id HAVING MAX(updated_at) < ?",
+                (updated_before,)
+            ).fetchall()
+            for (thread_id,) in rows:
+                self._conn.execute("DELETE FROM checkpoints WHERE thread_id = ?", (thread_id,))
+                self._conn.execute("DELETE FROM writes WHERE thread_id = ?", (thread_id,))
+        with self._hot_lock:
+            for (thread_id,) in rows:
+                self._hot.pop(thread_id, None)
+        self._stats["threads_expired"] += len(rows)
+        return len(rows)
+
+    # ------------------------------------------------------------------ hot tier
+
+    def _hot_get(self, thread_id: str, checkpoint_ns: str) -> Optional[_HotCheckpoint]:
+        with self._hot_lock:
+            namespaces = self._hot.get(thread_id)
+            if namespaces is None:
+                return None
+            self._hot.move_to_end(thread_id)
+            return namespaces.get(checkpoint_ns)
+
+    def _hot_set(self, thread_id: str, checkpoint_ns: str, entry: _HotCheckpoint):
+        with self._hot_lock:
+            self._hot.setdefault(thread_id, {})[checkpoint_ns] = entry
+            self._hot.move_to_end(thread_id)
+            while len(self._hot) > self.hot_threads:
+                self._hot.popitem(last=False)
+
+    def _tuple_from_hot(self, thread_id: str, checkpoint_ns: str, entry: _HotCheckpoint) -> CheckpointTuple:
+        return CheckpointTuple(
+            config={"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": entry.checkpoint_id}},
+            checkpoint=self.serde.loads_typed(entry.checkpoint),
+            metadata=self.serde.loads_typed(entry.metadata),
+            parent_config=(
+                {"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": entry.parent_id}}
+                if entry.parent_id else None
+            ),
+            pending_writes=[
+                (task_id, channel, self.serde.loads_typed(value))
+                for task_id, channel, value, _ in entry.writes.values()
+            ],
+        )
+
+    # ------------------------------------------------------------------ reads
+
+    def _load_write_rows(self, thread_id: str, checkpoint_ns: str, checkpoint_id: str) -> List[tuple]:
+        return self._conn.execute(
+            "SELECT task_id, idx, channel, type, value, task_path FROM writes "
+            "WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ? ORDER BY task_id, idx",
+            (thread_id, checkpoint_ns, checkpoint_id)
+        ).fetchall()
+
+    def _row_to_tuple(self, row: tuple, write_rows: List[tuple]) -> CheckpointTuple:
+        thread_id, checkpoint_ns, checkpoint_id, parent_id, checkpoint_type, checkpoint, metadata_type, metadata = row
+        return CheckpointTuple(
+            config={"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": checkpoint_id}},
+            checkpoint=self.serde.loads_typed((checkpoint_type, checkpoint)),
+            metadata=self.serde.loads_typed((metadata_type, metadata)),
+            parent_config=(
+                {"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": parent_id}}
+                if parent_id else None
+            ),
+            pending_writes=[
+                (task_id, channel, self.serde.loads_typed((value_type, value)))
+                for task_id, _, channel, value_type, value, _ in write_rows
+            ],
+        )
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        """Get a checkpoint tuple (latest when no checkpoint_id is given)"""
+        configurable = config["configurable"]
+        thread_id = configurable["thread_id"]
+        checkpoint_ns = configurable.get("checkpoint_ns", "")
+        checkpoint_id = configurable.get("checkpoint_id")
+
+        entry = self._hot_get(thread_id, checkpoint_ns)
+        if entry is not None and (checkpoint_id is None or checkpoint_id == entry.checkpoint_id):
+            self._stats["hot_hits"] += 1
+            return self._tuple_from_hot(thread_id, checkpoint_ns, entry)
+        self._stats["hot_misses"] += 1
+
+        # Make sure queued writes are visible before reading from disk
+        self.flush()
+        with self._db_lock:
+            columns = "thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id, type, checkpoint, metadata_type, metadata"
+            if checkpoint_id:
+                row = self._conn.execute(
+                    f"SELECT {columns} FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?",
+                    (thread_id, checkpoint_ns, checkpoint_id)
+                ).fetchone()
+            else:
+                row = self._conn.execute(
+                    f"SELECT {columns} FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? ORDER BY checkpoint_id DESC LIMIT 1",
+                    (thread_id, checkpoint_ns)
+                ).fetchone()
+            if row is None:
+                return None
+            write_rows = self._load_write_rows(thread_id, checkpoint_ns, row[2])
+
+        # Promote the thread's latest checkpoint into the memory tier
+        if not checkpoint_id:
+            entry = _HotCheckpoint(row[2], (row[4], row[5]), (row[6], row[7]), row[3])
+            for task_id, idx, channel, value_type, value, task_path in write_rows:
+                entry.writes[(task_id, idx)] = (task_id, channel, (value_type, value), task_path)
+            self._hot_set(thread_id, checkpoint_ns, entry)
+        return self._row_to_tuple(row, write_rows)
+
+    def list(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None
+    ) -> Iterator[CheckpointTuple]:
+        """List checkpoints, newest first"""
+        self.flush()
+
+        clauses, params = [], []
+        if config is not None:
+            configurable = config["configurable"]
+            clauses.append("thread_id = ?")
+            params.append(configurable["thread_id"])
+            if configurable.get("checkpoint_ns") is not None:
+                clauses.append("checkpoint_ns = ?")
+                params.append(configurable.get("checkpoint_ns", ""))
+            if configurable.get("checkpoint_id"):
+                clauses.append("checkpoint_id = ?")
+                params.append(configurable["checkpoint_id"])
+        if before is not None and before["configurable"].get("checkpoint_id"):
+            clauses.append("checkpoint_id < ?")
+            params.append(before["configurable"]["checkpoint_id"])
+
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._db_lock:
+            rows = self._conn.execute(
+                "SELECT thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id, type, checkpoint, metadata_type, metadata "
+                f"FROM checkpoints {where} ORDER BY checkpoint_id DESC",
+                params
+            ).fetchall()
+
+        count = 0
+        for row in rows:
+            if limit is not None and count >= limit:
+                break
+            with self._db_lock:
+                write_rows = self._load_write_rows(row[0], row[1], row[2])
+            result = self._row_to_tuple(row, write_rows)
+            if filter and not all(result.metadata.get(key) == value for key, value in filter.items()):
+                continue
+            count += 1
+            yield result
+
+    # ------------------------------------------------------------------ writes
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions
+    ) -> RunnableConfig:
+        """Store a checkpoint (memory now, SQLite in the background)"""
+        configurable = config["configurable"]
+        thread_id = configurable["thread_id"]
+        checkpoint_ns = configurable.get("checkpoint_ns", "")
+        parent_id = configurable.get("checkpoint_id")
+
+        serialized_checkpoint = self.serde.dumps_typed(checkpoint)
+        serialized_metadata = self.serde.dumps_typed(metadata)
+        self._hot_set(thread_id, checkpoint_ns, _HotCheckpoint(checkpoint["id"], serialized_checkpoint, serialized_metadata, parent_id))
+
+        self._enqueue(
+            "INSERT OR REPLACE INTO checkpoints "
+            "(thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id, type, checkpoint, metadata_type, metadata, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (thread_id, checkpoint_ns, checkpoint["id"], parent_id, *serialized_checkpoint, *serialized_metadata, time.time())
+        )
+        if self.max_checkpoints_per_thread:
+            self._enqueue_history_pruning(thread_id, checkpoint_ns)
+
+        return {"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": checkpoint["id"]}}
+
+    def _enqueue_history_pruning(self, thread_id: str, checkpoint_ns: str):
+        """Drop all but the newest max_checkpoints_per_thread checkpoints (and their writes)"""
+        keep = (
+            "SELECT checkpoint_id FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? "
+            "ORDER BY checkpoint_id DESC LIMIT ?"
+        )
+        params = (thread_id, checkpoint_ns, thread_id, checkpoint_ns, self.max_checkpoints_per_thread)
+        self._enqueue(
+            f"DELETE FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id NOT IN ({keep})",
+            params
+        )
+        self._enqueue(
+            f"DELETE FROM writes WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id NOT IN ({keep})",
+            params
+        )
+
+    def put_writes(self, config: RunnableConfig, writes: Sequence[Tuple[str, Any]], task_id: str, task_path: str = "") -> None:
+        """Store intermediate writes linked to a checkpoint"""
+        configurable = config["configurable"]
+        thread_id = configurable["thread_id"]
+        checkpoint_ns = configurable.get("checkpoint_ns", "")
+        checkpoint_id = configurable["checkpoint_id"]
+
+        entry = self._hot_get(thread_id, checkpoint_ns)
+        if entry is not None and entry.checkpoint_id != checkpoint_id:
+            entry = None
+
+        for idx, (channel, value) in enumerate(writes):
+            write_idx = WRITES_IDX_MAP.get(channel, idx)
+            serialized_value = self.serde.dumps_typed(value)
+            # Special channels (errors, interrupts) replace; regular writes are kept once
+            replace = write_idx < 0
+            if entry is not None and (replace or (task_id, write_idx) not in entry.writes):
+                entry.writes[(task_id, write_idx)] = (task_id, channel, serialized_value, task_path)
+            self._enqueue(
+                f"INSERT OR {'REPLACE' if replace else 'IGNORE'} INTO writes "
+                "(thread_id, checkpoint_ns, checkpoint_id, task_id, idx, channel, type, value, task_path) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (thread_id, checkpoint_ns, checkpoint_id, task_id, write_idx, channel, *serialized_value, task_path)
+            )
+
+    def thread_ids(self) -> List[str]:
+        """Ids of all threads stored on disk (pending writes flushed first)"""
+        self.flush()
+        with self._db_lock:
+            return [row[0] for row in self._conn.execute("SELECT DISTINCT thread_id FROM checkpoints")]
+
+    def delete_thread(self, thread_id: str) -> None:
+        """Delete all checkpoints and writes of a thread"""
+        with self._hot_lock:
+            self._hot.pop(thread_id, None)
+        self._enqueue("DELETE FROM checkpoints WHERE thread_id = ?", (thread_id,))
+        self._enqueue("DELETE FROM writes WHERE thread_id = ?", (thread_id,))
+        self.flush()
+
+    # ------------------------------------------------------------------ async
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        """Async get_tuple (memory-tier hits don't leave the event loop)"""
+        configurable = config["configurable"]
+        entry = self._hot_get(configurable["thread_id"], configurable.get("checkpoint_ns", ""))
+        if entry is not None and configurable.get("checkpoint_id") in (None, entry.checkpoint_id):
+            return self.get_tuple(config)
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None
+    ) -> AsyncIterator[CheckpointTuple]:
+        """Async list"""
+        results = await asyncio.to_thread(lambda: list(self.list(config, filter=filter, before=before, limit=limit)))
+        for result in results:
+            yield result
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions
+    ) -> RunnableConfig:
+        """Async put (only touches memory and the write queue)"""
+        return self.put(config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(self, config: RunnableConfig, writes: Sequence[Tuple[str, Any]], task_id: str, task_path: str = "") -> None:
+        """Async put_writes (only touches memory and the write queue)"""
+        self.put_writes(config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        """Async delete_thread"""
+        await asyncio.to_thread(self.delete_thread, thread_id)
+
+    # ------------------------------------------------------------------ stats
+
+    def stats(self) -> Dict[str, Any]:
+        """Memory-tier and writer counters"""
+        return {
+            "backend": "sqlite",
+            "path": self.path,
+            "hot_threads": len(self._hot),
+            "hot_capacity": self.hot_threads,
+            "queued_writes": self._queue.qsize(),
+            **self._stats,
+        }
+
+
+class _ThreadCheckpoints:
+    """All checkpoints of one thread held by BoundedMemorySaver"""
+
+    __slots__ = ("namespaces", "writes", "last_access")
+
+    def __init__(self):
+        # checkpoint_ns -> OrderedDict[checkpoint_id -> (checkpoint, metadata, parent_id)], oldest first
+        self.namespaces: Dict[str, "OrderedDict[str, Tuple[Tuple[str, bytes], Tuple[str, bytes], Optional[str]]]"] = {}
+        # (checkpoint_ns, checkpoint_id) -> {(task_id, idx): (task_id, channel, (type, bytes), task_path)}
+        self.writes: Dict[Tuple[str, str], Dict[Tuple[str, int], Tuple[str, str, Tuple[str, bytes], str]]] = {}
+        self.last_access = time.monotonic()
+
+    def nbytes(self) -> int:
+        total = 0
+        for checkpoints in self.namespaces.values():
+            for checkpoint, metadata, _ in checkpoints.values():
+                total += len(checkpoint[1]) + len(metadata[1])
+        for writes in self.writes.values():
+            for _, _, value, _ in writes.values():
+                total += len(value[1])
+        return total
+
+
+class BoundedMemorySaver(BaseCheckpointSaver):
+    """
+    In-memory checkpointer with bounded history and idle-thread eviction
+
+    Unlike MemorySaver, only the newest `max_checkpoints_per_thread` checkpoints
+    of each thread are kept, and threads idle for longer than `idle_ttl` seconds
+    are dropped from memory (spilled to `spill_saver` first when one is given,
+    and reloaded from it on the next access).
+
+    Args:
+        max_checkpoints_per_thread: Checkpoints kept per thread and namespace
+        idle_ttl: Seconds without access before a thread is evicted (0 = never)
+        spill_saver: Optional SQLiteCheckpointSaver that receives evicted threads
+        serde: Optional serializer (defaults to LangGraph's)
+    """
+
+    # Idle sweeps run at most this often (seconds)
+    SWEEP_INTERVAL = 60.0
+
+    def __init__(
+        self,
+        max_checkpoints_per_thread: int = 10,
+        idle_ttl: float = 6 * 3600,
+        spill_saver: Optional[SQLiteCheckpointSaver] = None,
+        *,
+        serde=None
+    ):
+        super().__init__(serde=serde)
+        self.max_checkpoints_per_thread = max(1, max_checkpoints_per_thread)
+        self.idle_ttl = idle_ttl
+        self.spill_saver = spill_saver
+        self._threads: Dict[str, _ThreadCheckpoints] = {}
+        # Threads held by the spill store; only these are looked up there on a miss,
+        # so brand-new threads never touch SQLite
+        self._spilled = set(spill_saver.thread_ids()) if spill_saver is not None else set()
+        self._lock = threading.RLock()
+        self._last_sweep = time.monotonic()
+        self._stats = {"checkpoints_pruned": 0, "threads_evicted": 0, "threads_spilled": 0, "threads_restored": 0}
+
+    # ------------------------------------------------------------------ eviction
+
+    def _touch(self, thread_id: str, create: bool = False) -> Optional[_ThreadCheckpoints]:
+        record = self._threads.get(thread_id)
+        if record is None and thread_id in self._spilled:
+            record = self._restore(thread_id)
+        if record is None and create:
+            record = self._threads[thread_id] = _ThreadCheckpoints()
+        if record is not None:
+            record.last_access = time.monotonic()
+        return record
+
+    def _maybe_sweep(self):
+        now = time.monotonic()
+        if not self.idle_ttl or now - self._last_sweep < self.SWEEP_INTERVAL:
+            return
+        self._last_sweep = now
+        self.evict_idle_threads(now - self.idle_ttl)
+
+    def evict_idle_threads(self, accessed_before: float) -> int:
+        """
+        Drop threads not accessed since a monotonic timestamp (spilling them if configured)
+
+        Args:
+            accessed_before: time.monotonic() cutoff
+
+        Returns:
+            Number of threads evicted
+        """
+        with self._lock:
+            idle = [thread_id for thread_id, record in self._threads.items() if record.last_access < accessed_before]
+            for thread_id in idle:
+                record = self._threads.pop(thread_id)
+                if self.spill_saver is not None:
+                    self._spill(thread_id, record)
+            self._stats["threads_evicted"] += len(idle)
+        return len(idle)
+
+    def _spill(self, thread_id: str, record: _ThreadCheckpoints):
+        """Copy a thread's checkpoints (oldest first) and writes into the spill store"""
+        for checkpoint_ns, checkpoints in record.namespaces.items():
+            for checkpoint_id, (checkpoint, metadata, parent_id) in checkpoints.items():
+                configurable = {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns}
+                if parent_id:
+                    configurable["checkpoint_id"] = parent_id
+                self.spill_saver.put({"configurable": configurable}, self.serde.loads_typed(checkpoint), self.serde.loads_typed(metadata), {})
+                writes = record.writes.get((checkpoint_ns, checkpoint_id), {})
+                by_task: Dict[Tuple[str, str], List[Tuple[str, Any]]] = {}
+                for task_id, channel, value, task_path in writes.values():
+                    by_task.setdefault((task_id, task_path), []).append((channel, self.serde.loads_typed(value)))
+                for (task_id, task_path), task_writes in by_task.items():
+                    self.spill_saver.put_writes(
+                        {"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": checkpoint_id}},
+                        task_writes, task_id, task_path
+                    )
+        self._spilled.add(thread_id)
+        self._stats["threads_spilled"] += 1
+
+    def _restore(self, thread_id: str) -> Optional[_ThreadCheckpoints]:
+        """Load a spilled thread back into memory and remove it from the spill store"""
+        tuples = list(self.spill_saver.list({"configurable": {"thread_id": thread_id}}))
+        self._spilled.discard(thread_id)
+        if not tuples:
+            return None
+        record = _ThreadCheckpoints()
+        for result in reversed(tuples):  # oldest first
+            configurable = result.config["configurable"]
+            checkpoint_ns, checkpoint_id = configurable.get("checkpoint_ns", ""), configurable["checkpoint_id"]
+            parent_id = result.parent_config["configurable"]["checkpoint_id"] if result.parent_config else None
+            record.namespaces.setdefault(checkpoint_ns, OrderedDict())[checkpoint_id] = (
+                self.serde.dumps_typed(result.checkpoint),
+                self.serde.dumps_typed(result.metadata),
+                parent_id
+            )
+            if result.pending_writes:
+                record.writes[(checkpoint_ns, checkpoint_id)] = {
+                    (task_id, idx): (task_id, channel, self.serde.dumps_typed(value), "")
+                    for idx, (task_id, channel, value) in enumerate(result.pending_writes)
+                }
+        for checkpoints in record.namespaces.values():
+            while len(checkpoints) > self.max_checkpoints_per_thread:
+                checkpoints.popitem(last=False)
+        self.spill_saver.delete_thread(thread_id)
+        self._threads[thread_id] = record
+        self._stats["threads_restored"] += 1
+        return record
+
+    # ------------------------------------------------------------------ reads
+
+    def _build_tuple(self, thread_id: str, checkpoint_ns: str, checkpoint_id: str, record: _ThreadCheckpoints) -> CheckpointTuple:
+        checkpoint, metadata, parent_id = record.namespaces[checkpoint_ns][checkpoint_id]
+        writes = record.writes.get((checkpoint_ns, checkpoint_id), {})
+        return CheckpointTuple(
+            config={"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": checkpoint_id}},
+            checkpoint=self.serde.loads_typed(checkpoint),
+            metadata=self.serde.loads_typed(metadata),
+            parent_config=(
+                {"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": parent_id}}
+                if parent_id else None
+            ),
+            pending_writes=[(task_id, channel, self.serde.loads_typed(value)) for task_id, channel, value, _ in writes.values()],
+        )
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        """Get a checkpoint tuple (latest when no checkpoint_id is given)"""
+        configurable = config["configurable"]
+        thread_id = configurable["thread_id"]
+        checkpoint_ns = configurable.get("checkpoint_ns", "")
+        checkpoint_id = configurable.get("checkpoint_id")
+
+        with self._lock:
+            record = self._touch(thread_id)
+            checkpoints = record.namespaces.get(checkpoint_ns) if record else None
+            if not checkpoints:
+                return None
+            if checkpoint_id is None:
+                checkpoint_id = next(reversed(checkpoints))
+            elif checkpoint_id not in checkpoints:
+                return None
+            return self._build_tuple(thread_id, checkpoint_ns, checkpoint_id, record)
+
+    def list(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None
+    ) -> Iterator[CheckpointTuple]:
+        """List checkpoints held in memory, newest first"""
+        with self._lock:
+            if config is not None:
+                thread_ids = [config["configurable"]["thread_id"]]
+                self._touch(thread_ids[0])
+            else:
+                thread_ids = list(self._threads)
+            config_ns = config["configurable"].get("checkpoint_ns") if config else None
+            config_id = config["configurable"].get("checkpoint_id") if config else None
+            before_id = before["configurable"].get("checkpoint_id") if before else None
+
+            results = []
+            for thread_id in thread_ids:
+                record = self._threads.get(thread_id)
+                if record is None:
+                    continue
+                for checkpoint_ns, checkpoints in record.namespaces.items():
+                    if config_ns is not None and checkpoint_ns != config_ns:
+                        continue
+                    for checkpoint_id in reversed(checkpoints):
+                        if config_id and checkpoint_id != config_id:
+                            continue
+                        if before_id and checkpoint_id >= before_id:
+                            continue
+                        result = self._build_tuple(thread_id, checkpoint_ns, checkpoint_id, record)
+                        if filter and not all(result.metadata.get(key) == value for key, value in filter.items()):
+                            continue
+                        results.append(result)
+                        if limit is not None and len(results) >= limit:
+                            break
+
+        yield from results[:limit] if limit is not None else results
+
+    # ------------------------------------------------------------------ writes
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions
+    ) -> RunnableConfig:
+        """Store a checkpoint and prune the thread's history to the newest N"""
+        configurable = config["configurable"]
+        thread_id = configurable["thread_id"]
+        checkpoint_ns = configurable.get("checkpoint_ns", "")
+
+        with self._lock:
+            record = self._touch(thread_id, create=True)
+            checkpoints = record.namespaces.setdefault(checkpoint_ns, OrderedDict())
+            checkpoints[checkpoint["id"]] = (
+                self.serde.dumps_typed(checkpoint),
+                self.serde.dumps_typed(metadata),
+                configurable.get("checkpoint_id")
+            )
+            while len(checkpoints) > self.max_checkpoints_per_thread:
+                old_id, _ = checkpoints.popitem(last=False)
+                record.writes.pop((checkpoint_ns, old_id), None)
+                self._stats["checkpoints_pruned"] += 1
+            self._maybe_sweep()
+
+        return {"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": checkpoint["id"]}}
+
+    def put_writes(self, config: RunnableConfig, writes: Sequence[Tuple[str, Any]], task_id: str, task_path: str = "") -> None:
+        """Store intermediate writes linked to a checkpoint"""
+        configurable = config["configurable"]
+        thread_id = configurable["thread_id"]
+        key = (configurable.get("checkpoint_ns", ""), configurable["checkpoint_id"])
+
+        with self._lock:
+            record = self._touch(thread_id, create=True)
+            stored = record.writes.setdefault(key, {})
+            for idx, (channel, value) in enumerate(writes):
+                write_idx = WRITES_IDX_MAP.get(channel, idx)
+                if write_idx >= 0 and (task_id, write_idx) in stored:
+                    continue
+                stored[(task_id, write_idx)] = (task_id, channel, self.serde.dumps_typed(value), task_path)
+
+    def delete_thread(self, thread_id: str) -> None:
+        """Delete all checkpoints and writes of a thread"""
+        with self._lock:
+            self._threads.pop(thread_id, None)
+            self._spilled.discard(thread_id)
+        if self.spill_saver is not None:
+            self.spill_saver.delete_thread(thread_id)
+
+    # ------------------------------------------------------------------ async
+
+    def _needs_restore(self, config: Optional[RunnableConfig]) -> bool:
+        # Restoring reads SQLite, so async callers run it in a worker thread
+        return config is not None and config["configurable"]["thread_id"] in self._spilled
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        """Async get_tuple (spilled threads are restored in a worker thread)"""
+        if self._needs_restore(config):
+            return await asyncio.to_thread(self.get_tuple, config)
+        return self.get_tuple(config)
+
+    async def alist(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None
+    ) -> AsyncIterator[CheckpointTuple]:
+        """Async list"""
+        if self._needs_restore(config):
+            results = await asyncio.to_thread(lambda: list(self.list(config, filter=filter, before=before, limit=limit)))
+        else:
+            results = self.list(config, filter=filter, before=before, limit=limit)
+        for result in results:
+            yield result
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions
+    ) -> RunnableConfig:
+        """Async put"""
+        if self._needs_restore(config):
+            return await asyncio.to_thread(self.put, config, checkpoint, metadata, new_versions)
+        return self.put(config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(self, config: RunnableConfig, writes: Sequence[Tuple[str, Any]], task_id: str, task_path: str = "") -> None:
+        """Async put_writes"""
+        if self._needs_restore(config):
+            await asyncio.to_thread(self.put_writes, config, writes, task_id, task_path)
+        else:
+            self.put_writes(config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        """Async delete_thread"""
+        self.delete_thread(thread_id)
+
+    # ------------------------------------------------------------------ stats
+
+    def stats(self) -> Dict[str, Any]:
+        """Thread count, bytes held and pruning/eviction counters"""
+        with self._lock:
+            threads = len(self._threads)
+            bytes_held = sum(record.nbytes() for record in self._threads.values())
+        return {
+            "backend": "memory",
+            "threads": threads,
+            "bytes_held": bytes_held,
+            "max_checkpoints_per_thread": self.max_checkpoints_per_thread,
+            "idle_ttl": self.idle_ttl,
+            "spill": self.spill_saver.path if self.spill_saver is not None else None,
+            **self._stats,
+        }
@@ -0,0 +1,231 @@
+"""
+Search result compaction for FounderOS agents
+
+Tavily results used to be appended to the prompt as `str(results)`: raw
+JSON with HTML fragments and the same snippet repeated across mirrors.
+Before results become a ToolMessage they are compacted:
+- Duplicate URLs (after dropping fragments and tracking parameters) and
+  duplicate snippets are removed
+- HTML/markdown markup is stripped
+- Passages are ranked against the search query with a local BM25
+- Each source keeps its best passages up to a token budget
+"""
+
+import html
+import math
+import os
+import re
+from collections import Counter
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from cache import estimate_tokens
+from grant_index import query_terms
+from sentiment import split_sentences
+
+
+COMPACTION_ENABLED = os.getenv("COMPACTION_ENABLED", "true").lower() == "true"
+# Token budget per source and the maximum number of sources kept per search
+COMPACT_TOKENS_PER_SOURCE = int(os.getenv("COMPACT_TOKENS_PER_SOURCE", "160"))
+COMPACT_MAX_SOURCES = int(os.getenv("COMPACT_MAX_SOURCES", "5"))
+
+# BM25 parameters
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+_TRACKING_PARAMS = {"fbclid", "gclid", "ref"}
+_SCRIPT_RE = re.compile(r"<(script|style)[^>]*>.*?</\1>", re.IGNORECASE | re.DOTALL)
+_TAG_RE = re.compile(r"<[^>]+>")
+_MD_IMAGE_RE = re.compile(r"!\[[^\]]*\]\([^)]*\)")
+_MD_LINK_RE = re.compile(r"\[([^\]]*)\]\([^)]*\)")
+_MD_MARKUP_RE = re.compile(r"^\s*(#{1,6}|[-*+>])\s+|\*{1,3}|`{1,3}|__|\|", re.MULTILINE)
+_SPACE_RE = re.compile(r"[ \t\r\f\v]+")
+
+
+class CompactionStats:
+    """Prompt size saved by compaction"""
+
+    def __init__(self):
+        self.calls = 0
+        self.sources_in = 0
+        self.sources_out = 0
+        self.tokens_in = 0
+        self.tokens_out = 0
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "enabled": COMPACTION_ENABLED,
+            "calls": self.calls,
+            "sources_in": self.sources_in,
+            "sources_out": self.sources_out,
+            "tokens_in": self.tokens_in,
+            "tokens_out": self.tokens_out,
+            "reduction": round(1 - self.tokens_out / self.tokens_in, 3) if self.tokens_in else 0.0,
+        }
+
+
+compaction_stats = CompactionStats()
+
+
+def normalize_url(url: str) -> str:
+    """URL without fragment, tracking parameters, "www." and trailing slash"""
+    parts = urlsplit((url or "").strip())
+    query = [(key, value) for key, value in parse_qsl(parts.query) if not key.lower().startswith("utm_") and key.lower() not in _TRACKING_PARAMS]
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    return urlunsplit(("", host, parts.path.rstrip("/"), urlencode(query), ""))
+
+
+def strip_markup(text: str) -> str:
+    """Plain text from HTML or markdown snippets"""
+    text = _SCRIPT_RE.sub(" ", text or "")
+    text = _TAG_RE.sub(" ", text)
+    text = html.unescape(text)
+    text = _MD_IMAGE_RE.sub(" ", text)
+    text = _MD_LINK_RE.sub(r"\1", text)
+    text = _MD_MARKUP_RE.sub(" ", text)
+    lines = (_SPACE_RE.sub(" ", line).strip() for line in text.splitlines())
+    return "\n".join(line for line in lines if line)
+
+
+def dedupe_results(results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Drop results whose URL or snippet was already seen (first occurrence wins)"""
+    seen_urls, seen_contents, unique = set(), set(), []
+    for item in results:
+        if not isinstance(item, dict):
+            continue
+        url_key = normalize_url(item.get("url", ""))
+        content_key = re.sub(r"\W+", "", (item.get("content") or "").lower())[:200]
+        if (url_key and url_key in seen_urls) or (content_key and content_key in seen_contents):
+            continue
+        seen_urls.add(url_key)
+        seen_contents.add(content_key)
+        unique.append(item)
+    return unique
+
+
+def bm25_scores(query: List[str], passages: List[List[str]]) -> List[float]:
+    """
+    BM25 score of each tokenized passage for the query terms
+
+    The passages of one search form the corpus, so IDF favors terms that
+    single out a few passages over terms present everywhere.
+    """
+    if not query or not passages:
+        return [0.0] * len(passages)
+    doc_freq = Counter(term for passage in passages for term in set(passage))
+    avg_length = sum(len(passage) for passage in passages) / len(passages) or 1.0
+    total = len(passages)
+    scores = []
+    for passage in passages:
+        counts = Counter(passage)
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * len(passage) / avg_length)
+        score = 0.0
+        for term in query:
+            freq = counts.get(term)
+            if freq:
+                idf = math.log(1 + (total - doc_freq[term] + 0.5) / (doc_freq[term] + 0.5))
+                score += idf * freq * (BM25_K1 + 1) / (freq + norm)
+        scores.append(score)
+    return scores
+
+
+def _truncate(text: str, budget: int) -> str:
+    # Cut on a word boundary to fit the token budget
+    if estimate_tokens(text) <= budget:
+        return text
+    low, high = 0, len(text)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if estimate_tokens(text[:middle]) <= budget:
+            low = middle
+        else:
+            high = middle - 1
+    cut = text[:low]
+    return (cut.rsplit(" ", 1)[0] if " " in cut else cut) + "…"
+
+
+def compact_search_results(
+    results: List[Dict[str, Any]],
+    query: str,
+    tokens_per_source: int = COMPACT_TOKENS_PER_SOURCE,
+    max_sources: int = COMPACT_MAX_SOURCES
+) -> str:
+    """
+    Compact search results into a prompt-ready block
+
+    Args:
+        results: Search results ({"title", "url", "content"})
+        query: The search query the passages are ranked against
+        tokens_per_source: Token budget per source
+        max_sources: Maximum number of sources kept
+
+    Returns:
+        Numbered sources with their most relevant passages
+    """
+    sources = dedupe_results(results)[:max_sources]
+    query_tokens = query_terms(query, min_length=2)
+
+    # Passages of every source form one BM25 corpus (repeated boilerplate counted once)
+    passages, owners, seen = [], [], set()
+    for index, item in enumerate(sources):
+        for passage in split_sentences(strip_markup(item.get("content") or "")):
+            if (index, passage) not in seen:
+                seen.add((index, passage))
+                passages.append(passage)
+                owners.append(index)
+    scores = bm25_scores(query_tokens, [query_terms(passage, min_length=2) for passage in passages])
+
+    blocks = []
+    for index, item in enumerate(sources):
+        candidates = [(scores[i], i) for i, owner in enumerate(owners) if owner == index]
+        # Matching passages, best first; without any query match keep the lead of the page
+        ranked = sorted((pair for pair in candidates if pair[0] > 0), key=lambda pair: (-pair[0], pair[1])) or candidates
+        selected, used = [], 0
+        for _, i in ranked:
+            cost = estimate_tokens(passages[i])
+            if used + cost <= tokens_per_source:
+                selected.append((i, passages[i]))
+                used += cost
+            elif not selected:
+                # The best passage alone exceeds the budget
+                selected.append((i, _truncate(passages[i], tokens_per_source)))
+                break
+        # Restore document order; gaps between kept passages are marked with "…"
+        text, previous = "", None
+        for i, passage in sorted(selected):
+            separator = "" if previous is None else (" " if i == previous + 1 else " … ")
+            text += separator + passage
+            previous = i
+        title = strip_markup(item.get("title") or "").replace("\n", " ")
+        blocks.append(f"[{index + 1}] {title} ({item.get('url', '')})\n{text}".rstrip())
+
+    compacted = "\n\n".join(blocks)
+    compaction_stats.calls += 1
+    compaction_stats.sources_in += len(results)
+    compaction_stats.sources_out += len(sources)
+    compaction_stats.tokens_in += estimate_tokens(str(results))
+    compaction_stats.tokens_out += estimate_tokens(compacted)
+    return compacted
+
+
+def format_tool_result(result: Any, tool_args: Optional[Dict[str, Any]] = None) -> str:
+    """
+    ToolMessage content for a tool result
+
+    Search results (lists of dicts with "url"/"content") are compacted;
+    anything else is passed through as text.
+    """
+    is_search_result = (
+        isinstance(result, list) and result
+        and all(isinstance(item, dict) and ("content" in item or "url" in item) for item in result)
+    )
+    if not COMPACTION_ENABLED or not is_search_result:
+        return str(result)
+    return compact_search_results(result, (tool_args or {}).get("query", ""))
+
+
+def get_compaction_stats() -> Dict[str, Any]:
+    """Compaction statistics"""
+    return compaction_stats.snapshot()
@@ -0,0 +1,205 @@
+"""
+Context assembly for FounderOS agents
+
+Agents no longer copy the whole conversation into every prompt. The last
+turns are kept verbatim under a per-agent token budget, and older turns
+are represented by a rolling summary stored in AgentState. The summary is
+refreshed in the background after each response.
+"""
+
+import asyncio
+import os
+from typing import Any, Dict, List, Optional
+from langchain_core.messages import BaseMessage, HumanMessage, AIMessage, SystemMessage, ToolMessage
+
+from cache import estimate_tokens
+from llm import get_background_llm
+
+
+# History token budget per agent (system prompt not included)
+AGENT_CONTEXT_BUDGETS: Dict[str, int] = {
+    "cofounder": 6000,
+    "vc_simulator": 6000,
+    "grant_hunter": 4000,
+    "market_sensor": 4000,
+    "mvp_builder": 12000,
+    "framework_designer": 6000,
+    "growth_hacker": 6000,
+    "legal_advisor": 8000,
+}
+DEFAULT_CONTEXT_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "6000"))
+
+# Background summarization runs once this many messages have fallen out of the window
+SUMMARY_MIN_MESSAGES = int(os.getenv("SUMMARY_MIN_MESSAGES", "4"))
+SUMMARY_ENABLED = os.getenv("SUMMARY_ENABLED", "true").lower() == "true"
+
+SUMMARY_PROMPT = """다음은 창업자와 AI 어시스턴트의 대화 요약과 그 이후의 대화입니다.
+기존 요약에 새 대화 내용을 반영하여 갱신된 요약을 작성해주세요.
+
+- 사업 아이디어, 타겟 고객, 결정된 사항, 수치, 미해결 질문을 반드시 보존하세요
+- 인사말이나 반복되는 내용은 생략하세요
+- 800자 이내의 한국어 글머리표로 작성하세요
+
+[기존 요약]
+{summary}
+
+[새 대화]
+{conversation}
+
+[갱신된 요약]"""
+
+# Summary update tasks in flight, by thread (also keeps the tasks referenced)
+_summary_tasks: Dict[str, asyncio.Task] = {}
+
+
+def get_context_budget(agent: str) -> int:
+    """History token budget for an agent (CONTEXT_BUDGET_<AGENT> env var overrides)"""
+    override = os.getenv(f"CONTEXT_BUDGET_{agent.upper()}")
+    if override:
+        return int(override)
+    return AGENT_CONTEXT_BUDGETS.get(agent, DEFAULT_CONTEXT_BUDGET)
+
+
+def _message_text(msg: BaseMessage) -> str:
+    content = msg.content
+    return content if isinstance(content, str) else str(content)
+
+
+def select_window_start(messages: List[BaseMessage], budget: int) -> int:
+    """
+    Index of the first message kept verbatim
+
+    Walks backwards from the newest message until the budget is used up.
+    The newest message is always kept.
+
+    Args:
+        messages: Conversation history
+        budget: Token budget
+
+    Returns:
+        Start index of the verbatim window
+    """
+    used = 0
+    start = len(messages)
+    for index in range(len(messages) - 1, -1, -1):
+        used += estimate_tokens(_message_text(messages[index]))
+        if used > budget and index < len(messages) - 1:
+            break
+        start = index
+    return start
+
+
+def build_context_messages(
+    agent: str,
+    system_prompt: str,
+    messages: List[BaseMessage],
+    summary: str = "",
+    summary_upto: int = 0,
+    include_tool_messages: bool = False
+) -> List[BaseMessage]:
+    """
+    Build the prompt messages for an agent
+
+    Args:
+        agent: Agent node name (selects the token budget)
+        system_prompt: Agent system prompt
+        messages: Conversation history from state
+        summary: Rolling summary of older turns (state["summary"])
+        summary_upto: Number of leading messages the summary covers (state["summary_upto"])
+        include_tool_messages: Keep ToolMessages in the window
+
+    Returns:
+        [SystemMessage, ...windowed history]
+    """
+    budget = get_context_budget(agent)
+    start = select_window_start(messages, budget)
+    if SUMMARY_ENABLED:
+        # The summary lags behind the smallest agent window: turns it does not
+        # cover yet stay verbatim even past the budget, so none is dropped from
+        # both (capped at twice the budget in case summary updates keep failing)
+        start = max(min(start, summary_upto), select_window_start(messages, 2 * budget))
+
+    # Older turns fall out of the window: carry them as a summary in the system prompt
+    # (a single system message, since Gemini folds it into the first human turn)
+    if start > 0 and summary:
+        system_prompt = f"{system_prompt}\n\n[이전 대화 요약]\n{summary}"
+
+    formatted_messages = [SystemMessage(content=system_prompt)]
+    for msg in messages[start:]:
+        if isinstance(msg, HumanMessage):
+            formatted_messages.append(HumanMessage(content=msg.content))
+        elif isinstance(msg, AIMessage):
+            formatted_messages.append(AIMessage(content=msg.content))
+        elif include_tool_messages and isinstance(msg, ToolMessage):
+            formatted_messages.append(msg)
+    return formatted_messages
+
+
+def _format_conversation(messages: List[BaseMessage]) -> str:
+    lines = []
+    for msg in messages:
+        if isinstance(msg, HumanMessage):
+            lines.append(f"User: {_message_text(msg)}")
+        elif isinstance(msg, AIMessage):
+            lines.append(f"Assistant: {_message_text(msg)}")
+    return "\n".join(lines)
+
+
+async def update_summary(graph_with_memory, config: Dict[str, Any]) -> Optional[str]:
+    """
+    Fold messages that left the smallest context window into the rolling summary
+
+    Args:
+        graph_with_memory: Compiled graph with checkpointer
+        config: Thread config
+
+    Returns:
+        New summary, or None when no update was needed
+    """
+    state = await graph_with_memory.aget_state(config)
+    values = state.values if state else {}
+    messages = values.get("messages", [])
+    summary_upto = values.get("summary_upto", 0)
+
+    # Summarize everything outside the smallest agent window so every agent is covered
+    budget = min(get_context_budget(agent) for agent in AGENT_CONTEXT_BUDGETS)
+    window_start = select_window_start(messages, budget)
+    if window_start - summary_upto < SUMMARY_MIN_MESSAGES:
+        return None
+
+    prompt = SUMMARY_PROMPT.format(
+        summary=values.get("summary") or "(없음)",
+        conversation=_format_conversation(messages[summary_upto:window_start])
+    )
+    response = await get_background_llm().ainvoke([HumanMessage(content=prompt)])
+
+    last_agent = values.get("last_agent")
+    await graph_with_memory.aupdate_state(
+        config,
+        {"summary": response.content, "summary_upto": window_start},
+        as_node=last_agent if last_agent in AGENT_CONTEXT_BUDGETS else None
+    )
+    return response.content
+
+
+async def _run_summary_update(graph_with_memory, config: Dict[str, Any], thread_id: str):
+    try:
+        await update_summary(graph_with_memory, config)
+    except Exception as e:
+        print(f"Summary update failed for {thread_id}: {e}")
+    finally:
+        _summary_tasks.pop(thread_id, None)
+
+
+def schedule_summary_update(graph_with_memory, thread_id: str):
+    """
+    Refresh the thread's rolling summary in the background (after a response is sent)
+
+    Args:
+        graph_with_memory: Compiled graph with checkpointer
+        thread_id: Conversation thread ID
+    """
+    if not SUMMARY_ENABLED or thread_id in _summary_tasks:
+        return
+    config = {"configurable": {"thread_id": thread_id}}
+    _summary_tasks[thread_id] = asyncio.create_task(_run_summary_update(graph_with_memory, config, thread_id))
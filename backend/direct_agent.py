@@ -2,7 +2,9 @@
 Direct agent routing - bypass supervisor when agent is specified
 """
 
+from typing import Optional
 from langchain_core.messages import HumanMessage, AIMessage
+from langchain_core.runnables import RunnableLambda
 from state import AgentState
 from agents.cofounder import cofounder_node
 from agents.vc_simulator import vc_simulator_node
@@ -12,6 +14,7 @@ from agents.mvp_builder import mvp_builder_node
 from agents.framework_designer import framework_designer_node
 from agents.growth_hacker import growth_hacker_node
 from agents.legal_advisor import legal_advisor_node
+from streaming import make_frame, translate_event
 
 
 # Agent node mapping
@@ -27,18 +30,12 @@ AGENT_NODES = {
 }
 
 
-async def route_to_agent(agent_name: str, message: str, thread_id: str, graph_with_memory):
+async def _load_agent_state(agent_name: str, message: str, thread_id: str, graph_with_memory, founder_id: Optional[str] = None):
     """
-    Route directly to specified agent, bypassing supervisor
-    
-    Args:
-        agent_name: Name of the agent to route to
-        message: User message
-        thread_id: Conversation thread ID
-        graph_with_memory: Compiled graph with memory (for memory access)
+    Build the agent input state from the thread's memory plus the new message
     
     Returns:
-        Agent response
+        Tuple of (config, agent_state)
     """
     if agent_name not in AGENT_NODES:
         raise ValueError(f"Unknown agent: {agent_name}")
@@ -52,31 +49,59 @@ async def route_to_agent(agent_name: str, message: str, thread_id: str, graph_wi
     # Get conversation history from memory if available
     try:
         # Get current state from memory
-        current_state = graph_with_memory.get_state(config)
+        current_state = await graph_with_memory.aget_state(config)
         existing_messages = current_state.values.get("messages", []) if current_state else []
+        founder_id = founder_id or (current_state.values.get("founder_id") if current_state else None)
     except:
         existing_messages = []
     
     # Add new user message
     all_messages = list(existing_messages) + [HumanMessage(content=message)]
     
-    # Get the agent node function
-    agent_node = AGENT_NODES[agent_name]
-    
     # Create state with all messages
     agent_state: AgentState = {
         "messages": all_messages,
         "next": "FINISH"
     }
-    
-    # Invoke the agent directly
-    result = agent_node(agent_state)
-    
-    # Update memory with new messages
+    if founder_id:
+        agent_state["founder_id"] = founder_id
+    return config, agent_state
+
+
+async def _save_agent_result(config: dict, result: dict, graph_with_memory, founder_id: Optional[str] = None):
+    """Write the agent result back to the thread's memory"""
+    if founder_id:
+        result = {**result, "founder_id": founder_id}
     try:
-        graph_with_memory.update_state(config, result)
+        await graph_with_memory.aupdate_state(config, result)
     except:
         pass  # If memory update fails, continue anyway
+
+
+async def route_to_agent(agent_name: str, message: str, thread_id: str, graph_with_memory, founder_id: Optional[str] = None):
+    """
+    Route directly to specified agent, bypassing supervisor
+    
+    Args:
+        agent_name: Name of the agent to route to
+        message: User message
+        thread_id: Conversation thread ID
+        graph_with_memory: Compiled graph with memory (for memory access)
+        founder_id: Founder the thread belongs to (optional)
+    
+    Returns:
+        Agent response
+    """
+    config, agent_state = await _load_agent_state(agent_name, message, thread_id, graph_with_memory, founder_id)
+    
+    # Get the agent node function
+    agent_node = AGENT_NODES[agent_name]
+    
+    # Invoke the agent directly (agent nodes are async so the event loop stays free)
+    result = await agent_node(agent_state)
+    
+    # Update memory with new messages
+    await _save_agent_result(config, result, graph_with_memory, agent_state.get("founder_id"))
     
     # Get the response
     messages = result.get("messages", [])
@@ -90,3 +115,42 @@ async def route_to_agent(agent_name: str, message: str, thread_id: str, graph_wi
         "thread_id": thread_id
     }
 
+
+async def stream_to_agent(agent_name: str, message: str, thread_id: str, graph_with_memory, founder_id: Optional[str] = None):
+    """
+    Route directly to specified agent and stream its output as frames
+    
+    Args:
+        agent_name: Name of the agent to route to
+        message: User message
+        thread_id: Conversation thread ID
+        graph_with_memory: Compiled graph with memory (for memory access)
+        founder_id: Founder the thread belongs to (optional)
+    
+    Yields:
+        Stream frames (see streaming.py)
+    """
+    config, agent_state = await _load_agent_state(agent_name, message, thread_id, graph_with_memory, founder_id)
+    
+    # Wrap the node so its LLM calls report streaming events
+    agent_runnable = RunnableLambda(AGENT_NODES[agent_name], name=agent_name)
+    
+    yield make_frame("routing", thread_id, agent_name, next=agent_name, mode="direct")
+    yield make_frame("start", thread_id, agent_name)
+    
+    result = {}
+    async for event in agent_runnable.astream_events(agent_state, version="v2"):
+        if event["event"] == "on_chain_end" and not event.get("parent_ids"):
+            result = event["data"].get("output") or {}
+            continue
+        frame = translate_event(event, thread_id, agent_name)
+        if frame:
+            yield frame
+    
+    await _save_agent_result(config, result, graph_with_memory, agent_state.get("founder_id"))
+    
+    messages = result.get("messages", [])
+    last_message = messages[-1] if messages else None
+    response_text = last_message.content if last_message else "No response generated"
+    
+    yield make_frame("end", thread_id, agent_name, response=response_text)
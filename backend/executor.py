@@ -0,0 +1,248 @@
+"""
+Tool-calling executor for FounderOS agents
+
+Runs the model/tool loop shared by the search agents:
+- The model may call tools for several rounds; each round's calls run concurrently
+- The loop stops as soon as the model answers without tool calls
+- A max-iteration count and a wall-clock budget bound the latency; when either
+  runs out, the model is asked for a final answer without tools
+- Search results are compacted before they enter the prompt (compaction.py)
+- Every dispatched call is announced as a "tool_call" custom event, which the
+  stream turns into a tool_call frame (handlers such as the pooled search
+  client are not LangChain tools, so no on_tool_start event fires for them)
+- Per-round latency is recorded for /stats
+"""
+
+import json
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+from langchain_core.callbacks import adispatch_custom_event
+from langchain_core.messages import BaseMessage, ToolMessage
+
+from llm import get_agent_llm, get_agent_llm_with_tools
+from tools import get_search_client, gather_tool_calls, TOOL_CALL_TIMEOUT
+from search_cache import cached_search
+from compaction import format_tool_result
+
+
+AGENT_MAX_TOOL_ROUNDS = int(os.getenv("AGENT_MAX_TOOL_ROUNDS", "3"))
+AGENT_TOOL_TIME_BUDGET = float(os.getenv("AGENT_TOOL_TIME_BUDGET", "45"))
+
+# Tool handler: takes the parsed call arguments, returns the tool result
+ToolHandler = Callable[[Dict[str, Any]], Awaitable[Any]]
+
+
+def parse_tool_call(tool_call: Any) -> Tuple[Optional[str], Dict[str, Any], Optional[str]]:
+    """
+    Normalize a tool call from the model response
+
+    Args:
+        tool_call: LangChain tool call dict, OpenAI-style function call dict or object
+
+    Returns:
+        (tool name, arguments, tool call id)
+    """
+    if isinstance(tool_call, dict):
+        tool_name = tool_call.get("name") or tool_call.get("function", {}).get("name")
+        tool_args = tool_call.get("args") or tool_call.get("function", {}).get("arguments", {})
+        tool_id = tool_call.get("id") or tool_call.get("function", {}).get("name")
+    else:
+        tool_name = getattr(tool_call, "name", None)
+        tool_args = getattr(tool_call, "args", {})
+        tool_id = getattr(tool_call, "id", None)
+
+    # Arguments may arrive as a JSON string
+    if isinstance(tool_args, str):
+        try:
+            tool_args = json.loads(tool_args)
+        except ValueError:
+            tool_args = {"query": tool_args}
+
+    return tool_name, tool_args or {}, tool_id
+
+
+def search_handler(search_tool, domain: str) -> ToolHandler:
+    """
+    Handler that runs searches through the search cache and the pooled client
+
+    Args:
+        search_tool: LangChain search tool (fallback when no pooled client is available)
+        domain: Search cache domain ("grants", "market", ...)
+    """
+    async def handle(tool_args: Dict[str, Any]) -> Any:
+        return await cached_search(get_search_client() or search_tool, tool_args, domain)
+    return handle
+
+
+class ExecutorStats:
+    """Aggregate executor metrics per agent"""
+
+    def __init__(self):
+        self.agents: Dict[str, Dict[str, Any]] = {}
+
+    def record(self, agent: str, rounds: List[Dict[str, Any]], stop_reason: str, total_ms: float):
+        entry = self.agents.setdefault(agent, {
+            "runs": 0,
+            "rounds": 0,
+            "tool_calls": 0,
+            "llm_ms": 0.0,
+            "tool_ms": 0.0,
+            "total_ms": 0.0,
+            "stop_reasons": {},
+        })
+        entry["runs"] += 1
+        entry["rounds"] += len(rounds)
+        entry["tool_calls"] += sum(r["tool_calls"] for r in rounds)
+        entry["llm_ms"] += sum(r["llm_ms"] for r in rounds)
+        entry["tool_ms"] += sum(r["tool_ms"] for r in rounds)
+        entry["total_ms"] += total_ms
+        entry["stop_reasons"][stop_reason] = entry["stop_reasons"].get(stop_reason, 0) + 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        result = {}
+        for agent, entry in self.agents.items():
+            runs = entry["runs"] or 1
+            rounds = entry["rounds"] or 1
+            result[agent] = {
+                "runs": entry["runs"],
+                "avg_rounds": round(entry["rounds"] / runs, 2),
+                "avg_tool_calls": round(entry["tool_calls"] / runs, 2),
+                "avg_round_llm_ms": round(entry["llm_ms"] / rounds, 1),
+                "avg_round_tool_ms": round(entry["tool_ms"] / rounds, 1),
+                "avg_total_ms": round(entry["total_ms"] / runs, 1),
+                "stop_reasons": dict(entry["stop_reasons"]),
+            }
+        return result
+
+
+executor_stats = ExecutorStats()
+
+
+class AgentExecutor:
+    """
+    Iterative tool-calling loop for one agent
+
+    Args:
+        agent_name: Agent node name (for metrics)
+        tools: Tools bound to the model
+        handlers: Optional handler per tool name (defaults to tool.ainvoke)
+        max_iterations: Maximum tool rounds before a forced final answer
+        time_budget: Wall-clock budget in seconds for the whole loop
+        tool_timeout: Per-call timeout in seconds
+    """
+
+    def __init__(
+        self,
+        agent_name: str,
+        tools: Sequence[Any],
+        handlers: Optional[Dict[str, ToolHandler]] = None,
+        max_iterations: int = AGENT_MAX_TOOL_ROUNDS,
+        time_budget: float = AGENT_TOOL_TIME_BUDGET,
+        tool_timeout: float = TOOL_CALL_TIMEOUT
+    ):
+        self.agent_name = agent_name
+        self.tools = [tool for tool in tools if tool is not None]
+        self.handlers: Dict[str, ToolHandler] = {tool.name: tool.ainvoke for tool in self.tools}
+        self.handlers.update(handlers or {})
+        self.max_iterations = max_iterations
+        self.time_budget = time_budget
+        self.tool_timeout = tool_timeout
+
+    def _tool_call_factory(self, tool_name: Optional[str], tool_args: Dict[str, Any]):
+        handler = self.handlers.get(tool_name)
+        if handler is None:
+            async def unknown():
+                return f"Error: unknown tool '{tool_name}'"
+            return unknown
+        return lambda: handler(tool_args)
+
+    async def _announce_tool_calls(self, parsed_calls: List[Tuple[Optional[str], Dict[str, Any], Optional[str]]]):
+        for tool_name, tool_args, _ in parsed_calls:
+            try:
+                await adispatch_custom_event("tool_call", {"name": tool_name, "args": tool_args})
+            except RuntimeError:
+                # Called outside a runnable (no parent run to attach the event to)
+                return
+
+    async def run(self, messages: List[BaseMessage]) -> Tuple[str, List[Dict[str, Any]]]:
+        """
+        Run the loop until the model answers or the budget runs out
+
+        Args:
+            messages: Prompt messages (system prompt + history)
+
+        Returns:
+            (final answer text, per-round metrics)
+        """
+        llm = get_agent_llm(agent=self.agent_name)
+        llm_with_tools = get_agent_llm_with_tools(self.tools, agent=self.agent_name) if self.tools else llm
+        messages = list(messages)
+        rounds: List[Dict[str, Any]] = []
+        started = time.perf_counter()
+        stop_reason = "max_iterations"
+
+        for iteration in range(self.max_iterations):
+            round_started = time.perf_counter()
+            response = await llm_with_tools.ainvoke(messages)
+            llm_ms = (time.perf_counter() - round_started) * 1000
+
+            tool_calls = getattr(response, "tool_calls", []) or response.additional_kwargs.get("tool_calls", [])
+            if not tool_calls:
+                rounds.append({"round": iteration + 1, "llm_ms": round(llm_ms, 1), "tool_ms": 0.0, "tool_calls": 0})
+                self._record(rounds, "answered", started)
+                return response.content, rounds
+
+            remaining = self.time_budget - (time.perf_counter() - started)
+            if remaining <= 0:
+                rounds.append({"round": iteration + 1, "llm_ms": round(llm_ms, 1), "tool_ms": 0.0, "tool_calls": 0})
+                stop_reason = "time_budget"
+                break
+
+            # Independent calls of one round run concurrently
+            parsed_calls = [parse_tool_call(tool_call) for tool_call in tool_calls]
+            await self._announce_tool_calls(parsed_calls)
+            tool_started = time.perf_counter()
+            results = await gather_tool_calls(
+                [self._tool_call_factory(tool_name, tool_args) for tool_name, tool_args, _ in parsed_calls],
+                timeout=min(self.tool_timeout, remaining)
+            )
+            tool_ms = (time.perf_counter() - tool_started) * 1000
+
+            messages.append(response)
+            # Search results are deduplicated, stripped and trimmed to the relevant passages
+            messages.extend(
+                ToolMessage(content=format_tool_result(result, tool_args), tool_call_id=tool_id or tool_name or "tool")
+                for (tool_name, tool_args, tool_id), result in zip(parsed_calls, results)
+            )
+            rounds.append({
+                "round": iteration + 1,
+                "llm_ms": round(llm_ms, 1),
+                "tool_ms": round(tool_ms, 1),
+                "tool_calls": len(parsed_calls),
+            })
+
+            if time.perf_counter() - started >= self.time_budget:
+                stop_reason = "time_budget"
+                break
+
+        # Out of rounds or time: answer with what has been gathered so far
+        final_started = time.perf_counter()
+        final_response = await llm.ainvoke(messages)
+        rounds.append({
+            "round": len(rounds) + 1,
+            "llm_ms": round((time.perf_counter() - final_started) * 1000, 1),
+            "tool_ms": 0.0,
+            "tool_calls": 0,
+        })
+        self._record(rounds, stop_reason, started)
+        return final_response.content, rounds
+
+    def _record(self, rounds: List[Dict[str, Any]], stop_reason: str, started: float):
+        total_ms = (time.perf_counter() - started) * 1000
+        executor_stats.record(self.agent_name, rounds, stop_reason, total_ms)
+
+
+def get_executor_stats() -> Dict[str, Any]:
+    """Executor metrics per agent"""
+    return executor_stats.snapshot()
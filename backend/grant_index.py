@@ -0,0 +1,506 @@
+"""
+Local grant-notice catalog for GrantHunter
+
+Structured grant notices (program, agency, deadline, stage, industry, amount)
+are kept in SQLite with an FTS5 index. An incremental ingestion job pulls
+notices from pluggable sources:
+- FileGrantSource: a local JSON file (data/grant_notices.json is sample data
+  for local testing, not a real notice list)
+- HTTPGrantSource: a JSON feed, fetched with ETag / Last-Modified so unchanged
+  feeds cost a 304
+
+No source is configured by default. Only remote (HTTP) fetches count towards
+freshness, so file-only catalogs are always stale. grant_hunter_node skips
+web search only when a fresh catalog has full-text matches for the question.
+
+Usage:
+    python grant_index.py ingest [--source PATH_OR_URL ...]
+    python grant_index.py search "예비창업패키지 마감"
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from dataclasses import dataclass
+from datetime import date
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+
+_BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_GRANT_INDEX_PATH = os.path.join(_BACKEND_DIR, "data", "grant_index.sqlite")
+DEFAULT_GRANT_FIXTURE_PATH = os.path.join(_BACKEND_DIR, "data", "grant_notices.json")
+
+GRANT_INDEX_ENABLED = os.getenv("GRANT_INDEX_ENABLED", "true").lower() == "true"
+GRANT_INDEX_PATH = os.getenv("GRANT_INDEX_PATH", DEFAULT_GRANT_INDEX_PATH)
+# Comma-separated file paths or http(s) URLs (empty = no catalog, web search only)
+GRANT_SOURCES = os.getenv("GRANT_SOURCES", "")
+# Catalog older than this (seconds since the last successful remote fetch) is stale
+GRANT_INDEX_MAX_AGE = float(os.getenv("GRANT_INDEX_MAX_AGE", str(24 * 3600)))
+GRANT_INDEX_LIMIT = int(os.getenv("GRANT_INDEX_LIMIT", "5"))
+# Background ingestion interval in seconds (conditional fetches make this cheap)
+GRANT_INDEX_REFRESH_INTERVAL = float(os.getenv("GRANT_INDEX_REFRESH_INTERVAL", str(6 * 3600)))
+
+# Structured fields of a notice; list fields are stored as JSON
+NOTICE_FIELDS = ("program", "agency", "deadline", "stage", "industry", "region", "amount", "amount_krw", "url", "summary", "eligibility")
+LIST_FIELDS = ("stage", "industry", "region")
+
+# Korean particles / endings stripped from query tokens ("패키지에서" -> "패키지")
+_KO_SUFFIXES = sorted([
+    "으로는", "에서는", "에게서", "이라고", "인데요", "있나요", "할까요", "입니다", "해줘",
+    "에서", "으로", "에게", "까지", "부터", "처럼", "보다", "인데", "이나", "이랑", "하고", "나요", "은요", "는요",
+    "은", "는", "이", "가", "을", "를", "에", "의", "로", "와", "과", "도", "만", "요",
+], key=len, reverse=True)
+_TOKEN_RE = re.compile(r"[\w]+")
+
+
+@dataclass
+class FetchResult:
+    """Result of fetching a grant source"""
+    notices: Optional[List[Dict[str, Any]]]  # None when the source was not modified
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+
+class GrantSource:
+    """Base class for grant notice sources"""
+
+    name: str = "source"
+
+    def fetch(self, etag: Optional[str] = None, last_modified: Optional[str] = None) -> FetchResult:
+        """
+        Fetch all notices, or None notices if unchanged since (etag, last_modified)
+
+        Args:
+            etag: ETag of the last successful fetch
+            last_modified: Last-Modified of the last successful fetch
+
+        Returns:
+            FetchResult
+        """
+        raise NotImplementedError
+
+
+def _parse_notices(payload: Any) -> List[Dict[str, Any]]:
+    # A feed is either a list of notices or {"items": [...]}
+    if isinstance(payload, dict):
+        payload = payload.get("items", [])
+    return [item for item in payload if isinstance(item, dict)]
+
+
+class FileGrantSource(GrantSource):
+    """JSON file source; the content hash stands in for an ETag"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.name = f"file:{os.path.abspath(path)}"
+
+    def fetch(self, etag: Optional[str] = None, last_modified: Optional[str] = None) -> FetchResult:
+        with open(self.path, "rb") as f:
+            raw = f.read()
+        digest = hashlib.sha256(raw).hexdigest()
+        mtime = str(os.path.getmtime(self.path))
+        if etag == digest:
+            return FetchResult(notices=None, etag=digest, last_modified=mtime)
+        return FetchResult(notices=_parse_notices(json.loads(raw.decode("utf-8"))), etag=digest, last_modified=mtime)
+
+
+class HTTPGrantSource(GrantSource):
+    """JSON feed over HTTP with conditional requests"""
+
+    def __init__(self, url: str, timeout: float = 15.0):
+        self.url = url
+        self.timeout = timeout
+        self.name = url
+
+    def fetch(self, etag: Optional[str] = None, last_modified: Optional[str] = None) -> FetchResult:
+        import httpx
+
+        headers = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+        response = httpx.get(self.url, headers=headers, timeout=self.timeout, follow_redirects=True)
+        if response.status_code == 304:
+            return FetchResult(notices=None, etag=etag, last_modified=last_modified)
+        response.raise_for_status()
+        return FetchResult(
+            notices=_parse_notices(response.json()),
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified")
+        )
+
+
+def make_source(spec: str) -> GrantSource:
+    """Source for a file path or http(s) URL"""
+    if spec.startswith(("http://", "https://")):
+        return HTTPGrantSource(spec)
+    return FileGrantSource(spec)
+
+
+def get_configured_sources() -> List[GrantSource]:
+    """Sources from GRANT_SOURCES"""
+    return [make_source(spec.strip()) for spec in GRANT_SOURCES.split(",") if spec.strip()]
+
+
+def normalize_notice(item: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Validate and normalize a raw notice
+
+    Returns:
+        Notice dict with all NOTICE_FIELDS plus "id", or None if unusable
+    """
+    program = (item.get("program") or "").strip()
+    if not program:
+        return None
+    notice = {"id": str(item.get("id") or hashlib.sha1(f"{program}|{item.get('agency', '')}".encode("utf-8")).hexdigest()[:16])}
+    for field in NOTICE_FIELDS:
+        value = item.get(field)
+        if field in LIST_FIELDS:
+            if isinstance(value, str):
+                value = [part.strip() for part in value.split(",") if part.strip()]
+            value = list(value or [])
+        elif field == "eligibility":
+            value = dict(value or {})
+        elif field == "amount_krw":
+            value = int(value) if value not in (None, "") else None
+        else:
+            value = (str(value).strip() if value is not None else "")
+        notice[field] = value
+    return notice
+
+
+def _content_hash(notice: Dict[str, Any]) -> str:
+    return hashlib.sha256(json.dumps(notice, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+def query_terms(text: str, min_length: int = 3) -> List[str]:
+    """
+    Search terms from a free-form question
+
+    Tokens are NFKC-normalized and lowercased; common Korean particles are
+    stripped. Terms shorter than `min_length` characters are dropped (the
+    trigram index cannot match fewer than 3).
+    """
+    terms = []
+    for token in _TOKEN_RE.findall(unicodedata.normalize("NFKC", text or "").lower()):
+        for suffix in _KO_SUFFIXES:
+            if len(token) > len(suffix) + 1 and token.endswith(suffix):
+                token = token[:-len(suffix)]
+                break
+        if len(token) >= min_length and token not in terms:
+            terms.append(token)
+    return terms
+
+
+class GrantIndex:
+    """
+    SQLite + FTS5 catalog of grant notices
+
+    Args:
+        path: SQLite file path
+    """
+
+    def __init__(self, path: str = GRANT_INDEX_PATH):
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self.version = 0  # bumped on every change, used by dependent caches
+        self.lookups = 0
+        self.hits = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS grants (
+                    id TEXT PRIMARY KEY,
+                    program TEXT NOT NULL,
+                    agency TEXT,
+                    deadline TEXT,
+                    stage TEXT,
+                    industry TEXT,
+                    region TEXT,
+                    amount TEXT,
+                    amount_krw INTEGER,
+                    url TEXT,
+                    summary TEXT,
+                    eligibility TEXT,
+                    source TEXT NOT NULL,
+                    content_hash TEXT NOT NULL,
+                    updated_at REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_grants_source ON grants (source);
+                CREATE TABLE IF NOT EXISTS grant_sources (
+                    name TEXT PRIMARY KEY,
+                    etag TEXT,
+                    last_modified TEXT,
+                    fetched_at REAL,
+                    status TEXT
+                );
+                """
+            )
+            try:
+                # Trigram tokenizer matches Korean compounds by substring ("창업패키지")
+                conn.execute("CREATE VIRTUAL TABLE IF NOT EXISTS grants_fts USING fts5(id UNINDEXED, program, agency, industry, summary, tokenize='trigram')")
+            except sqlite3.OperationalError:
+                conn.execute("CREATE VIRTUAL TABLE IF NOT EXISTS grants_fts USING fts5(id UNINDEXED, program, agency, industry, summary)")
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    # ------------------------------------------------------------------ ingestion
+
+    def _upsert(self, conn: sqlite3.Connection, notice: Dict[str, Any], source: str, content_hash: str):
+        row = [notice["id"]] + [
+            json.dumps(notice[field], ensure_ascii=False) if field in LIST_FIELDS or field == "eligibility" else notice[field]
+            for field in NOTICE_FIELDS
+        ] + [source, content_hash, time.time()]
+        conn.execute(
+            f"INSERT OR REPLACE INTO grants (id, {', '.join(NOTICE_FIELDS)}, source, content_hash, updated_at) "
+            f"VALUES ({', '.join('?' * (len(NOTICE_FIELDS) + 4))})",
+            row
+        )
+        conn.execute("DELETE FROM grants_fts WHERE id = ?", (notice["id"],))
+        conn.execute(
+            "INSERT INTO grants_fts (id, program, agency, industry, summary) VALUES (?, ?, ?, ?, ?)",
+            (notice["id"], notice["program"], notice["agency"], " ".join(notice["industry"]), notice["summary"])
+        )
+
+    def ingest_source(self, source: GrantSource) -> Dict[str, Any]:
+        """
+        Incrementally ingest one source
+
+        Unchanged feeds (ETag/Last-Modified) are skipped; otherwise only notices
+        whose content changed are rewritten, and notices the source no longer
+        lists are removed.
+
+        Returns:
+            Counters: status, inserted, updated, unchanged, removed
+        """
+        with self._lock:
+            conn = self._connect()
+            state = conn.execute("SELECT etag, last_modified FROM grant_sources WHERE name = ?", (source.name,)).fetchone()
+
+        try:
+            result = source.fetch(state["etag"] if state else None, state["last_modified"] if state else None)
+        except Exception as e:
+            with self._lock:
+                conn.execute(
+                    "INSERT INTO grant_sources (name, status) VALUES (?, ?) ON CONFLICT(name) DO UPDATE SET status = excluded.status",
+                    (source.name, f"error: {e}")
+                )
+                conn.commit()
+            return {"source": source.name, "status": "error", "error": str(e)}
+
+        counters = {"source": source.name, "status": "not_modified", "inserted": 0, "updated": 0, "unchanged": 0, "removed": 0}
+        with self._lock:
+            if result.notices is not None:
+                counters["status"] = "ingested"
+                existing = {
+                    row["id"]: row["content_hash"]
+                    for row in conn.execute("SELECT id, content_hash FROM grants WHERE source = ?", (source.name,))
+                }
+                seen = set()
+                for item in result.notices:
+                    notice = normalize_notice(item)
+                    if notice is None:
+                        continue
+                    seen.add(notice["id"])
+                    content_hash = _content_hash(notice)
+                    if existing.get(notice["id"]) == content_hash:
+                        counters["unchanged"] += 1
+                        continue
+                    counters["updated" if notice["id"] in existing else "inserted"] += 1
+                    self._upsert(conn, notice, source.name, content_hash)
+                for stale_id in set(existing) - seen:
+                    conn.execute("DELETE FROM grants WHERE id = ?", (stale_id,))
+                    conn.execute("DELETE FROM grants_fts WHERE id = ?", (stale_id,))
+                    counters["removed"] += 1
+                if counters["inserted"] or counters["updated"] or counters["removed"]:
+                    self.version += 1
+
+            conn.execute(
+                "INSERT OR REPLACE INTO grant_sources (name, etag, last_modified, fetched_at, status) VALUES (?, ?, ?, ?, ?)",
+                (source.name, result.etag, result.last_modified, time.time(), counters["status"])
+            )
+            conn.commit()
+        return counters
+
+    def ingest(self, sources: Optional[Iterable[GrantSource]] = None) -> List[Dict[str, Any]]:
+        """Ingest all configured sources"""
+        return [self.ingest_source(source) for source in (sources if sources is not None else get_configured_sources())]
+
+    # ------------------------------------------------------------------ queries
+
+    def _row_to_notice(self, row: sqlite3.Row) -> Dict[str, Any]:
+        notice = {"id": row["id"]}
+        for field in NOTICE_FIELDS:
+            value = row[field]
+            notice[field] = json.loads(value) if (field in LIST_FIELDS or field == "eligibility") and value else value
+        return notice
+
+    def search(self, text: str, limit: int = GRANT_INDEX_LIMIT, include_closed: bool = False) -> List[Dict[str, Any]]:
+        """
+        Full-text search over open notices, best match first
+
+        Args:
+            text: Free-form question or keywords
+            limit: Maximum results
+            include_closed: Also return notices past their deadline
+
+        Returns:
+            Notice dicts
+        """
+        terms = query_terms(text)
+        if not terms:
+            return []
+        match = " OR ".join('"{}"'.format(term.replace('"', '""')) for term in terms)
+        today = date.today().isoformat()
+        with self._lock:
+            conn = self._connect()
+            rows = conn.execute(
+                """
+                SELECT g.* FROM grants_fts f JOIN grants g ON g.id = f.id
+                WHERE grants_fts MATCH ? AND (? OR g.deadline = '' OR g.deadline >= ?)
+                ORDER BY bm25(grants_fts, 0.0, 10.0, 2.0, 2.0, 1.0) LIMIT ?
+                """,
+                (match, int(include_closed), today, limit)
+            ).fetchall()
+        return [self._row_to_notice(row) for row in rows]
+
+    def all_notices(self, include_closed: bool = False) -> List[Dict[str, Any]]:
+        """Every notice in the catalog"""
+        today = date.today().isoformat()
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT * FROM grants WHERE ? OR deadline = '' OR deadline >= ? ORDER BY deadline",
+                (int(include_closed), today)
+            ).fetchall()
+        return [self._row_to_notice(row) for row in rows]
+
+    def last_fetched_at(self) -> Optional[float]:
+        """Time of the most recent successful remote fetch (file sources never make the catalog fresh)"""
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT MAX(fetched_at) AS fetched_at FROM grant_sources "
+                "WHERE status IN ('ingested', 'not_modified') AND (name LIKE 'http://%' OR name LIKE 'https://%')"
+            ).fetchone()
+        return row["fetched_at"] if row else None
+
+    def is_stale(self) -> bool:
+        """True when no remote source was fetched successfully within GRANT_INDEX_MAX_AGE"""
+        fetched_at = self.last_fetched_at()
+        return fetched_at is None or time.time() - fetched_at > GRANT_INDEX_MAX_AGE
+
+    def lookup(self, text: str, limit: int = GRANT_INDEX_LIMIT) -> Tuple[List[Dict[str, Any]], bool]:
+        """
+        Index lookup for grant_hunter_node
+
+        Returns:
+            (matching open notices, whether the catalog is fresh)
+        """
+        notices = self.search(text, limit=limit)
+        self.lookups += 1
+        if notices:
+            self.hits += 1
+        return notices, not self.is_stale()
+
+    def stats(self) -> Dict[str, Any]:
+        """Catalog size, sources and lookup hit rate"""
+        with self._lock:
+            conn = self._connect()
+            count = conn.execute("SELECT COUNT(*) FROM grants").fetchone()[0]
+            sources = [dict(row) for row in conn.execute("SELECT name, fetched_at, status FROM grant_sources")]
+        return {
+            "enabled": GRANT_INDEX_ENABLED,
+            "notices": count,
+            "sources": sources,
+            "stale": self.is_stale(),
+            "lookups": self.lookups,
+            "hits": self.hits,
+            "hit_rate": round(self.hits / self.lookups, 4) if self.lookups else 0.0,
+        }
+
+
+def format_notices(notices: List[Dict[str, Any]]) -> str:
+    """Compact text block of notices for the agent prompt"""
+    lines = []
+    for index, notice in enumerate(notices, 1):
+        lines.append(
+            f"{index}. {notice['program']} ({notice['agency']})\n"
+            f"   - 마감: {notice['deadline'] or '상시'} | 지원규모: {notice['amount']}\n"
+            f"   - 대상 단계: {', '.join(notice['stage'])} | 분야: {', '.join(notice['industry'])} | 지역: {', '.join(notice['region'])}\n"
+            f"   - {notice['summary']}\n"
+            f"   - {notice['url']}"
+        )
+    return "\n".join(lines)
+
+
+# Shared index instance
+grant_index = GrantIndex()
+
+
+def _ingest_configured_sources() -> List[Dict[str, Any]]:
+    results = grant_index.ingest()
+    for result in results:
+        if result["status"] != "not_modified":
+            print(f"Grant index ingest: {result}")
+    return results
+
+
+async def run_grant_index_refresher(interval: float = GRANT_INDEX_REFRESH_INTERVAL):
+    """
+    Ingest the configured sources now and then every `interval` seconds
+
+    Runs as a background task for the lifetime of the app.
+    """
+    while True:
+        try:
+            await asyncio.to_thread(_ingest_configured_sources)
+        except Exception as e:
+            print(f"Grant index refresh failed: {e}")
+        await asyncio.sleep(interval)
+
+
+def get_grant_index_stats() -> Dict[str, Any]:
+    """Grant index statistics"""
+    return grant_index.stats()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="FounderOS grant index")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    ingest_parser = subparsers.add_parser("ingest", help="Ingest grant sources into the index")
+    ingest_parser.add_argument("--source", action="append", help=f"File path or http(s) URL (default: GRANT_SOURCES; sample data: {DEFAULT_GRANT_FIXTURE_PATH})")
+    ingest_parser.add_argument("--index", default=GRANT_INDEX_PATH, help="SQLite index path")
+
+    search_parser = subparsers.add_parser("search", help="Search the index")
+    search_parser.add_argument("query")
+    search_parser.add_argument("--index", default=GRANT_INDEX_PATH, help="SQLite index path")
+    search_parser.add_argument("--limit", type=int, default=GRANT_INDEX_LIMIT)
+
+    args = parser.parse_args()
+    index = GrantIndex(args.index)
+    if args.command == "ingest":
+        sources = [make_source(spec) for spec in args.source] if args.source else None
+        for result in index.ingest(sources):
+            print(json.dumps(result, ensure_ascii=False))
+    else:
+        print(format_notices(index.search(args.query, limit=args.limit)) or "(no matches)")
+
+
+if __name__ == "__main__":
+    main()
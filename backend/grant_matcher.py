@@ -0,0 +1,358 @@
+"""
+Deterministic grant eligibility matcher
+
+Eligibility rules of every program in the local catalog are encoded as
+columnar NumPy arrays (stage/industry/region masks, company-age and
+founder-age bounds, deadlines, amounts). A founder profile is scored
+against all programs at once; the top matches come back with the reasons
+they matched, so the LLM only has to write them up.
+"""
+
+import re
+import threading
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from grant_index import GrantIndex, grant_index
+
+
+STAGES = ["pre", "early", "growth", "restart"]
+STAGE_LABELS = {"pre": "예비창업", "early": "초기(3년 이내)", "growth": "도약기(3~7년)", "restart": "재창업"}
+
+REGIONS = ["서울", "부산", "대구", "인천", "광주", "대전", "울산", "세종", "경기", "강원", "충북", "충남", "전북", "전남", "경북", "경남", "제주"]
+CAPITAL_REGIONS = {"서울", "경기", "인천"}
+NATIONWIDE = "전국"
+NON_CAPITAL = "비수도권"
+
+# Industry codes used in the catalog, with the words that indicate them in a message
+INDUSTRY_KEYWORDS: Dict[str, List[str]] = {
+    "ai": ["ai", "인공지능", "머신러닝", "딥러닝", "llm", "생성형"],
+    "software": ["saas", "소프트웨어", "플랫폼", "앱", "웹서비스"],
+    "data": ["데이터", "빅데이터"],
+    "fintech": ["핀테크", "금융", "결제"],
+    "bio": ["바이오", "헬스케어", "의료", "디지털헬스"],
+    "hardware": ["하드웨어", "로봇", "iot", "디바이스", "드론"],
+    "manufacturing": ["제조", "공장", "소재", "부품"],
+    "environment": ["친환경", "탄소", "환경기술", "환경 기술", "에너지", "재활용", "기후"],
+    "content": ["콘텐츠", "미디어", "웹툰", "게임", "영상"],
+    "tourism": ["관광", "여행", "숙박"],
+    "food": ["푸드", "식품", "음식", "카페", "외식"],
+    "local": ["로컬", "지역기반", "지역 기반", "지역특화", "지역 특화", "골목"],
+}
+ALL_INDUSTRIES = "all"
+
+# Industry words; Latin ones ("ai", "iot") only as whole words, not inside "said" / "maintain"
+_INDUSTRY_PATTERNS = {
+    industry: re.compile("|".join(
+        re.escape(word) if re.search(r"[^\x00-\x7f]", word) else rf"(?<![a-z0-9]){re.escape(word)}(?![a-z0-9])"
+        for word in words
+    ))
+    for industry, words in INDUSTRY_KEYWORDS.items()
+}
+
+# Region names need context too: "부산물" or "전남편" is not a region, and "경기" is also
+# the everyday word for the economy ("경기가 안 좋아서"), so it only counts as
+# 경기도 / 경기 지역 / 경기 소재
+REGION_FULL_NAMES = {
+    "서울": ["서울특별시"], "부산": ["부산광역시"], "대구": ["대구광역시"], "인천": ["인천광역시"],
+    "광주": ["광주광역시"], "대전": ["대전광역시"], "울산": ["울산광역시"], "세종": ["세종특별자치시"],
+    "경기": [], "강원": ["강원특별자치도", "강원도"], "충북": ["충청북도"], "충남": ["충청남도"],
+    "전북": ["전북특별자치도", "전라북도"], "전남": ["전라남도"], "경북": ["경상북도"], "경남": ["경상남도"],
+    "제주": ["제주특별자치도", "제주도"],
+}
+_REGION_PARTICLE = r"(?:에서|에|의|로|으로|은|는|이|가|도)?(?![가-힣])"
+# "경기도 안 좋고" still reads as "the economy is bad too"
+_ECONOMY_PREDICATE = r"(?!\s*(?:안\s|안좋|좋|나쁘|어렵|힘들|침체|불황|회복))"
+
+
+def _region_pattern(region: str) -> re.Pattern:
+    if region == "경기":
+        return re.compile(rf"경기(?:도|\s*지역|\s*소재|권){_REGION_PARTICLE}{_ECONOMY_PREDICATE}")
+    names = "|".join(REGION_FULL_NAMES[region] + [f"{region}시", region])
+    return re.compile(rf"(?:{names})(?:\s*(?:지역|소재|권))?{_REGION_PARTICLE}")
+
+
+_REGION_PATTERNS = {region: _region_pattern(region) for region in REGIONS}
+
+# Founder age needs context: "만 34세", "나이는 34", or a first-person clause ("저는 34살 개발자")
+_AGE_RE = re.compile(r"만\s*(\d{2})\s*(?:세|살)|나이\s*(?:는|가|:)?\s*(?:만\s*)?(\d{2})(?!\d)")
+_SUBJECT_AGE_RE = re.compile(r"^\s*(?:저는|나는|제가|내가|전|난|본인은)\s.*?(?<!\d)(\d{2})\s*(?:세|살)")
+_CLAUSE_SPLIT_RE = re.compile(r"[.,!?;\n]")
+FOUNDER_AGE_RANGE = (19, 79)
+_COMPANY_AGE_RE = re.compile(r"(?:업력|창업|설립|개업)\s*(\d{1,2})\s*년")
+_COMPANY_YEAR_RE = re.compile(r"(\d{1,2})\s*년\s*차")
+
+
+@dataclass
+class FounderProfile:
+    """Founder attributes used for eligibility; None means unknown"""
+    stage: Optional[str] = None
+    industries: List[str] = field(default_factory=list)
+    region: Optional[str] = None
+    company_age_years: Optional[float] = None
+    founder_age: Optional[int] = None
+
+    def is_empty(self) -> bool:
+        return (
+            self.stage is None and not self.industries and self.region is None
+            and self.company_age_years is None and self.founder_age is None
+        )
+
+
+def extract_profile(text: str) -> FounderProfile:
+    """
+    Best-effort founder profile from conversation text
+
+    Args:
+        text: User messages joined together
+
+    Returns:
+        FounderProfile (fields not mentioned stay unknown)
+    """
+    lowered = (text or "").lower()
+    profile = FounderProfile()
+
+    match = _COMPANY_AGE_RE.search(lowered) or _COMPANY_YEAR_RE.search(lowered)
+    if match:
+        profile.company_age_years = float(match.group(1))
+
+    if any(word in lowered for word in ("재창업", "재도전", "폐업")):
+        profile.stage = "restart"
+    elif any(word in lowered for word in ("예비창업", "예비 창업", "사업자 없", "사업자등록 전", "아직 창업 전")):
+        profile.stage = "pre"
+        profile.company_age_years = 0.0
+    elif profile.company_age_years is not None:
+        profile.stage = "early" if profile.company_age_years <= 3 else "growth"
+
+    profile.founder_age = extract_founder_age(lowered)
+
+    profile.region = next((region for region in REGIONS if _REGION_PATTERNS[region].search(lowered)), None)
+    profile.industries = [industry for industry, pattern in _INDUSTRY_PATTERNS.items() if pattern.search(lowered)]
+    return profile
+
+
+def extract_founder_age(text: str) -> Optional[int]:
+    """
+    Founder age from an explicit mention, else None
+
+    Only "만 NN세", "나이 NN" or an age in a first-person clause counts, so
+    "직원 12살 아들" is not read as the founder's age. Ages outside
+    FOUNDER_AGE_RANGE are ignored.
+    """
+    for clause in _CLAUSE_SPLIT_RE.split(text or ""):
+        for match in [_AGE_RE.search(clause), _SUBJECT_AGE_RE.search(clause)]:
+            if match:
+                age = int(next(group for group in match.groups() if group))
+                if FOUNDER_AGE_RANGE[0] <= age <= FOUNDER_AGE_RANGE[1]:
+                    return age
+    return None
+
+
+class GrantMatrix:
+    """
+    Columnar encoding of catalog eligibility rules
+
+    Args:
+        notices: Notices from GrantIndex.all_notices()
+    """
+
+    def __init__(self, notices: List[Dict[str, Any]]):
+        self.notices = notices
+        n = len(notices)
+        self.industries = sorted({industry for notice in notices for industry in notice["industry"]} - {ALL_INDUSTRIES})
+        industry_pos = {industry: i for i, industry in enumerate(self.industries)}
+        region_pos = {region: i for i, region in enumerate(REGIONS)}
+
+        self.stage_mask = np.zeros((n, len(STAGES)), dtype=bool)
+        self.industry_mask = np.zeros((n, len(self.industries)), dtype=bool)
+        self.industry_all = np.zeros(n, dtype=bool)
+        self.region_mask = np.zeros((n, len(REGIONS)), dtype=bool)
+        self.min_company_age = np.full(n, -np.inf)
+        self.max_company_age = np.full(n, np.inf)
+        self.min_founder_age = np.full(n, -np.inf)
+        self.max_founder_age = np.full(n, np.inf)
+        self.deadline = np.full(n, np.inf)  # date ordinal, inf = rolling
+        self.amount = np.zeros(n)
+
+        capital = np.array([region in CAPITAL_REGIONS for region in REGIONS])
+        for i, notice in enumerate(notices):
+            stages = notice["stage"] or STAGES
+            self.stage_mask[i] = [stage in stages for stage in STAGES]
+
+            industries = notice["industry"] or [ALL_INDUSTRIES]
+            self.industry_all[i] = ALL_INDUSTRIES in industries
+            for industry in industries:
+                if industry in industry_pos:
+                    self.industry_mask[i, industry_pos[industry]] = True
+
+            regions = notice["region"] or [NATIONWIDE]
+            if NATIONWIDE in regions:
+                self.region_mask[i] = True
+            else:
+                if NON_CAPITAL in regions:
+                    self.region_mask[i] |= ~capital
+                for region in regions:
+                    if region in region_pos:
+                        self.region_mask[i, region_pos[region]] = True
+
+            rules = notice.get("eligibility") or {}
+            if rules.get("min_company_age_years") is not None:
+                self.min_company_age[i] = rules["min_company_age_years"]
+            if rules.get("max_company_age_years") is not None:
+                self.max_company_age[i] = rules["max_company_age_years"]
+            if rules.get("founder_age_min") is not None:
+                self.min_founder_age[i] = rules["founder_age_min"]
+            if rules.get("founder_age_max") is not None:
+                self.max_founder_age[i] = rules["founder_age_max"]
+
+            if notice["deadline"]:
+                try:
+                    self.deadline[i] = date.fromisoformat(notice["deadline"]).toordinal()
+                except ValueError:
+                    pass
+            self.amount[i] = notice.get("amount_krw") or 0
+
+        self.region_specific = ~self.region_mask.all(axis=1)
+        # Programs aimed at fewer stages fit a matching founder better
+        self.stage_weight = 3.0 / np.maximum(self.stage_mask.sum(axis=1), 1)
+
+    def score(self, profile: FounderProfile, today: Optional[date] = None) -> tuple:
+        """
+        Score every program against a profile
+
+        Returns:
+            (eligible mask, scores) arrays of length n
+        """
+        n = len(self.notices)
+        today_ordinal = (today or date.today()).toordinal()
+        eligible = self.deadline >= today_ordinal
+        scores = np.ones(n)
+
+        if profile.stage in STAGES:
+            stage_ok = self.stage_mask[:, STAGES.index(profile.stage)]
+            eligible &= stage_ok
+            scores += self.stage_weight * stage_ok
+
+        if profile.industries:
+            wanted = np.array([industry in profile.industries for industry in self.industries], dtype=bool)
+            specific = self.industry_mask[:, wanted].any(axis=1) if wanted.any() else np.zeros(n, dtype=bool)
+            eligible &= self.industry_all | specific
+            scores += 1.5 * specific
+
+        if profile.region in REGIONS:
+            region_ok = self.region_mask[:, REGIONS.index(profile.region)]
+            eligible &= region_ok
+            scores += 1.0 * (region_ok & self.region_specific)
+
+        if profile.company_age_years is not None:
+            eligible &= (self.min_company_age <= profile.company_age_years) & (profile.company_age_years <= self.max_company_age)
+
+        if profile.founder_age is not None:
+            age_ok = (self.min_founder_age <= profile.founder_age) & (profile.founder_age <= self.max_founder_age)
+            eligible &= age_ok
+            scores += 1.0 * (age_ok & (np.isfinite(self.min_founder_age) | np.isfinite(self.max_founder_age)))
+
+        # Larger programs and closer deadlines first among equals
+        scores += np.log10(np.maximum(self.amount, 1.0)) / 10.0
+        days_left = self.deadline - today_ordinal
+        scores += 0.5 * ((days_left >= 0) & (days_left <= 30))
+
+        return eligible, np.where(eligible, scores, -np.inf)
+
+    def reasons(self, i: int, profile: FounderProfile, today: Optional[date] = None) -> List[str]:
+        """Why program i matched (and what still needs checking)"""
+        reasons = []
+        if profile.stage in STAGES:
+            reasons.append(f"{STAGE_LABELS[profile.stage]} 단계 지원 대상")
+        if profile.industries:
+            matched = [industry for industry in profile.industries if industry in self.industries and self.industry_mask[i, self.industries.index(industry)]]
+            reasons.append(f"{', '.join(matched)} 분야 특화 사업" if matched else "업종 제한 없음")
+        if profile.region in REGIONS:
+            reasons.append(f"{profile.region} 지역 신청 가능" if self.region_specific[i] else "전국 대상")
+        if profile.stage != "pre" and profile.company_age_years is not None and np.isfinite(self.max_company_age[i]):
+            reasons.append(f"업력 {profile.company_age_years:g}년 (요건 {self.max_company_age[i]:g}년 이내)")
+        if profile.founder_age is not None and (np.isfinite(self.min_founder_age[i]) or np.isfinite(self.max_founder_age[i])):
+            reasons.append(f"대표자 만 {profile.founder_age}세 연령 요건 충족")
+        if np.isfinite(self.deadline[i]):
+            reasons.append(f"마감 D-{int(self.deadline[i] - (today or date.today()).toordinal())}")
+        else:
+            reasons.append("상시 접수")
+
+        # Rules the profile could not confirm
+        unknown = []
+        if profile.company_age_years is None and (np.isfinite(self.max_company_age[i]) or np.isfinite(self.min_company_age[i])):
+            unknown.append("업력")
+        if profile.founder_age is None and (np.isfinite(self.min_founder_age[i]) or np.isfinite(self.max_founder_age[i])):
+            unknown.append("대표자 연령")
+        if profile.region is None and self.region_specific[i]:
+            unknown.append("소재지")
+        requires = (self.notices[i].get("eligibility") or {}).get("requires")
+        if requires:
+            unknown.append(requires)
+        if unknown:
+            reasons.append(f"확인 필요: {', '.join(unknown)}")
+        return reasons
+
+    def match(self, profile: FounderProfile, limit: int = 5, today: Optional[date] = None) -> List[Dict[str, Any]]:
+        """
+        Ranked eligible programs with reasons
+
+        Returns:
+            [{"notice", "score", "reasons"}, ...] best first
+        """
+        if not self.notices:
+            return []
+        eligible, scores = self.score(profile, today)
+        count = int(eligible.sum())
+        if count == 0:
+            return []
+        top = np.argsort(-scores, kind="stable")[:min(limit, count)]
+        return [
+            {"notice": self.notices[i], "score": round(float(scores[i]), 3), "reasons": self.reasons(int(i), profile, today)}
+            for i in top
+        ]
+
+
+class GrantMatcher:
+    """Matcher over a GrantIndex, rebuilding the matrix when the catalog changes"""
+
+    def __init__(self, index: GrantIndex = grant_index):
+        self.index = index
+        self._matrix: Optional[GrantMatrix] = None
+        self._built_for: Optional[tuple] = None
+        self._lock = threading.Lock()
+
+    def matrix(self) -> GrantMatrix:
+        # Closed programs drop out daily, so the build key includes the date
+        key = (self.index.version, date.today())
+        with self._lock:
+            if self._matrix is None or self._built_for != key:
+                self._matrix = GrantMatrix(self.index.all_notices())
+                self._built_for = key
+            return self._matrix
+
+    def match(self, profile: FounderProfile, limit: int = 5) -> List[Dict[str, Any]]:
+        """Ranked eligible programs for a profile"""
+        if profile.is_empty():
+            return []
+        return self.matrix().match(profile, limit=limit)
+
+
+grant_matcher = GrantMatcher()
+
+
+def format_matches(matches: List[Dict[str, Any]]) -> str:
+    """Compact text block of matches for the agent prompt"""
+    lines = []
+    for index, match in enumerate(matches, 1):
+        notice = match["notice"]
+        lines.append(
+            f"{index}. {notice['program']} ({notice['agency']}) - 지원규모: {notice['amount']}, 마감: {notice['deadline'] or '상시'}\n"
+            f"   - 매칭 근거: {'; '.join(match['reasons'])}\n"
+            f"   - {notice['summary']}\n"
+            f"   - {notice['url']}"
+        )
+    return "\n".join(lines)
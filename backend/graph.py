@@ -10,8 +10,15 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from llm import get_supervisor_llm
+from llm import get_supervisor_structured_llm
 from state import AgentState
+from router import (
+    keyword_router, topic_shift_detector, routing_cache, routing_cache_key,
+    FAST_ROUTER_ENABLED, ROUTING_CACHE_ENABLED, AFFINITY_ENABLED
+)
+from routing_model import get_routing_model, log_routing_decision
+from cache import make_cache_key
+from singleflight import singleflight
 from agents.cofounder import cofounder_node
 from agents.grant_hunter import grant_hunter_node
 from agents.market_sensor import market_sensor_node
@@ -53,7 +60,7 @@ AGENT_MEMBERS = [
 ]
 
 
-def supervisor_node(state: AgentState) -> Dict[str, Any]:
+async def supervisor_node(state: AgentState) -> Dict[str, Any]:
     """
     Supervisor node that routes to the appropriate agent
     
@@ -63,8 +70,6 @@ def supervisor_node(state: AgentState) -> Dict[str, Any]:
     Returns:
         Updated state with routing decision
     """
-    llm = get_supervisor_llm()
-    
     messages = state.get("messages", [])
     if not messages:
         return {"next": END}
@@ -82,6 +87,34 @@ def supervisor_node(state: AgentState) -> Dict[str, Any]:
     
     user_message = user_messages[-1].content if hasattr(user_messages[-1], 'content') else str(user_messages[-1])
     
+    # Conversation affinity: follow-up turns stay with the agent that answered last
+    last_agent = state.get("last_agent", "")
+    if AFFINITY_ENABLED and last_agent in keyword_router.agents:
+        previous_texts = [msg.content for msg in messages[:-1] if isinstance(msg, (HumanMessage, AIMessage)) and isinstance(msg.content, str)]
+        shift_reason = topic_shift_detector.detect(user_message, last_agent, previous_texts)
+        if shift_reason is None:
+            print(f"Affinity routing: {last_agent} for message: {user_message[:50]}")
+            log_routing_decision(user_message, last_agent, "affinity")
+            return {"next": last_agent}
+        print(f"Topic shift ({shift_reason}) from {last_agent}, re-routing")
+    
+    # Fast path: skip the LLM round-trip when keywords clearly pick one agent
+    if FAST_ROUTER_ENABLED:
+        fast_node = keyword_router.route(user_message)
+        if fast_node:
+            print(f"Fast-path routing: {fast_node} for message: {user_message[:50]}")
+            log_routing_decision(user_message, fast_node, "fast_path")
+            return {"next": fast_node}
+    
+    # Learned classifier: route locally when it is confident enough
+    routing_model = get_routing_model()
+    if routing_model is not None:
+        model_node = routing_model.route(user_message)
+        if model_node:
+            print(f"Model routing: {model_node} for message: {user_message[:50]}")
+            log_routing_decision(user_message, model_node, "model")
+            return {"next": model_node}
+    
     # Create supervisor prompt
     # Get conversation history for context
     conversation_context = ""
@@ -125,12 +158,28 @@ You MUST respond with ONLY the agent name (e.g., "GrantHunter", "MarketSensor",
 
 Determine which agent should handle this request NOW and respond with that agent's name."""
     
+    # Near-identical openers reuse an earlier LLM decision
+    cache_key = routing_cache_key(user_message, state.get("last_agent", ""))
+    
     try:
-        # Use structured output for routing
-        structured_llm = llm.with_structured_output(RoutingDecision)
-        decision = structured_llm.invoke([HumanMessage(content=supervisor_prompt)])
+        next_agent = routing_cache.get(cache_key) if ROUTING_CACHE_ENABLED else None
+        decision_source = "cache"
         
-        next_agent = decision.next_agent
+        if next_agent is None:
+            # Use structured output for routing
+            structured_llm = get_supervisor_structured_llm(RoutingDecision)
+            # Identical routing prompts in flight share one LLM call
+            decision = await singleflight.do(
+                "routing",
+                make_cache_key("routing_prompt", supervisor_prompt),
+                lambda: structured_llm.ainvoke([HumanMessage(content=supervisor_prompt)])
+            )
+            
+            next_agent = decision.next_agent
+            decision_source = "llm"
+            # FINISH depends on the conversation, not just the message ("고마워")
+            if ROUTING_CACHE_ENABLED and next_agent != "FINISH":
+                routing_cache.set(cache_key, next_agent)
         
         # Map agent names to node names
         agent_to_node = {
@@ -145,42 +194,18 @@ Determine which agent should handle this request NOW and respond with that agent
             "FINISH": END
         }
         
-        return {"next": agent_to_node.get(next_agent, END)}
+        next_node = agent_to_node.get(next_agent, END)
+        if next_node != END:
+            log_routing_decision(user_message, next_node, decision_source)
+        return {"next": next_node}
     
     except Exception as e:
         print(f"Supervisor routing error: {e}, using keyword fallback")
-        # Fallback: try to route based on keywords (Korean and English)
-        user_message_lower = user_message.lower()
-        
-        # Priority order matters - check more specific first
-        if any(keyword in user_message_lower for keyword in ["lean canvas", "business model canvas", "bmc", "캔버스", "린캔버스", "비즈니스모델캔버스", "비즈니스 모델 캔버스"]):
-            print(f"Fallback routing: framework_designer for message: {user_message[:50]}")
-            return {"next": "framework_designer"}
-        elif any(keyword in user_message_lower for keyword in ["보조금", "지원사업", "k-startup", "k startup", "정부", "지원", "grant", "government", "funding", "자금조달", "지원금"]):
-            print(f"Fallback routing: grant_hunter for message: {user_message[:50]}")
-            return {"next": "grant_hunter"}
-        elif any(keyword in user_message_lower for keyword in ["경쟁사", "시장", "트렌드", "경쟁력", "시장분석", "market", "competitor", "trend", "analysis", "경쟁", "시장규모"]):
-            print(f"Fallback routing: market_sensor for message: {user_message[:50]}")
-            return {"next": "market_sensor"}
-        elif any(keyword in user_message_lower for keyword in ["코드", "개발", "mvp", "prd", "프로토타입", "프로그래밍", "code", "build", "prototype", "programming", "개발해", "만들어", "기술", "구현"]):
-            print(f"Fallback routing: mvp_builder for message: {user_message[:50]}")
-            return {"next": "mvp_builder"}
-        elif any(keyword in user_message_lower for keyword in ["투자", "vc", "벤처캐피털", "피치", "펀드레이징", "investor", "pitch", "fundraising", "투자유치", "피치덱"]):
-            print(f"Fallback routing: vc_simulator for message: {user_message[:50]}")
-            return {"next": "vc_simulator"}
-        elif any(keyword in user_message_lower for keyword in ["마케팅", "홍보", "콘텐츠", "콜드 이메일", "소셜미디어", "소셜 미디어", "블로그", "seo", "성장", "마케팅 글", "포스트", "이메일 작성", "marketing", "growth", "content", "email"]):
-            print(f"Fallback routing: growth_hacker for message: {user_message[:50]}")
-            return {"next": "growth_hacker"}
-        elif any(keyword in user_message_lower for keyword in ["계약서", "법률", "nda", "비밀유지서약서", "법률 검토", "변호사", "조항", "합의서", "계약", "법률 자문", "contract", "legal", "lawyer", "clause", "agreement", "mou"]):
-            print(f"Fallback routing: legal_advisor for message: {user_message[:50]}")
-            return {"next": "legal_advisor"}
-        elif any(keyword in user_message_lower for keyword in ["비즈니스", "전략", "모델", "아이디어", "창업", "business", "strategy", "cofounder", "idea", "startup"]):
-            print(f"Fallback routing: cofounder for message: {user_message[:50]}")
-            return {"next": "cofounder"}
-        else:
-            # Default to cofounder for general queries
-            print(f"Defaulting to cofounder for message: {user_message[:50]}")
-            return {"next": "cofounder"}
+        # Fallback: route to the best keyword match (Korean and English)
+        fallback_node = keyword_router.best(user_message)
+        print(f"Fallback routing: {fallback_node} for message: {user_message[:50]}")
+        log_routing_decision(user_message, fallback_node, "fallback")
+        return {"next": fallback_node}
 
 
 def route_decision(state: AgentState):
@@ -1,18 +1,48 @@
 """
 LLM Configuration for FounderOS using Google Gemini
+
+Clients are kept in a process-wide registry so every node invocation reuses
+the same warm HTTP/gRPC channel instead of building a new client per call.
 """
 
 import os
+import threading
+from typing import Any, Dict, Optional, Sequence, Tuple
 from dotenv import load_dotenv
 from langchain_google_genai import ChatGoogleGenerativeAI
 
+from response_cache import CachedLLM, is_cache_enabled
+from semantic_cache import SemanticCachedLLM, is_semantic_cache_enabled
+from scheduler import ScheduledLLM, PRIORITY_ROUTING, PRIORITY_INTERACTIVE, PRIORITY_BACKGROUND
+from resilience import ResilientLLM
+
 # Load environment variables
 load_dotenv()
 
 
-def get_gemini_llm(model: str = "gemini-2.0-flash", temperature: float = 0.7) -> ChatGoogleGenerativeAI:
+# Process-wide client registry: (model, temperature) -> client
+_client_registry: Dict[Tuple[str, float], ChatGoogleGenerativeAI] = {}
+# Cached runnable wrappers: (model, temperature, binding key) -> runnable
+_wrapper_registry: Dict[Tuple[str, float, str], Any] = {}
+_registry_lock = threading.Lock()
+_registry_stats = {
+    "clients_created": 0,
+    "client_hits": 0,
+    "wrappers_created": 0,
+    "wrapper_hits": 0,
+}
+
+
+def _normalize_model_name(model: str) -> str:
+    """Remove "models/" prefix if present (ChatGoogleGenerativeAI adds it automatically)"""
+    if model.startswith("models/"):
+        model = model.replace("models/", "")
+    return model
+
+
+def create_gemini_llm(model: str = "gemini-2.0-flash", temperature: float = 0.7) -> ChatGoogleGenerativeAI:
     """
-    Initialize ChatGoogleGenerativeAI with Gemini model
+    Build a new ChatGoogleGenerativeAI client (bypasses the registry)
     
     Args:
         model: Model name (default: "gemini-2.0-flash")
@@ -27,9 +57,7 @@ def get_gemini_llm(model: str = "gemini-2.0-flash", temperature: float = 0.7) ->
     if not api_key:
         raise ValueError("GOOGLE_API_KEY not found in environment variables")
     
-    # Remove "models/" prefix if present (ChatGoogleGenerativeAI adds it automatically)
-    if model.startswith("models/"):
-        model = model.replace("models/", "")
+    model = _normalize_model_name(model)
     
     # Try different model name formats
     # langchain-google-genai may need just the model name without "models/" prefix
@@ -42,18 +70,208 @@ def get_gemini_llm(model: str = "gemini-2.0-flash", temperature: float = 0.7) ->
     )
 
 
+def get_gemini_llm(model: str = "gemini-2.0-flash", temperature: float = 0.7) -> ChatGoogleGenerativeAI:
+    """
+    Get a shared ChatGoogleGenerativeAI client from the registry
+    
+    Args:
+        model: Model name (default: "gemini-2.0-flash")
+        temperature: Temperature for generation (default: 0.7)
+    
+    Returns:
+        Shared ChatGoogleGenerativeAI instance for (model, temperature)
+    """
+    key = (_normalize_model_name(model), float(temperature))
+    
+    client = _client_registry.get(key)
+    if client is not None:
+        _registry_stats["client_hits"] += 1
+        return client
+    
+    with _registry_lock:
+        client = _client_registry.get(key)
+        if client is None:
+            client = create_gemini_llm(model=key[0], temperature=key[1])
+            _client_registry[key] = client
+            _registry_stats["clients_created"] += 1
+        else:
+            _registry_stats["client_hits"] += 1
+    return client
+
+
+def _get_wrapper(model: str, temperature: float, binding_key: str, factory):
+    """Get or build a cached runnable wrapper (bind_tools / with_structured_output)"""
+    key = (_normalize_model_name(model), float(temperature), binding_key)
+    
+    wrapper = _wrapper_registry.get(key)
+    if wrapper is not None:
+        _registry_stats["wrapper_hits"] += 1
+        return wrapper
+    
+    llm = get_gemini_llm(model=model, temperature=temperature)
+    with _registry_lock:
+        wrapper = _wrapper_registry.get(key)
+        if wrapper is None:
+            wrapper = factory(llm)
+            _wrapper_registry[key] = wrapper
+            _registry_stats["wrappers_created"] += 1
+        else:
+            _registry_stats["wrapper_hits"] += 1
+    return wrapper
+
+
+def get_llm_with_tools(tools: Sequence[Any], model: str = "gemini-2.0-flash", temperature: float = 0.7):
+    """
+    Get a cached client with tools bound
+    
+    Args:
+        tools: Tools to bind (keyed by tool name)
+        model: Model name
+        temperature: Temperature for generation
+    
+    Returns:
+        Runnable returned by llm.bind_tools(tools)
+    """
+    tool_names = ",".join(sorted(getattr(t, "name", str(t)) for t in tools))
+    return _get_wrapper(model, temperature, f"tools:{tool_names}", lambda llm: llm.bind_tools(list(tools)))
+
+
+def get_structured_llm(schema: Any, model: str = "gemini-2.0-flash", temperature: float = 0.7):
+    """
+    Get a cached client with structured output
+    
+    Args:
+        schema: Pydantic model for the output
+        model: Model name
+        temperature: Temperature for generation
+    
+    Returns:
+        Runnable returned by llm.with_structured_output(schema)
+    """
+    schema_name = f"{schema.__module__}.{schema.__qualname__}"
+    return _get_wrapper(model, temperature, f"structured:{schema_name}", lambda llm: llm.with_structured_output(schema))
+
+
+def get_llm_pool_stats() -> Dict[str, Any]:
+    """Report registry size and reuse counters"""
+    return {
+        "clients": len(_client_registry),
+        "wrappers": len(_wrapper_registry),
+        "models": sorted({f"{model}@{temperature}" for model, temperature in _client_registry}),
+        **_registry_stats,
+    }
+
+
+# Default LLM settings
+SUPERVISOR_MODEL = "gemini-2.0-flash"
+SUPERVISOR_TEMPERATURE = 0.3
+AGENT_MODEL = "gemini-2.0-flash"
+AGENT_TEMPERATURE = 0.7
+
+
+def _managed(factory, model: str, priority: int, agent: Optional[str]):
+    """
+    Wrap a runnable factory in the resilience layer and the quota scheduler
+    
+    Args:
+        factory: Builds the runnable for a model name
+        model: Primary model
+        priority: Scheduler priority (PRIORITY_* constant)
+        agent: Resilience policy name (agent node, "supervisor" or "summary")
+    """
+    # Each attempt (retry, fallback model, hedge) is admitted by the scheduler separately
+    return ResilientLLM(
+        lambda name: ScheduledLLM(factory(name), name, priority, degrade=factory),
+        model,
+        agent
+    )
+
+
 # Default LLM instances
+# Call path: response caches -> retry/fallback/hedging (resilience.py) -> quota
+# scheduler (scheduler.py) -> shared client; cache hits never spend quota
 def get_supervisor_llm() -> ChatGoogleGenerativeAI:
     """Get LLM for Supervisor (faster routing)"""
     # Use gemini-2.0-flash for faster responses and better quota
     # Note: Do NOT include "models/" prefix - ChatGoogleGenerativeAI adds it automatically
-    return get_gemini_llm(model="gemini-2.0-flash", temperature=0.3)
+    return _managed(
+        lambda model: get_gemini_llm(model=model, temperature=SUPERVISOR_TEMPERATURE),
+        SUPERVISOR_MODEL,
+        PRIORITY_ROUTING,
+        "supervisor"
+    )
+
+
+def get_supervisor_structured_llm(schema: Any):
+    """Get Supervisor LLM with structured output (cached)"""
+    return _managed(
+        lambda model: get_structured_llm(schema, model=model, temperature=SUPERVISOR_TEMPERATURE),
+        SUPERVISOR_MODEL,
+        PRIORITY_ROUTING,
+        "supervisor"
+    )
+
+
+def get_background_llm() -> ChatGoogleGenerativeAI:
+    """Get Supervisor-model LLM for background work (conversation summaries); served after user-facing calls"""
+    return _managed(
+        lambda model: get_gemini_llm(model=model, temperature=SUPERVISOR_TEMPERATURE),
+        SUPERVISOR_MODEL,
+        PRIORITY_BACKGROUND,
+        "summary"
+    )
 
 
-def get_agent_llm() -> ChatGoogleGenerativeAI:
-    """Get LLM for Agents (high-quality reasoning)"""
+def get_agent_llm(agent: Optional[str] = None) -> ChatGoogleGenerativeAI:
+    """
+    Get LLM for Agents (high-quality reasoning)
+    
+    Args:
+        agent: Calling agent; selects the resilience policy. Agents opted into the
+               response cache (exact match) or the semantic cache (paraphrased
+               first turns) get a caching wrapper
+    """
     # Use gemini-2.0-flash for high-quality responses (gemini-2.5-pro also available but may have quota limits)
-    # If quota issues occur, can fallback to gemini-2.0-flash
+    # If quota issues occur, the resilience layer falls back to LLM_FALLBACK_MODELS
     # Note: Do NOT include "models/" prefix - ChatGoogleGenerativeAI adds it automatically
-    return get_gemini_llm(model="gemini-2.0-flash", temperature=0.7)
+    llm = _managed(
+        lambda model: get_gemini_llm(model=model, temperature=AGENT_TEMPERATURE),
+        AGENT_MODEL,
+        PRIORITY_INTERACTIVE,
+        agent
+    )
+    if is_cache_enabled(agent):
+        return CachedLLM(llm, agent, AGENT_MODEL, AGENT_TEMPERATURE)
+    if is_semantic_cache_enabled(agent):
+        return SemanticCachedLLM(llm, agent, AGENT_MODEL, AGENT_TEMPERATURE)
+    return llm
 
+
+def get_agent_llm_with_tools(tools: Sequence[Any], agent: Optional[str] = None):
+    """Get Agent LLM with tools bound (cached)"""
+    return _managed(
+        lambda model: get_llm_with_tools(tools, model=model, temperature=AGENT_TEMPERATURE),
+        AGENT_MODEL,
+        PRIORITY_INTERACTIVE,
+        agent
+    )
+
+
+def get_agent_structured_llm(schema: Any, agent: Optional[str] = None):
+    """
+    Get Agent LLM with structured output (cached)
+    
+    Args:
+        schema: Pydantic model for the output
+        agent: Calling agent; selects the resilience policy. Agents opted into the
+               response cache get a caching wrapper
+    """
+    structured_llm = _managed(
+        lambda model: get_structured_llm(schema, model=model, temperature=AGENT_TEMPERATURE),
+        AGENT_MODEL,
+        PRIORITY_INTERACTIVE,
+        agent
+    )
+    if is_cache_enabled(agent):
+        return CachedLLM(structured_llm, agent, AGENT_MODEL, AGENT_TEMPERATURE, schema=schema)
+    return structured_llm
@@ -3,10 +3,12 @@ Startup Sherpa Backend - FastAPI Application with LangGraph
 창업을 도와주는 짐꾼이자 길잡이
 """
 
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException, Header
+from fastapi.responses import StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from typing import Optional
+import asyncio
 import json
 import os
 from dotenv import load_dotenv
@@ -14,7 +16,24 @@ from langchain_core.messages import HumanMessage
 from langgraph.checkpoint.memory import MemorySaver
 
 from graph import graph_workflow
-from direct_agent import route_to_agent
+from direct_agent import route_to_agent, stream_to_agent
+from streaming import stream_graph, with_keepalive, make_frame, format_sse, make_graph_input
+from llm import get_llm_pool_stats
+from router import get_router_stats
+from search_cache import get_search_cache_stats
+from tools import close_search_client
+from executor import get_executor_stats
+from compaction import get_compaction_stats
+from grant_index import run_grant_index_refresher, get_grant_index_stats, GRANT_INDEX_ENABLED
+from watchlist import watchlist_store, get_watchlist_refresher, get_watchlist_stats, WATCHLIST_ENABLED
+from trends import get_trend_stats
+from response_cache import cache_bypass, get_response_cache_stats
+from semantic_cache import get_semantic_cache_stats
+from scheduler import get_scheduler_stats
+from resilience import get_resilience_stats
+from singleflight import get_singleflight_stats
+from context import schedule_summary_update
+from checkpoint import SQLiteCheckpointSaver, BoundedMemorySaver, DEFAULT_CHECKPOINT_DB_PATH
 
 # Load environment variables
 load_dotenv()
@@ -37,7 +56,27 @@ app.add_middleware(
 )
 
 # Initialize memory for conversation context
-memory = MemorySaver()
+# "sqlite" (default) persists threads across restarts; "memory" keeps them in-process only
+# (bounded: latest CHECKPOINT_MAX_PER_THREAD checkpoints, idle threads evicted/spilled)
+CHECKPOINT_BACKEND = os.getenv("CHECKPOINT_BACKEND", "sqlite").lower()
+CHECKPOINT_MAX_PER_THREAD = int(os.getenv("CHECKPOINT_MAX_PER_THREAD", "10"))
+
+if CHECKPOINT_BACKEND == "memory":
+    spill_path = os.getenv("CHECKPOINT_SPILL_PATH")
+    memory = BoundedMemorySaver(
+        max_checkpoints_per_thread=CHECKPOINT_MAX_PER_THREAD,
+        idle_ttl=float(os.getenv("CHECKPOINT_IDLE_TTL", "21600")),
+        spill_saver=SQLiteCheckpointSaver(path=spill_path, hot_threads=0) if spill_path else None
+    )
+elif CHECKPOINT_BACKEND == "memory_unbounded":
+    memory = MemorySaver()
+else:
+    memory = SQLiteCheckpointSaver(
+        path=os.getenv("CHECKPOINT_DB_PATH", DEFAULT_CHECKPOINT_DB_PATH),
+        hot_threads=int(os.getenv("CHECKPOINT_HOT_THREADS", "512")),
+        retention_days=float(os.getenv("CHECKPOINT_RETENTION_DAYS", "30")),
+        max_checkpoints_per_thread=CHECKPOINT_MAX_PER_THREAD
+    )
 
 # Compile graph with memory checkpointer
 graph_with_memory = graph_workflow.compile(checkpointer=memory)
@@ -48,6 +87,12 @@ class ChatMessage(BaseModel):
     message: str
     thread_id: Optional[str] = None
     agent: Optional[str] = None  # 선택된 에이전트 (선택사항)
+    founder_id: Optional[str] = None  # 창업자 ID (경쟁사 워치리스트 선택, 선택사항)
+
+
+class WatchlistEntry(BaseModel):
+    """Competitor to add to a watchlist"""
+    competitor: str
 
 
 class ChatResponse(BaseModel):
@@ -57,6 +102,71 @@ class ChatResponse(BaseModel):
     thread_id: str
 
 
+def is_bypass_requested(header_value: Optional[str]) -> bool:
+    """Whether an X-Cache-Bypass header value asks for a fresh answer"""
+    return (header_value or "").strip().lower() in ("1", "true", "yes", "no-cache")
+
+
+def format_error_message(error_str: str) -> str:
+    """
+    Build the user-facing (Korean) error message for an exception
+    
+    Args:
+        error_str: str() of the exception
+    
+    Returns:
+        Markdown error message
+    """
+    # Handle quota exceeded errors
+    if "429" in error_str or "quota" in error_str.lower() or "Quota exceeded" in error_str:
+        error_message = """⚠️ **API 할당량 초과**
+
+현재 Google Gemini API의 무료 티어 할당량을 초과했습니다.
+
+**해결 방법:**
+1. 잠시 후 다시 시도해주세요 (약 1분 대기)
+2. Google AI Studio에서 할당량 확인: https://ai.dev/usage
+3. 필요시 유료 플랜으로 업그레이드 고려
+
+**대안:**
+- 다른 에이전트를 사용해보세요
+- 잠시 후 다시 시도해주세요
+
+불편을 드려 죄송합니다."""
+    elif "Error" in error_str or "error" in error_str.lower():
+        error_message = f"⚠️ **오류가 발생했습니다**\n\n{error_str}\n\n잠시 후 다시 시도해주세요."
+    else:
+        error_message = f"⚠️ **오류가 발생했습니다**\n\n{error_str}"
+    
+    return error_message
+
+
+# Background tasks started with the app
+background_tasks = []
+
+
+@app.on_event("startup")
+async def startup():
+    """Start background jobs (grant catalog ingestion, competitor watchlist refresh)"""
+    if GRANT_INDEX_ENABLED:
+        background_tasks.append(asyncio.create_task(run_grant_index_refresher()))
+    if WATCHLIST_ENABLED:
+        background_tasks.append(asyncio.create_task(get_watchlist_refresher().run()))
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    """Stop background jobs, flush pending checkpoint writes and close pooled clients"""
+    for task in background_tasks:
+        task.cancel()
+    await close_search_client()
+    if isinstance(memory, SQLiteCheckpointSaver):
+        memory.close()
+    elif isinstance(memory, BoundedMemorySaver) and memory.spill_saver is not None:
+        memory.evict_idle_threads(float("inf"))
+        memory.spill_saver.close()
+
+
 @app.get("/")
 async def root():
     """Root endpoint"""
@@ -79,17 +189,67 @@ async def health():
     return {"status": "healthy"}
 
 
+@app.get("/stats")
+async def stats():
+    """Runtime statistics (LLM client pool, caches)"""
+    return {
+        "llm_pool": get_llm_pool_stats(),
+        "llm_scheduler": get_scheduler_stats(),
+        "llm_resilience": get_resilience_stats(),
+        "singleflight": get_singleflight_stats(),
+        "router": get_router_stats(),
+        "search_cache": get_search_cache_stats(),
+        "executor": get_executor_stats(),
+        "compaction": get_compaction_stats(),
+        "response_cache": get_response_cache_stats(),
+        "semantic_cache": get_semantic_cache_stats(),
+        "grant_index": get_grant_index_stats(),
+        "watchlist": get_watchlist_stats(),
+        "trends": get_trend_stats(),
+        "checkpointer": memory.stats() if hasattr(memory, "stats") else {"backend": CHECKPOINT_BACKEND}
+    }
+
+
+@app.get("/watchlist/{founder_id}")
+async def get_watchlist(founder_id: str):
+    """Competitors on a founder's watchlist with their refresh status"""
+    return {"founder_id": founder_id, "competitors": await asyncio.to_thread(watchlist_store.list, founder_id)}
+
+
+@app.post("/watchlist/{founder_id}")
+async def add_to_watchlist(founder_id: str, entry: WatchlistEntry):
+    """Add a competitor; its snapshots are fetched in the background"""
+    competitor = entry.competitor.strip()
+    if not competitor:
+        raise HTTPException(status_code=400, detail="경쟁사 이름을 입력해주세요.")
+    if not await asyncio.to_thread(watchlist_store.add, founder_id, competitor):
+        raise HTTPException(status_code=400, detail="워치리스트에 등록할 수 있는 경쟁사 수를 초과했습니다.")
+    if WATCHLIST_ENABLED:
+        get_watchlist_refresher().wake()
+    return await get_watchlist(founder_id)
+
+
+@app.delete("/watchlist/{founder_id}/{competitor}")
+async def remove_from_watchlist(founder_id: str, competitor: str):
+    """Remove a competitor from a founder's watchlist"""
+    if not await asyncio.to_thread(watchlist_store.remove, founder_id, competitor):
+        raise HTTPException(status_code=404, detail="워치리스트에 없는 경쟁사입니다.")
+    return await get_watchlist(founder_id)
+
+
 @app.post("/chat", response_model=ChatResponse)
-async def chat_endpoint(chat_message: ChatMessage):
+async def chat_endpoint(chat_message: ChatMessage, x_cache_bypass: Optional[str] = Header(None)):
     """
     REST API endpoint for chat with conversation context
     
     Args:
         chat_message: Chat message with optional thread_id
+        x_cache_bypass: X-Cache-Bypass header; skips the LLM response cache
     
     Returns:
         Chat response with agent name and thread_id
     """
+    cache_bypass.set(is_bypass_requested(x_cache_bypass))
     try:
         # Generate or use thread_id
         thread_id = chat_message.thread_id or f"thread_{os.urandom(8).hex()}"
@@ -100,8 +260,10 @@ async def chat_endpoint(chat_message: ChatMessage):
                 agent_name=chat_message.agent,
                 message=chat_message.message,
                 thread_id=thread_id,
-                graph_with_memory=graph_with_memory
+                graph_with_memory=graph_with_memory,
+                founder_id=chat_message.founder_id
             )
+            schedule_summary_update(graph_with_memory, thread_id)
             return ChatResponse(
                 response=result["response"],
                 agent=result["agent"],
@@ -117,9 +279,10 @@ async def chat_endpoint(chat_message: ChatMessage):
         
         # Invoke graph with user message
         result = await graph_with_memory.ainvoke(
-            {"messages": [HumanMessage(content=chat_message.message)]},
+            make_graph_input(chat_message.message, chat_message.founder_id),
             config=config
         )
+        schedule_summary_update(graph_with_memory, thread_id)
         
         # Get the last AI message
         messages = result.get("messages", [])
@@ -152,28 +315,7 @@ async def chat_endpoint(chat_message: ChatMessage):
         )
     
     except Exception as e:
-        error_str = str(e)
-        
-        # Handle quota exceeded errors
-        if "429" in error_str or "quota" in error_str.lower() or "Quota exceeded" in error_str:
-            error_message = """⚠️ **API 할당량 초과**
-
-현재 Google Gemini API의 무료 티어 할당량을 초과했습니다.
-
-**해결 방법:**
-1. 잠시 후 다시 시도해주세요 (약 1분 대기)
-2. Google AI Studio에서 할당량 확인: https://ai.dev/usage
-3. 필요시 유료 플랜으로 업그레이드 고려
-
-**대안:**
-- 다른 에이전트를 사용해보세요
-- 잠시 후 다시 시도해주세요
-
-불편을 드려 죄송합니다."""
-        elif "Error" in error_str or "error" in error_str.lower():
-            error_message = f"⚠️ **오류가 발생했습니다**\n\n{error_str}\n\n잠시 후 다시 시도해주세요."
-        else:
-            error_message = f"⚠️ **오류가 발생했습니다**\n\n{error_str}"
+        error_message = format_error_message(str(e))
         
         return ChatResponse(
             response=error_message,
@@ -182,10 +324,61 @@ async def chat_endpoint(chat_message: ChatMessage):
         )
 
 
+@app.post("/chat/stream")
+async def chat_stream_endpoint(chat_message: ChatMessage, x_cache_bypass: Optional[str] = Header(None)):
+    """
+    Server-Sent Events variant of /chat for clients that can't use WebSockets
+    
+    Streams routing, start, token, tool_call and end events. Keep-alive
+    comments are sent while the model is thinking.
+    
+    Args:
+        chat_message: Chat message with optional thread_id and agent
+        x_cache_bypass: X-Cache-Bypass header; skips the LLM response cache
+    
+    Returns:
+        text/event-stream response
+    """
+    thread_id = chat_message.thread_id or f"thread_{os.urandom(8).hex()}"
+    bypass = is_bypass_requested(x_cache_bypass)
+    
+    async def event_stream():
+        cache_bypass.set(bypass)
+        try:
+            if chat_message.agent and chat_message.agent != "supervisor" and chat_message.agent != "":
+                frames = stream_to_agent(
+                    agent_name=chat_message.agent,
+                    message=chat_message.message,
+                    thread_id=thread_id,
+                    graph_with_memory=graph_with_memory,
+                    founder_id=chat_message.founder_id
+                )
+            else:
+                frames = stream_graph(graph_with_memory, chat_message.message, thread_id, chat_message.founder_id)
+            async for chunk in with_keepalive(frames):
+                yield chunk
+            schedule_summary_update(graph_with_memory, thread_id)
+        except Exception as e:
+            yield format_sse(make_frame("error", thread_id, "supervisor", response=format_error_message(str(e))))
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "X-Accel-Buffering": "no",  # Disable proxy buffering so events flush immediately
+        }
+    )
+
+
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
     """
     WebSocket endpoint for real-time chat
+    
+    Send {"message": ..., "stream": true} to receive token-level frames
+    (start / token / tool_call / end) instead of a single response.
     """
     await websocket.accept()
     
@@ -201,6 +394,9 @@ async def websocket_endpoint(websocket: WebSocket):
             user_message = message_data.get("message", "")
             thread_id = message_data.get("thread_id") or thread_id or f"thread_{os.urandom(8).hex()}"
             selected_agent = message_data.get("agent")
+            founder_id = message_data.get("founder_id")
+            stream_mode = bool(message_data.get("stream"))
+            cache_bypass.set(bool(message_data.get("cache_bypass")))
             
             if not user_message:
                 await websocket.send_json({
@@ -210,14 +406,33 @@ async def websocket_endpoint(websocket: WebSocket):
                 })
                 continue
             
+            # Streaming mode: send start / token / tool_call / end frames as they arrive
+            if stream_mode:
+                if selected_agent and selected_agent != "supervisor":
+                    frames = stream_to_agent(
+                        agent_name=selected_agent,
+                        message=user_message,
+                        thread_id=thread_id,
+                        graph_with_memory=graph_with_memory,
+                        founder_id=founder_id
+                    )
+                else:
+                    frames = stream_graph(graph_with_memory, user_message, thread_id, founder_id)
+                async for frame in frames:
+                    await websocket.send_json(frame)
+                schedule_summary_update(graph_with_memory, thread_id)
+                continue
+            
             # If agent is specified, route directly to that agent
             if selected_agent and selected_agent != "supervisor":
                 result = await route_to_agent(
                     agent_name=selected_agent,
                     message=user_message,
                     thread_id=thread_id,
-                    graph_with_memory=graph_with_memory
+                    graph_with_memory=graph_with_memory,
+                    founder_id=founder_id
                 )
+                schedule_summary_update(graph_with_memory, thread_id)
                 await websocket.send_json({
                     "response": result["response"],
                     "agent": result["agent"],
@@ -234,9 +449,10 @@ async def websocket_endpoint(websocket: WebSocket):
             
             # Invoke graph
             result = await graph_with_memory.ainvoke(
-                {"messages": [HumanMessage(content=user_message)]},
+                make_graph_input(user_message, founder_id),
                 config=config
             )
+            schedule_summary_update(graph_with_memory, thread_id)
             
             # Get the last AI message
             messages = result.get("messages", [])
@@ -0,0 +1,268 @@
+"""
+Retry, model fallback and hedging for FounderOS LLM calls
+
+Every LLM call used to be a single attempt against one model: a transient
+error reached the user as an error message and slow outliers set the p99.
+Calls from llm.py's getters now run under a per-agent policy:
+- Retryable errors (timeouts, 5xx, unavailable) are retried with jittered
+  exponential backoff
+- Quota errors and exhausted retries move on to the next model in an
+  ordered fallback list
+- Optional hedging: when the first attempt is still running the observed
+  p95 upstream latency after leaving the scheduler queue, a second
+  identical request is sent and whichever finishes first wins (only for
+  calls whose tokens are not streamed to the user, since both attempts
+  would emit tokens). Latencies and the hedge timer exclude queue wait, and
+  no hedge is sent while the model's scheduler has calls queued or fewer
+  than HEDGE_MIN_SPARE_REQUESTS requests available
+
+Agent answers are streamed to the client token by token (astream_events),
+so a call that already emitted tokens is never retried or failed over: the
+client would receive the whole answer again after the partial one.
+"""
+
+import asyncio
+import os
+import random
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from langchain_core.callbacks import AsyncCallbackHandler
+from langchain_core.runnables.config import ensure_config, merge_configs
+
+from scheduler import CallTiming, LLMQuotaError, ScheduledLLM, get_model_scheduler, is_rate_limit_error
+
+
+# Models tried after the primary model, in order (comma-separated)
+LLM_FALLBACK_MODELS = [model.strip() for model in os.getenv("LLM_FALLBACK_MODELS", "gemini-2.0-flash-lite").split(",") if model.strip()]
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "2"))
+LLM_RETRY_BASE_DELAY = float(os.getenv("LLM_RETRY_BASE_DELAY", "0.5"))
+LLM_RETRY_MAX_DELAY = float(os.getenv("LLM_RETRY_MAX_DELAY", "8"))
+# Agents whose calls are hedged (comma-separated; "supervisor" = routing decisions)
+LLM_HEDGE_AGENTS = {agent.strip() for agent in os.getenv("LLM_HEDGE_AGENTS", "supervisor").split(",") if agent.strip()}
+# Hedge delay until enough latencies are observed for a p95
+LLM_HEDGE_DEFAULT_DELAY = float(os.getenv("LLM_HEDGE_DEFAULT_DELAY", "3"))
+HEDGE_MIN_SAMPLES = 20
+# Hedge only when the model could start this many requests right now (the hedge uses one)
+HEDGE_MIN_SPARE_REQUESTS = 2
+LATENCY_WINDOW = 200
+
+_RETRYABLE_MARKERS = (
+    "500", "502", "503", "504", "internal", "unavailable", "overloaded",
+    "deadline", "timed out", "timeout", "connection", "reset by peer",
+)
+
+
+@dataclass
+class ResiliencePolicy:
+    """How one agent's LLM calls are retried, failed over and hedged"""
+    max_retries: int = LLM_MAX_RETRIES
+    base_delay: float = LLM_RETRY_BASE_DELAY
+    max_delay: float = LLM_RETRY_MAX_DELAY
+    fallback_models: List[str] = field(default_factory=lambda: list(LLM_FALLBACK_MODELS))
+    hedge: bool = False
+    hedge_delay: Optional[float] = None  # None = observed p95
+
+
+# Per-agent overrides (agents not listed use the defaults above)
+RESILIENCE_POLICIES: Dict[str, ResiliencePolicy] = {
+    # Routing is short and blocks every turn: retry quickly, hedge slow outliers
+    "supervisor": ResiliencePolicy(max_retries=1, base_delay=0.25, max_delay=1.0),
+    # Summaries run in the background and can wait for the primary model
+    "summary": ResiliencePolicy(max_retries=3, fallback_models=[]),
+}
+
+
+def get_resilience_policy(agent: Optional[str]) -> ResiliencePolicy:
+    """Policy for an agent (hedging is enabled by LLM_HEDGE_AGENTS)"""
+    policy = RESILIENCE_POLICIES.get(agent or "", ResiliencePolicy())
+    if agent in LLM_HEDGE_AGENTS and not policy.hedge:
+        policy = ResiliencePolicy(**{**policy.__dict__, "hedge": True})
+    return policy
+
+
+def is_retryable_error(error: BaseException) -> bool:
+    """Transient errors worth retrying on the same model"""
+    if isinstance(error, (asyncio.TimeoutError, ConnectionError)):
+        return True
+    text = f"{type(error).__name__} {error}".lower()
+    return any(marker in text for marker in _RETRYABLE_MARKERS)
+
+
+class ResilienceStats:
+    """Counters and latency samples per agent and model"""
+
+    def __init__(self):
+        self.agents: Dict[str, Dict[str, int]] = {}
+        self.latencies: Dict[Tuple[str, str], Deque[float]] = {}
+
+    def count(self, agent: str, field_name: str, amount: int = 1):
+        counters = self.agents.setdefault(agent, {
+            "calls": 0, "retries": 0, "fallbacks": 0, "hedges": 0, "hedge_wins": 0, "hedges_skipped": 0,
+            "failures": 0, "streamed_failures": 0,
+        })
+        counters[field_name] += amount
+
+    def observe(self, agent: str, model: str, seconds: float):
+        self.latencies.setdefault((agent, model), deque(maxlen=LATENCY_WINDOW)).append(seconds)
+
+    def p95(self, agent: str, model: str) -> Optional[float]:
+        samples = self.latencies.get((agent, model))
+        if not samples or len(samples) < HEDGE_MIN_SAMPLES:
+            return None
+        ordered = sorted(samples)
+        return ordered[int(0.95 * (len(ordered) - 1))]
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "fallback_models": LLM_FALLBACK_MODELS,
+            "hedge_agents": sorted(LLM_HEDGE_AGENTS),
+            "agents": {agent: dict(counters) for agent, counters in self.agents.items()},
+            "p95_ms": {
+                f"{agent}@{model}": round(p95 * 1000, 1)
+                for (agent, model) in self.latencies
+                for p95 in [self.p95(agent, model)] if p95 is not None
+            },
+        }
+
+
+resilience_stats = ResilienceStats()
+
+
+class StreamTracker(AsyncCallbackHandler):
+    """Callback that notes whether a call has streamed any token to the client"""
+
+    def __init__(self):
+        self.emitted = False
+
+    async def on_llm_new_token(self, token: str, **kwargs: Any) -> None:
+        self.emitted = True
+
+
+class ResilientLLM:
+    """
+    Runnable wrapper that retries, fails over and hedges calls
+
+    Args:
+        build: Factory returning the runnable for a model name
+        model: Primary model
+        agent: Agent name (selects the policy; "supervisor" / "summary" for non-agent calls)
+    """
+
+    def __init__(self, build: Callable[[str], Any], model: str, agent: Optional[str] = None):
+        self.build = build
+        self.model = model
+        self.agent = agent or "default"
+        self.policy = get_resilience_policy(agent)
+        self.runnable = build(model)
+
+    def _backoff(self, attempt: int) -> float:
+        # Full jitter: uniform in [0, min(max_delay, base * 2^attempt)]
+        return random.uniform(0, min(self.policy.max_delay, self.policy.base_delay * (2 ** attempt)))
+
+    async def _timed(self, runnable: Any, model: str, messages: Any, args, kwargs, timing: Optional[CallTiming] = None) -> Any:
+        # Only the upstream call is timed; scheduler queue wait is not latency
+        timing = timing or CallTiming()
+        if isinstance(runnable, ScheduledLLM):
+            response = await runnable.ainvoke(messages, *args, timing=timing, **kwargs)
+        else:
+            timing.model = model
+            timing.admitted.set()
+            started = time.monotonic()
+            response = await runnable.ainvoke(messages, *args, **kwargs)
+            timing.upstream_seconds = time.monotonic() - started
+        if timing.upstream_seconds is not None:
+            resilience_stats.observe(self.agent, timing.model or model, timing.upstream_seconds)
+        return response
+
+    async def _hedged(self, runnable: Any, model: str, messages: Any, args, kwargs) -> Any:
+        timing = CallTiming()
+        primary = asyncio.ensure_future(self._timed(runnable, model, messages, args, kwargs, timing))
+        # The hedge timer starts when the call leaves the scheduler queue
+        admitted = asyncio.ensure_future(timing.admitted.wait())
+        pending = {primary, admitted}
+        try:
+            await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            pending = {primary}
+            if primary.done():
+                return primary.result()
+
+            serving = timing.model or model
+            delay = self.policy.hedge_delay or resilience_stats.p95(self.agent, serving) or LLM_HEDGE_DEFAULT_DELAY
+            done, pending = await asyncio.wait(pending, timeout=delay)
+            if done:
+                return primary.result()
+
+            # A hedge would only queue behind other calls or spend scarce quota
+            if not get_model_scheduler(serving).can_spare(HEDGE_MIN_SPARE_REQUESTS):
+                resilience_stats.count(self.agent, "hedges_skipped")
+                return await primary
+
+            resilience_stats.count(self.agent, "hedges")
+            hedge = asyncio.ensure_future(self._timed(runnable, model, messages, args, kwargs))
+            pending = {primary, hedge}
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            resilience_stats.count(self.agent, "hedge_wins")
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            # The losing (or abandoned) request is cancelled
+            admitted.cancel()
+            for task in pending:
+                task.cancel()
+
+    async def _attempt_model(self, model: str, messages: Any, args, kwargs, tracker: StreamTracker) -> Any:
+        runnable = self.runnable if model == self.model else self.build(model)
+        for attempt in range(self.policy.max_retries + 1):
+            try:
+                if self.policy.hedge:
+                    return await self._hedged(runnable, model, messages, args, kwargs)
+                return await self._timed(runnable, model, messages, args, kwargs)
+            except Exception as e:
+                # Quota errors go straight to the next model; other errors only when transient
+                if isinstance(e, LLMQuotaError) or is_rate_limit_error(e) or not is_retryable_error(e):
+                    raise
+                if attempt == self.policy.max_retries or tracker.emitted:
+                    raise
+                resilience_stats.count(self.agent, "retries")
+                await asyncio.sleep(self._backoff(attempt))
+
+    async def ainvoke(self, messages: Any, *args, **kwargs) -> Any:
+        resilience_stats.count(self.agent, "calls")
+        # Watch the call's token stream (the parent run's callbacks are kept)
+        tracker = StreamTracker()
+        config = args[0] if args else kwargs.pop("config", None)
+        kwargs["config"] = merge_configs(ensure_config(config), {"callbacks": [tracker]})
+        args = args[1:]
+
+        models = [self.model] + [model for model in self.policy.fallback_models if model != self.model]
+        for index, model in enumerate(models):
+            try:
+                return await self._attempt_model(model, messages, args, kwargs, tracker)
+            except Exception as e:
+                failover = isinstance(e, LLMQuotaError) or is_rate_limit_error(e) or is_retryable_error(e)
+                if tracker.emitted:
+                    # Partial answer already reached the client; a second answer would follow it
+                    resilience_stats.count(self.agent, "streamed_failures")
+                if not failover or index == len(models) - 1 or tracker.emitted:
+                    resilience_stats.count(self.agent, "failures")
+                    raise
+                resilience_stats.count(self.agent, "fallbacks")
+                print(f"LLM call on {model} failed ({e}); falling back to {models[index + 1]}")
+
+    def __getattr__(self, name: str) -> Any:
+        # Everything else (invoke, astream, bind, ...) goes to the primary runnable as-is
+        return getattr(self.runnable, name)
+
+
+def get_resilience_stats() -> Dict[str, Any]:
+    """Retry, fallback and hedge counters"""
+    return resilience_stats.snapshot()
@@ -0,0 +1,268 @@
+"""
+Exact-match LLM response cache for FounderOS agents
+
+Some agent outputs are a pure function of the prompt: FrameworkDesigner
+turns the same idea and history into the same Lean Canvas / BMC JSON, yet
+every regenerate click paid for a full structured-output call. Opted-in
+agents (RESPONSE_CACHE_AGENTS) get their LLM calls wrapped in a cache keyed
+by (model, temperature, output schema, windowed prompt messages):
+- In-memory LRU (TTLCache) for the hot set
+- SQLite on disk, shared across workers and restarts
+
+Requests sent with an `X-Cache-Bypass` header (or `"cache_bypass": true`
+over the WebSocket) skip the lookup and refresh the stored entry.
+"""
+
+import asyncio
+import contextvars
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from langchain_core.messages import AIMessage, BaseMessage
+
+from cache import TTLCache, make_cache_key
+from singleflight import singleflight
+
+
+DEFAULT_RESPONSE_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "response_cache.sqlite")
+
+RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE_ENABLED", "true").lower() == "true"
+RESPONSE_CACHE_PATH = os.getenv("RESPONSE_CACHE_PATH", DEFAULT_RESPONSE_CACHE_PATH)
+RESPONSE_CACHE_MEMORY_SIZE = int(os.getenv("RESPONSE_CACHE_MEMORY_SIZE", "256"))
+# Expired disk rows are deleted on open and every N writes
+RESPONSE_CACHE_PURGE_EVERY = max(1, int(os.getenv("RESPONSE_CACHE_PURGE_EVERY", "200")))
+RESPONSE_CACHE_TTL = int(os.getenv("RESPONSE_CACHE_TTL", str(7 * 24 * 3600)))
+# Agents whose LLM calls are cached (comma-separated node names)
+RESPONSE_CACHE_AGENTS = {
+    agent.strip() for agent in os.getenv("RESPONSE_CACHE_AGENTS", "framework_designer").split(",") if agent.strip()
+}
+
+# Set per request by the API layer when the client asks for a fresh answer
+cache_bypass: contextvars.ContextVar[bool] = contextvars.ContextVar("response_cache_bypass", default=False)
+
+
+def is_cache_enabled(agent: Optional[str]) -> bool:
+    """Whether an agent's LLM calls go through the response cache"""
+    return RESPONSE_CACHE_ENABLED and agent in RESPONSE_CACHE_AGENTS
+
+
+def _schema_id(schema: Any) -> str:
+    # Class name plus JSON schema, so editing a field invalidates old entries
+    if schema is None:
+        return ""
+    describe = getattr(schema, "model_json_schema", None)
+    return f"{schema.__module__}.{schema.__qualname__}:{json.dumps(describe(), sort_keys=True) if describe else ''}"
+
+
+def response_cache_key(model: str, temperature: float, messages: List[BaseMessage], schema: Any = None) -> str:
+    """Cache key from the model settings, the output schema and the prompt messages"""
+    prompt = [(msg.type, msg.content if isinstance(msg.content, str) else json.dumps(msg.content, sort_keys=True)) for msg in messages]
+    return make_cache_key(model, float(temperature), _schema_id(schema), json.dumps(prompt, ensure_ascii=False))
+
+
+def _serialize(result: Any) -> str:
+    # Messages are pydantic models too, so they are checked before model_dump
+    if isinstance(result, BaseMessage):
+        return json.dumps({"type": "message", "content": result.content}, ensure_ascii=False)
+    if hasattr(result, "model_dump"):
+        return json.dumps({"type": "structured", "data": result.model_dump()}, ensure_ascii=False)
+    return json.dumps({"type": "message", "content": getattr(result, "content", str(result))}, ensure_ascii=False)
+
+
+def _deserialize(payload: str, schema: Any) -> Any:
+    data = json.loads(payload)
+    if data["type"] == "structured" and schema is not None:
+        return schema.model_validate(data["data"])
+    return AIMessage(content=data.get("content", ""))
+
+
+class ResponseCache:
+    """
+    Two-tier (memory + SQLite) cache of LLM responses
+
+    Args:
+        path: SQLite file (None = memory tier only)
+        memory_size: Entries kept in the in-memory LRU
+        ttl: Entry lifetime in seconds
+    """
+
+    def __init__(self, path: Optional[str] = RESPONSE_CACHE_PATH, memory_size: int = RESPONSE_CACHE_MEMORY_SIZE, ttl: int = RESPONSE_CACHE_TTL):
+        self.path = path
+        self.ttl = ttl
+        self.memory = TTLCache(maxsize=memory_size, ttl=ttl)
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self.disk_hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.purged = 0
+        self.bypasses = 0
+        self.agent_stats: Dict[str, Dict[str, int]] = {}
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS response_cache (
+                    key TEXT PRIMARY KEY,
+                    agent TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_response_cache_expires ON response_cache (expires_at)")
+            self._purge(conn)
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def _count(self, agent: str, field: str):
+        counters = self.agent_stats.setdefault(agent, {"hits": 0, "misses": 0})
+        counters[field] += 1
+
+    def get_memory(self, key: str) -> Optional[str]:
+        """Serialized response from the memory tier"""
+        return self.memory.get(key)
+
+    def get_disk(self, key: str) -> Optional[str]:
+        """Serialized response from disk (promoted to the memory tier)"""
+        if not self.path:
+            return None
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT payload, expires_at FROM response_cache WHERE key = ? AND expires_at > ?",
+                (key, time.time())
+            ).fetchone()
+        if not row:
+            return None
+        self.memory.set(key, row[0], ttl=row[1] - time.time())
+        self.disk_hits += 1
+        return row[0]
+
+    def set(self, key: str, agent: str, payload: str):
+        """Store a serialized response in both tiers"""
+        self.memory.set(key, payload)
+        self.stores += 1
+        if self.path:
+            now = time.time()
+            with self._lock:
+                conn = self._connect()
+                conn.execute(
+                    "INSERT OR REPLACE INTO response_cache (key, agent, payload, created_at, expires_at) VALUES (?, ?, ?, ?, ?)",
+                    (key, agent, payload, now, now + self.ttl)
+                )
+                if self.stores % RESPONSE_CACHE_PURGE_EVERY == 0:
+                    self._purge(conn)
+                conn.commit()
+
+    def _purge(self, conn: sqlite3.Connection) -> int:
+        deleted = conn.execute("DELETE FROM response_cache WHERE expires_at <= ?", (time.time(),)).rowcount
+        self.purged += deleted
+        return deleted
+
+    def purge_expired(self) -> int:
+        """Delete expired rows from disk"""
+        if not self.path:
+            return 0
+        with self._lock:
+            conn = self._connect()
+            deleted = self._purge(conn)
+            conn.commit()
+            return deleted
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit rates per tier and per agent"""
+        hits = self.memory.hits + self.disk_hits
+        lookups = hits + self.misses
+        return {
+            "enabled": RESPONSE_CACHE_ENABLED,
+            "agents": sorted(RESPONSE_CACHE_AGENTS),
+            "hits": hits,
+            "memory_hits": self.memory.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "stores": self.stores,
+            "purged": self.purged,
+            "bypasses": self.bypasses,
+            "memory": self.memory.stats(),
+            "per_agent": {
+                agent: {
+                    **counters,
+                    "hit_rate": round(counters["hits"] / (counters["hits"] + counters["misses"]), 4)
+                    if counters["hits"] + counters["misses"] else 0.0,
+                }
+                for agent, counters in self.agent_stats.items()
+            },
+        }
+
+
+# Shared cache instance
+response_cache = ResponseCache()
+
+
+class CachedLLM:
+    """
+    Runnable wrapper that answers repeated prompts from the response cache
+
+    Args:
+        runnable: LLM client or wrapper (with_structured_output / bind_tools)
+        agent: Agent node name (for opt-in and metrics)
+        model: Model name (part of the key)
+        temperature: Temperature (part of the key)
+        schema: Structured output schema, if any
+    """
+
+    def __init__(self, runnable: Any, agent: str, model: str, temperature: float, schema: Any = None):
+        self.runnable = runnable
+        self.agent = agent
+        self.model = model
+        self.temperature = temperature
+        self.schema = schema
+
+    async def ainvoke(self, messages: List[BaseMessage], *args, **kwargs) -> Any:
+        key = response_cache_key(self.model, self.temperature, messages, self.schema)
+        if cache_bypass.get():
+            response_cache.bypasses += 1
+        else:
+            payload = response_cache.get_memory(key)
+            if payload is None:
+                payload = await asyncio.to_thread(response_cache.get_disk, key)
+            if payload is not None:
+                response_cache._count(self.agent, "hits")
+                return _deserialize(payload, self.schema)
+            response_cache.misses += 1
+            response_cache._count(self.agent, "misses")
+
+        async def generate():
+            result = await self.runnable.ainvoke(messages, *args, **kwargs)
+            try:
+                await asyncio.to_thread(response_cache.set, key, self.agent, _serialize(result))
+            except Exception as e:
+                print(f"Response cache store failed: {e}")
+            return result
+
+        if cache_bypass.get():
+            # A bypass asks for a fresh answer, so it never joins an in-flight call
+            return await generate()
+        # Identical prompts already being generated share one upstream call
+        return await singleflight.do("agent", key, generate)
+
+    def __getattr__(self, name: str) -> Any:
+        # Everything else (invoke, astream, bind, ...) goes to the wrapped runnable uncached
+        return getattr(self.runnable, name)
+
+
+def get_response_cache_stats() -> Dict[str, Any]:
+    """Response cache statistics"""
+    return response_cache.stats()
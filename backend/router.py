@@ -0,0 +1,375 @@
+"""
+Deterministic fast-path router for FounderOS
+
+Scores every agent against per-agent keyword sets. Keywords containing
+Hangul are found with a single Aho-Corasick pass that ignores case, spacing
+and light punctuation, so "린 캔버스" and "린캔버스" hit the same keyword.
+Latin keywords match whole words only ("seo" does not match "Seoul", "nda"
+not "Monday"), with any separator between their parts ("lean-canvas").
+When one agent clearly wins, the supervisor routes without an LLM call.
+
+Follow-up turns stay on the thread's current agent (conversation affinity)
+unless a cheap topic-shift detector fires.
+"""
+
+import os
+import re
+import unicodedata
+from collections import deque
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from cache import TTLCache, make_cache_key
+
+
+# Keyword sets per graph node, in tie-break priority order (more specific first)
+ROUTING_KEYWORDS: Dict[str, List[str]] = {
+    "framework_designer": ["lean canvas", "business model canvas", "bmc", "캔버스", "린캔버스", "비즈니스모델캔버스", "비즈니스 모델 캔버스"],
+    "grant_hunter": ["보조금", "지원사업", "k-startup", "k startup", "정부", "지원", "grant", "government", "funding", "자금조달", "지원금"],
+    "market_sensor": ["경쟁사", "시장", "트렌드", "경쟁력", "시장분석", "market", "competitor", "trend", "analysis", "경쟁", "시장규모"],
+    "mvp_builder": ["코드", "개발", "mvp", "prd", "프로토타입", "프로그래밍", "code", "build", "prototype", "programming", "개발해", "만들어", "기술", "구현"],
+    "vc_simulator": ["투자", "vc", "벤처캐피털", "피치", "펀드레이징", "investor", "pitch", "fundraising", "투자유치", "피치덱"],
+    "growth_hacker": ["마케팅", "홍보", "콘텐츠", "콜드 이메일", "소셜미디어", "소셜 미디어", "블로그", "seo", "성장", "마케팅 글", "포스트", "이메일 작성", "marketing", "growth", "content", "email"],
+    "legal_advisor": ["계약서", "법률", "nda", "비밀유지서약서", "법률 검토", "변호사", "조항", "합의서", "계약", "법률 자문", "contract", "legal", "lawyer", "clause", "agreement", "mou"],
+    "cofounder": ["비즈니스", "전략", "모델", "아이디어", "창업", "business", "strategy", "cofounder", "idea", "startup"],
+}
+
+DEFAULT_AGENT = "cofounder"
+
+# Explicit agent mentions ("그로스 해커한테 물어볼게") always trigger re-routing
+AGENT_MENTIONS: Dict[str, List[str]] = {
+    "cofounder": ["cofounder agent", "co-founder", "코파운더", "공동창업자"],
+    "vc_simulator": ["vc simulator", "vc 시뮬레이터", "투자자 시뮬레이터"],
+    "grant_hunter": ["grant hunter", "그랜트 헌터"],
+    "market_sensor": ["market sensor", "마켓 센서"],
+    "mvp_builder": ["mvp builder", "mvp 빌더"],
+    "framework_designer": ["framework designer", "프레임워크 디자이너"],
+    "growth_hacker": ["growth hacker", "그로스 해커"],
+    "legal_advisor": ["legal advisor", "리걸 어드바이저", "법률 자문가"],
+}
+
+# Minimum winning score (sum of matched keyword lengths) to skip the LLM
+FAST_ROUTER_MIN_SCORE = float(os.getenv("FAST_ROUTER_MIN_SCORE", "3"))
+# Winner must beat the runner-up by this factor to skip the LLM
+FAST_ROUTER_MARGIN = float(os.getenv("FAST_ROUTER_MARGIN", "2.0"))
+FAST_ROUTER_ENABLED = os.getenv("FAST_ROUTER_ENABLED", "true").lower() == "true"
+
+# LRU+TTL cache of supervisor LLM decisions
+ROUTING_CACHE_ENABLED = os.getenv("ROUTING_CACHE_ENABLED", "true").lower() == "true"
+ROUTING_CACHE_SIZE = int(os.getenv("ROUTING_CACHE_SIZE", "2048"))
+ROUTING_CACHE_TTL = float(os.getenv("ROUTING_CACHE_TTL", "3600"))
+
+# Conversation affinity: keep follow-up turns on the current agent
+AFFINITY_ENABLED = os.getenv("ROUTING_AFFINITY_ENABLED", "true").lower() == "true"
+# Messages with fewer character bigrams than this are treated as follow-ups
+AFFINITY_MIN_BIGRAMS = int(os.getenv("ROUTING_AFFINITY_MIN_BIGRAMS", "8"))
+# Share of the message's bigrams that must appear in recent turns
+AFFINITY_MIN_SIMILARITY = float(os.getenv("ROUTING_AFFINITY_MIN_SIMILARITY", "0.15"))
+# Number of previous messages compared against
+AFFINITY_CONTEXT_MESSAGES = 4
+
+_STRIP_PATTERN = re.compile(r"[\s\-_·.,!?~'\"()\[\]]+")
+_HANGUL_PATTERN = re.compile(r"[\u3131-\u318e\uac00-\ud7a3]")
+_SEPARATOR = r"[\s\-_·.]*"
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase, NFKC-normalize and drop whitespace/punctuation (spacing-insensitive)"""
+    text = unicodedata.normalize("NFKC", text or "").lower()
+    return _STRIP_PATTERN.sub("", text)
+
+
+def is_hangul_keyword(keyword: str) -> bool:
+    """Keywords with Hangul are matched spacing-insensitively; Latin ones on word boundaries"""
+    return bool(_HANGUL_PATTERN.search(keyword))
+
+
+def compile_word_pattern(keywords: List[str]) -> Optional["re.Pattern"]:
+    """
+    One regex matching Latin keywords as whole words
+
+    A keyword's parts may be joined by any separator ("k-startup" / "k startup").
+    Only ASCII letters and digits count as word characters, so a Korean
+    particle right after the keyword ("vc가", "mvp를") still matches.
+    """
+    alternatives = []
+    for keyword in sorted(keywords, key=len, reverse=True):
+        parts = [re.escape(part) for part in re.split(r"[\s\-_·.]+", unicodedata.normalize("NFKC", keyword).lower()) if part]
+        if parts:
+            alternatives.append(_SEPARATOR.join(parts))
+    if not alternatives:
+        return None
+    return re.compile(r"(?<![a-z0-9])(?:" + "|".join(alternatives) + r")(?![a-z0-9])")
+
+
+class AhoCorasickMatcher:
+    """Multi-pattern substring matcher (Aho-Corasick automaton)"""
+
+    def __init__(self, patterns: List[str]):
+        # Trie as list of transition dicts; outputs hold pattern indices per state
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[int]] = [[]]
+        self.patterns = list(patterns)
+
+        for index, pattern in enumerate(self.patterns):
+            state = 0
+            for char in pattern:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                state = next_state
+            self._output[state].append(index)
+
+        # Breadth-first construction of failure links
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(char, 0)
+                self._output[next_state].extend(self._output[self._fail[next_state]])
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int]]:
+        """
+        Find all pattern occurrences
+
+        Args:
+            text: Text to scan (already normalized)
+
+        Yields:
+            (end_position, pattern_index) for every match, including overlaps
+        """
+        state = 0
+        for position, char in enumerate(text):
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            for index in self._output[state]:
+                yield position, index
+
+
+class KeywordRouter:
+    """Scores agents by keyword hits and routes when one agent clearly wins"""
+
+    def __init__(
+        self,
+        keyword_sets: Dict[str, List[str]] = None,
+        min_score: float = FAST_ROUTER_MIN_SCORE,
+        margin: float = FAST_ROUTER_MARGIN,
+        default_agent: str = DEFAULT_AGENT
+    ):
+        keyword_sets = keyword_sets or ROUTING_KEYWORDS
+        self.agents = list(keyword_sets.keys())
+        self.min_score = min_score
+        self.margin = margin
+        self.default_agent = default_agent
+
+        # Normalized keyword -> agents it belongs to (same keyword may serve several agents)
+        self._keyword_agents: Dict[str, List[str]] = {}
+        latin_keywords = []
+        for agent, keywords in keyword_sets.items():
+            for keyword in keywords:
+                normalized = normalize_text(keyword)
+                if not normalized:
+                    continue
+                if normalized not in self._keyword_agents and not is_hangul_keyword(keyword):
+                    latin_keywords.append(keyword)
+                if agent not in self._keyword_agents.setdefault(normalized, []):
+                    self._keyword_agents[normalized].append(agent)
+
+        self._matcher = AhoCorasickMatcher([keyword for keyword in self._keyword_agents if is_hangul_keyword(keyword)])
+        self._word_pattern = compile_word_pattern(latin_keywords)
+        self.stats = {"fast_routes": 0, "ambiguous": 0}
+
+    def score(self, message: str) -> Dict[str, float]:
+        """
+        Score every agent for a message
+
+        Each distinct matched keyword adds its (normalized) length, so longer,
+        more specific keywords outweigh short generic ones. A match nested inside
+        a longer keyword of another agent ("startup" inside "k-startup") is ignored.
+        Hangul keywords are matched in the whitespace-stripped text, Latin
+        keywords as whole words in the original text.
+
+        Args:
+            message: User message
+
+        Returns:
+            Dict of agent -> score (all agents present)
+        """
+        spans = []
+        for end, index in self._matcher.iter_matches(normalize_text(message)):
+            keyword = self._matcher.patterns[index]
+            spans.append((end - len(keyword) + 1, end, keyword))
+
+        scores = {agent: 0.0 for agent in self.agents}
+        counted = set()
+        if self._word_pattern is not None:
+            # Longest alternative wins at each position, so nested words never match
+            for match in self._word_pattern.finditer(unicodedata.normalize("NFKC", message or "").lower()):
+                keyword = normalize_text(match.group(0))
+                if keyword in counted:
+                    continue
+                counted.add(keyword)
+                for agent in self._keyword_agents[keyword]:
+                    scores[agent] += len(keyword)
+        for start, end, keyword in spans:
+            if keyword in counted:
+                continue
+            agents = self._keyword_agents[keyword]
+            nested = any(
+                other_start <= start and end <= other_end and len(other) > len(keyword)
+                and not set(self._keyword_agents[other]) & set(agents)
+                for other_start, other_end, other in spans
+            )
+            if nested:
+                continue
+            counted.add(keyword)
+            for agent in agents:
+                scores[agent] += len(keyword)
+        return scores
+
+    def ranked(self, message: str) -> List[Tuple[str, float]]:
+        """Agents sorted by score (ties broken by keyword-set priority order)"""
+        scores = self.score(message)
+        return sorted(scores.items(), key=lambda item: (-item[1], self.agents.index(item[0])))
+
+    def route(self, message: str) -> Optional[str]:
+        """
+        Route confidently or defer to the LLM
+
+        Args:
+            message: User message
+
+        Returns:
+            Node name when one agent clearly wins, otherwise None
+        """
+        ranked = self.ranked(message)
+        (top_agent, top_score), (_, second_score) = ranked[0], ranked[1]
+        if top_score >= self.min_score and top_score >= self.margin * second_score:
+            self.stats["fast_routes"] += 1
+            return top_agent
+        self.stats["ambiguous"] += 1
+        return None
+
+    def best(self, message: str) -> str:
+        """Best-scoring agent, or the default agent when nothing matches"""
+        top_agent, top_score = self.ranked(message)[0]
+        return top_agent if top_score > 0 else self.default_agent
+
+
+def _bigrams(text: str) -> set:
+    """Character bigrams of the normalized text"""
+    text = normalize_text(text)
+    return {text[i:i + 2] for i in range(len(text) - 1)}
+
+
+def context_similarity(message: str, previous_texts: List[str]) -> float:
+    """
+    Share of the message's character bigrams found in recent turns
+
+    Containment (not Jaccard) so a short follow-up is compared fairly
+    against a long previous answer.
+
+    Args:
+        message: New user message
+        previous_texts: Contents of the previous turns
+
+    Returns:
+        Similarity in [0, 1]
+    """
+    grams = _bigrams(message)
+    if not grams:
+        return 1.0
+    context = set()
+    for text in previous_texts:
+        context |= _bigrams(text)
+    return len(grams & context) / len(grams)
+
+
+class TopicShiftDetector:
+    """Decides whether a follow-up can stay on the thread's current agent"""
+
+    def __init__(
+        self,
+        router: KeywordRouter,
+        mentions: Dict[str, List[str]] = None,
+        min_bigrams: int = AFFINITY_MIN_BIGRAMS,
+        min_similarity: float = AFFINITY_MIN_SIMILARITY
+    ):
+        self.router = router
+        self.min_bigrams = min_bigrams
+        self.min_similarity = min_similarity
+        self._mentions = KeywordRouter(mentions or AGENT_MENTIONS, min_score=1, margin=1)
+        self.stats = {"affinity_routes": 0, "shift_mention": 0, "shift_keywords": 0, "shift_similarity": 0}
+
+    def detect(self, message: str, last_agent: str, previous_texts: List[str]) -> Optional[str]:
+        """
+        Check for a topic shift away from last_agent
+
+        Args:
+            message: New user message
+            last_agent: Node that answered the previous turn
+            previous_texts: Contents of the previous turns (most recent last)
+
+        Returns:
+            Shift reason ("mention", "keywords", "similarity"), or None to stay
+        """
+        # 1. Explicit mention of another agent
+        mentioned, mention_score = self._mentions.ranked(message)[0]
+        if mention_score > 0 and mentioned != last_agent:
+            self.stats["shift_mention"] += 1
+            return "mention"
+
+        # 2. Keywords clearly pointing at a different domain
+        ranked = self.router.ranked(message)
+        (top_agent, top_score), (_, second_score) = ranked[0], ranked[1]
+        current_score = dict(ranked).get(last_agent, 0.0)
+        if (
+            top_agent != last_agent
+            and top_score >= self.router.min_score
+            and top_score >= self.router.margin * max(second_score, current_score)
+        ):
+            self.stats["shift_keywords"] += 1
+            return "keywords"
+
+        # 3. Long message with little overlap with the recent conversation
+        if current_score == 0 and len(_bigrams(message)) >= self.min_bigrams:
+            recent = previous_texts[-AFFINITY_CONTEXT_MESSAGES:]
+            if context_similarity(message, recent) < self.min_similarity:
+                self.stats["shift_similarity"] += 1
+                return "similarity"
+
+        self.stats["affinity_routes"] += 1
+        return None
+
+
+# Shared router instance
+keyword_router = KeywordRouter()
+
+# Shared topic-shift detector for conversation affinity
+topic_shift_detector = TopicShiftDetector(keyword_router)
+
+# Shared routing decision cache
+routing_cache = TTLCache(maxsize=ROUTING_CACHE_SIZE, ttl=ROUTING_CACHE_TTL)
+
+
+def routing_cache_key(message: str, last_agent: str = "") -> str:
+    """Cache key from the normalized message and the agent that answered last"""
+    return make_cache_key("routing", normalize_text(message), last_agent or "")
+
+
+def get_router_stats() -> Dict[str, Any]:
+    """Fast-path routing, affinity counters and routing cache stats"""
+    return {
+        **keyword_router.stats,
+        "affinity": dict(topic_shift_detector.stats),
+        "cache": routing_cache.stats()
+    }
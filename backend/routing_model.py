@@ -0,0 +1,394 @@
+"""
+Learned routing classifier for FounderOS
+
+A CPU-only linear (softmax) classifier over hashed character n-grams that
+predicts the graph node for a user message in well under a millisecond.
+It is trained offline from routing logs written by the supervisor:
+
+    python routing_model.py train --logs routing_log.jsonl --output models/routing_model.npz
+
+The supervisor consults it after the keyword fast path and only calls the
+LLM when the model's confidence is below its threshold.
+"""
+
+import argparse
+import json
+import math
+import os
+import sys
+import time
+import zlib
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from router import normalize_text
+
+
+# Bump when the on-disk layout changes
+MODEL_FORMAT_VERSION = 1
+
+ROUTING_MODEL_PATH = os.getenv("ROUTING_MODEL_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "models", "routing_model.npz"))
+ROUTING_LOG_PATH = os.getenv("ROUTING_LOG_PATH", "")
+ROUTING_MODEL_ENABLED = os.getenv("ROUTING_MODEL_ENABLED", "true").lower() == "true"
+# Overrides the threshold stored in the model file when set
+ROUTING_MODEL_THRESHOLD = os.getenv("ROUTING_MODEL_THRESHOLD")
+
+DEFAULT_DIM = 2 ** 14
+DEFAULT_NGRAMS = (1, 3)
+
+# Decisions from these sources are not used for training by default
+# (model predictions would feed back into themselves, fallbacks are guesses,
+# cache hits repeat an already-logged LLM decision, and affinity decisions
+# depend on the conversation rather than the message alone)
+EXCLUDED_TRAINING_SOURCES = {"model", "fallback", "cache", "affinity"}
+
+
+def _ngram_counts(text: str, ngram_range: Tuple[int, int]) -> Counter:
+    """Character n-gram counts over the normalized text (with boundary markers)"""
+    text = f"^{normalize_text(text)}$"
+    counts = Counter()
+    low, high = ngram_range
+    for n in range(low, high + 1):
+        for i in range(len(text) - n + 1):
+            counts[text[i:i + n]] += 1
+    return counts
+
+
+def extract_features(text: str, dim: int = DEFAULT_DIM, ngram_range: Tuple[int, int] = DEFAULT_NGRAMS):
+    """
+    Hash character n-grams into a sparse, L2-normalized feature vector
+
+    Uses crc32 so feature indices are stable across processes (unlike hash()).
+
+    Args:
+        text: Input text
+        dim: Number of hash buckets
+        ngram_range: (min_n, max_n) character n-gram sizes
+
+    Returns:
+        (indices, values) arrays
+    """
+    counts = _ngram_counts(text, ngram_range)
+    if not counts:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+
+    raw_indices = np.fromiter((zlib.crc32(gram.encode("utf-8")) % dim for gram in counts), dtype=np.int64, count=len(counts))
+    raw_values = np.fromiter((1.0 + math.log(count) for count in counts.values()), dtype=np.float32, count=len(counts))
+
+    # Merge hash collisions
+    indices, inverse = np.unique(raw_indices, return_inverse=True)
+    values = np.bincount(inverse, weights=raw_values).astype(np.float32)
+
+    norm = float(np.linalg.norm(values))
+    if norm > 0:
+        values /= norm
+    return indices, values
+
+
+class RoutingModel:
+    """Softmax classifier over hashed n-gram features"""
+
+    def __init__(
+        self,
+        labels: List[str],
+        weights,
+        bias,
+        dim: int = DEFAULT_DIM,
+        ngram_range: Tuple[int, int] = DEFAULT_NGRAMS,
+        threshold: float = 0.8,
+        version: str = ""
+    ):
+        self.labels = list(labels)
+        self.weights = weights
+        self.bias = bias
+        self.dim = dim
+        self.ngram_range = tuple(ngram_range)
+        self.threshold = threshold
+        self.version = version
+
+    def predict_proba(self, message: str):
+        """Class probabilities for one message"""
+        indices, values = extract_features(message, self.dim, self.ngram_range)
+        logits = values @ self.weights[indices] + self.bias
+        logits = logits - logits.max()
+        probs = np.exp(logits)
+        return probs / probs.sum()
+
+    def predict(self, message: str) -> Tuple[str, float]:
+        """
+        Predict the node for a message
+
+        Returns:
+            (node name, confidence)
+        """
+        probs = self.predict_proba(message)
+        best = int(np.argmax(probs))
+        return self.labels[best], float(probs[best])
+
+    def route(self, message: str) -> Optional[str]:
+        """Node name when confidence clears the threshold, otherwise None"""
+        label, confidence = self.predict(message)
+        return label if confidence >= self.threshold else None
+
+    def save(self, path: str):
+        """Write the model to a versioned .npz file"""
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        meta = {
+            "format_version": MODEL_FORMAT_VERSION,
+            "version": self.version,
+            "labels": self.labels,
+            "dim": self.dim,
+            "ngram_range": list(self.ngram_range),
+            "threshold": self.threshold,
+        }
+        with open(path, "wb") as f:
+            np.savez_compressed(f, weights=self.weights, bias=self.bias, meta=np.array(json.dumps(meta)))
+
+    @classmethod
+    def load(cls, path: str) -> "RoutingModel":
+        """Load a model written by save()"""
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data["meta"]))
+            if meta.get("format_version") != MODEL_FORMAT_VERSION:
+                raise ValueError(f"Unsupported routing model format: {meta.get('format_version')}")
+            return cls(
+                labels=meta["labels"],
+                weights=data["weights"],
+                bias=data["bias"],
+                dim=meta["dim"],
+                ngram_range=tuple(meta["ngram_range"]),
+                threshold=meta["threshold"],
+                version=meta["version"],
+            )
+
+
+def train_model(
+    messages: List[str],
+    labels: List[str],
+    dim: int = DEFAULT_DIM,
+    ngram_range: Tuple[int, int] = DEFAULT_NGRAMS,
+    epochs: int = 40,
+    learning_rate: float = 5.0,
+    l2: float = 1e-5,
+    batch_size: int = 256,
+    seed: int = 0
+) -> RoutingModel:
+    """
+    Train a softmax classifier with mini-batch gradient descent
+
+    Args:
+        messages: Training messages
+        labels: Node name per message
+        dim: Number of hash buckets
+        ngram_range: Character n-gram sizes
+        epochs: Passes over the data
+        learning_rate: Step size
+        l2: L2 regularization strength
+        batch_size: Mini-batch size
+        seed: Shuffle seed
+
+    Returns:
+        Trained RoutingModel (threshold 0.8 until calibrated)
+    """
+    label_names = sorted(set(labels))
+    label_index = {label: i for i, label in enumerate(label_names)}
+    y = np.array([label_index[label] for label in labels], dtype=np.int64)
+    features = [extract_features(message, dim, ngram_range) for message in messages]
+
+    rng = np.random.default_rng(seed)
+    weights = np.zeros((dim, len(label_names)), dtype=np.float32)
+    bias = np.zeros(len(label_names), dtype=np.float32)
+
+    for _ in range(epochs):
+        order = rng.permutation(len(features))
+        for start in range(0, len(order), batch_size):
+            batch = order[start:start + batch_size]
+
+            # Dense mini-batch (batch_size x dim) keeps memory bounded
+            x = np.zeros((len(batch), dim), dtype=np.float32)
+            for row, sample in enumerate(batch):
+                indices, values = features[sample]
+                x[row, indices] = values
+
+            logits = x @ weights + bias
+            logits -= logits.max(axis=1, keepdims=True)
+            probs = np.exp(logits)
+            probs /= probs.sum(axis=1, keepdims=True)
+            probs[np.arange(len(batch)), y[batch]] -= 1.0
+            probs /= len(batch)
+
+            weights -= learning_rate * (x.T @ probs + l2 * weights)
+            bias -= learning_rate * probs.sum(axis=0)
+
+    return RoutingModel(
+        labels=label_names,
+        weights=weights,
+        bias=bias,
+        dim=dim,
+        ngram_range=ngram_range,
+        version=time.strftime("%Y%m%d%H%M%S")
+    )
+
+
+def calibrate_threshold(model: RoutingModel, messages: List[str], labels: List[str], target_precision: float) -> Tuple[float, float, float]:
+    """
+    Pick the lowest confidence threshold whose routed messages reach the target precision
+
+    Args:
+        model: Trained model
+        messages: Held-out messages
+        labels: Held-out labels
+        target_precision: Required accuracy on messages the model routes
+
+    Returns:
+        (threshold, precision, coverage) on the held-out set
+    """
+    predictions = [model.predict(message) for message in messages]
+    order = sorted(range(len(predictions)), key=lambda i: -predictions[i][1])
+
+    best = (1.01, 1.0, 0.0)
+    correct = 0
+    for rank, i in enumerate(order, start=1):
+        correct += predictions[i][0] == labels[i]
+        precision = correct / rank
+        if precision >= target_precision:
+            best = (predictions[i][1], precision, rank / len(order))
+    return best
+
+
+def read_routing_logs(paths: Iterable[str], excluded_sources: Iterable[str] = EXCLUDED_TRAINING_SOURCES) -> Tuple[List[str], List[str]]:
+    """
+    Read (message, node) pairs from JSONL routing logs
+
+    Args:
+        paths: Log files written by log_routing_decision()
+        excluded_sources: Decision sources to skip
+
+    Returns:
+        (messages, labels)
+    """
+    excluded = set(excluded_sources)
+    messages, labels = [], []
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if record.get("source") in excluded or not record.get("message") or not record.get("agent"):
+                    continue
+                messages.append(record["message"])
+                labels.append(record["agent"])
+    return messages, labels
+
+
+def log_routing_decision(message: str, agent: str, source: str):
+    """
+    Append a routing decision to ROUTING_LOG_PATH (no-op when unset)
+
+    Args:
+        message: User message
+        agent: Chosen node name
+        source: Which stage decided (affinity, fast_path, model, cache, llm, fallback)
+    """
+    if not ROUTING_LOG_PATH:
+        return
+    record = {"ts": time.time(), "message": message, "agent": agent, "source": source}
+    try:
+        with open(ROUTING_LOG_PATH, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    except OSError as e:
+        print(f"Warning: could not write routing log: {e}")
+
+
+# Lazily loaded shared model (None when unavailable)
+_routing_model = None
+_routing_model_loaded = False
+
+
+def get_routing_model() -> Optional[RoutingModel]:
+    """Get the shared routing model, or None if disabled, missing, or numpy is not installed"""
+    global _routing_model, _routing_model_loaded
+    if _routing_model_loaded:
+        return _routing_model
+    _routing_model_loaded = True
+
+    if not ROUTING_MODEL_ENABLED or np is None or not os.path.exists(ROUTING_MODEL_PATH):
+        return None
+    try:
+        _routing_model = RoutingModel.load(ROUTING_MODEL_PATH)
+        if ROUTING_MODEL_THRESHOLD:
+            _routing_model.threshold = float(ROUTING_MODEL_THRESHOLD)
+        print(f"Loaded routing model {_routing_model.version} (threshold {_routing_model.threshold:.2f})")
+    except Exception as e:
+        print(f"Warning: could not load routing model: {e}")
+        _routing_model = None
+    return _routing_model
+
+
+def main(argv: List[str] = None):
+    """Training CLI"""
+    parser = argparse.ArgumentParser(description="Train the FounderOS routing classifier from routing logs")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    train = subparsers.add_parser("train", help="Train a model from JSONL routing logs")
+    train.add_argument("--logs", nargs="+", required=True, help="Routing log files (JSONL)")
+    train.add_argument("--output", default=ROUTING_MODEL_PATH, help="Model file to write (.npz)")
+    train.add_argument("--dim", type=int, default=DEFAULT_DIM, help="Hash buckets")
+    train.add_argument("--epochs", type=int, default=40)
+    train.add_argument("--learning-rate", type=float, default=5.0)
+    train.add_argument("--holdout", type=float, default=0.2, help="Fraction held out for threshold calibration")
+    train.add_argument("--target-precision", type=float, default=0.95, help="Required precision on routed messages")
+    train.add_argument("--min-threshold", type=float, default=0.6, help="Never route below this confidence")
+    train.add_argument("--include-sources", nargs="*", default=None, help="Also train on these excluded sources (e.g. fallback)")
+
+    args = parser.parse_args(argv)
+
+    if np is None:
+        parser.error("numpy is required to train the routing model")
+
+    excluded = EXCLUDED_TRAINING_SOURCES - set(args.include_sources or [])
+    messages, labels = read_routing_logs(args.logs, excluded)
+    if len(set(labels)) < 2:
+        parser.error("need logged decisions for at least two agents")
+    print(f"Loaded {len(messages)} routing decisions ({len(set(labels))} agents)")
+
+    order = np.random.default_rng(0).permutation(len(messages))
+    split = int(len(order) * (1 - args.holdout))
+    train_idx, holdout_idx = order[:split], order[split:]
+
+    model = train_model(
+        [messages[i] for i in train_idx],
+        [labels[i] for i in train_idx],
+        dim=args.dim,
+        epochs=args.epochs,
+        learning_rate=args.learning_rate
+    )
+
+    if len(holdout_idx):
+        threshold, precision, coverage = calibrate_threshold(
+            model,
+            [messages[i] for i in holdout_idx],
+            [labels[i] for i in holdout_idx],
+            args.target_precision
+        )
+        model.threshold = max(threshold, args.min_threshold)
+        print(f"Calibrated threshold {threshold:.3f}: precision {precision:.3f}, coverage {coverage:.1%} on {len(holdout_idx)} held-out messages")
+
+    model.save(args.output)
+    print(f"Saved routing model {model.version} (threshold {model.threshold:.3f}) to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,328 @@
+"""
+Quota-aware LLM call scheduler for FounderOS
+
+Gemini limits used to surface only as 429 errors that the API layer turned
+into an apology. Every LLM call from llm.py's getters now passes through a
+per-model scheduler first:
+- Requests-per-minute and tokens-per-minute budgets are token buckets,
+  refilled continuously
+- Waiting calls are served by priority (supervisor routing, then
+  interactive agent answers, then background summaries)
+- A call whose expected queue wait exceeds its priority's limit is degraded
+  to LLM_DEGRADE_MODEL when that model can serve it sooner, or shed with
+  LLMQuotaError (routing then falls back to keywords, summaries are skipped)
+- A 429 from the API empties the model's buckets, so other calls back off
+  instead of producing a storm of errors
+"""
+
+import asyncio
+import heapq
+import itertools
+import os
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from cache import estimate_tokens
+
+
+LLM_SCHEDULER_ENABLED = os.getenv("LLM_SCHEDULER_ENABLED", "true").lower() == "true"
+
+# Per-model (requests/minute, tokens/minute); "model=rpm/tpm,..." in LLM_QUOTAS overrides
+MODEL_QUOTAS: Dict[str, Tuple[float, float]] = {
+    "gemini-2.0-flash": (15, 1_000_000),
+    "gemini-2.0-flash-lite": (30, 1_000_000),
+}
+DEFAULT_QUOTA = (15, 1_000_000)
+
+# Lighter model that absorbs overflow when the main model's queue is too long ("" disables)
+LLM_DEGRADE_MODEL = os.getenv("LLM_DEGRADE_MODEL", "gemini-2.0-flash-lite")
+
+# Priorities (lower is served first)
+PRIORITY_ROUTING = 0
+PRIORITY_INTERACTIVE = 1
+PRIORITY_BACKGROUND = 2
+PRIORITY_NAMES = {PRIORITY_ROUTING: "routing", PRIORITY_INTERACTIVE: "interactive", PRIORITY_BACKGROUND: "background"}
+
+# Longest acceptable queue wait per priority in seconds (LLM_MAX_QUEUE_WAIT_<NAME> overrides)
+MAX_QUEUE_WAIT: Dict[int, float] = {
+    PRIORITY_ROUTING: float(os.getenv("LLM_MAX_QUEUE_WAIT_ROUTING", "5")),
+    PRIORITY_INTERACTIVE: float(os.getenv("LLM_MAX_QUEUE_WAIT_INTERACTIVE", "20")),
+    PRIORITY_BACKGROUND: float(os.getenv("LLM_MAX_QUEUE_WAIT_BACKGROUND", "60")),
+}
+
+# Output tokens assumed per call until the response reports real usage
+EXPECTED_OUTPUT_TOKENS: Dict[int, int] = {
+    PRIORITY_ROUTING: 50,
+    PRIORITY_INTERACTIVE: 1000,
+    PRIORITY_BACKGROUND: 500,
+}
+
+
+def _parse_quotas(spec: str) -> Dict[str, Tuple[float, float]]:
+    quotas = {}
+    for item in spec.split(","):
+        if "=" not in item:
+            continue
+        model, limits = item.split("=", 1)
+        rpm, _, tpm = limits.partition("/")
+        quotas[model.strip()] = (float(rpm), float(tpm or DEFAULT_QUOTA[1]))
+    return quotas
+
+
+MODEL_QUOTAS.update(_parse_quotas(os.getenv("LLM_QUOTAS", "")))
+
+
+class LLMQuotaError(Exception):
+    """A call was shed because the model's quota cannot serve it in time"""
+
+
+def estimate_prompt_tokens(messages: Any) -> int:
+    """Prompt token estimate for a message list or a single input"""
+    items = messages if isinstance(messages, list) else [messages]
+    return estimate_tokens("".join(str(getattr(item, "content", item)) for item in items))
+
+
+class TokenBucket:
+    """
+    Continuously refilled bucket
+
+    Args:
+        per_minute: Capacity and refill per minute
+    """
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.level = self.capacity
+        self.updated_at = time.monotonic()
+
+    def refill(self, now: float):
+        self.level = min(self.capacity, self.level + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def time_until(self, amount: float) -> float:
+        """Seconds until `amount` is available (after refill)"""
+        missing = min(amount, self.capacity) - self.level
+        return max(0.0, missing / self.rate)
+
+    def take(self, amount: float):
+        self.level -= min(amount, self.capacity)
+
+
+class ModelScheduler:
+    """
+    Priority queue in front of one model's RPM/TPM buckets
+
+    Args:
+        model: Model name
+        rpm: Requests per minute
+        tpm: Tokens per minute
+    """
+
+    def __init__(self, model: str, rpm: float, tpm: float):
+        self.model = model
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self._queue: List[Tuple[int, int, float]] = []
+        self._condition: Optional[asyncio.Condition] = None
+        self._sequence = itertools.count()
+        self.stats = {"granted": 0, "shed": 0, "degraded": 0, "rate_limited": 0, "wait_ms": 0.0, "max_queue": 0}
+
+    def _refill(self) -> float:
+        now = time.monotonic()
+        self.requests.refill(now)
+        self.tokens.refill(now)
+        return now
+
+    def _time_until(self, requests: float, tokens: float) -> float:
+        return max(self.requests.time_until(requests), self.tokens.time_until(tokens))
+
+    def estimate_wait(self, priority: int, cost: float) -> float:
+        """Expected queue wait for a new call (calls of equal or higher priority go first)"""
+        self._refill()
+        ahead = [entry for entry in self._queue if entry[0] <= priority]
+        return self._time_until(len(ahead) + 1, sum(entry[2] for entry in ahead) + cost)
+
+    async def acquire(self, priority: int, cost: float):
+        """Wait until this call is at the head of the queue and both buckets can pay for it"""
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        entry = (priority, next(self._sequence), cost)
+        started = time.monotonic()
+        # Enqueue before taking the lock so wait estimates see every pending call
+        heapq.heappush(self._queue, entry)
+        self.stats["max_queue"] = max(self.stats["max_queue"], len(self._queue))
+        try:
+            async with self._condition:
+                try:
+                    while True:
+                        self._refill()
+                        if self._queue[0] is entry:
+                            delay = self._time_until(1, cost)
+                            if delay <= 0:
+                                heapq.heappop(self._queue)
+                                self.requests.take(1)
+                                self.tokens.take(cost)
+                                break
+                        else:
+                            delay = None
+                        try:
+                            await asyncio.wait_for(self._condition.wait(), timeout=delay)
+                        except asyncio.TimeoutError:
+                            pass
+                finally:
+                    self._condition.notify_all()
+        except BaseException:
+            # Cancelled while queued: leave the queue and let the next call move up
+            if entry in self._queue:
+                self._queue.remove(entry)
+                heapq.heapify(self._queue)
+            raise
+        self.stats["granted"] += 1
+        self.stats["wait_ms"] += (time.monotonic() - started) * 1000
+
+    def can_spare(self, requests: float) -> bool:
+        """Whether nothing is queued and `requests` calls could start right now"""
+        self._refill()
+        return not self._queue and self.requests.level >= requests
+
+    def settle(self, estimated: float, actual: Optional[float]):
+        """Correct the token bucket once the real usage is known"""
+        if actual is not None:
+            self.tokens.level = min(self.tokens.capacity, self.tokens.level + estimated - actual)
+
+    def rate_limited(self):
+        """The API returned 429: stop spending until the buckets refill"""
+        self._refill()
+        self.requests.level = min(self.requests.level, 0.0)
+        self.tokens.level = min(self.tokens.level, 0.0)
+        self.stats["rate_limited"] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        self._refill()
+        granted = self.stats["granted"] or 1
+        return {
+            "rpm_limit": self.requests.capacity,
+            "tpm_limit": self.tokens.capacity,
+            "requests_available": round(self.requests.level, 2),
+            "tokens_available": round(self.tokens.level),
+            "queued": len(self._queue),
+            **{key: value for key, value in self.stats.items() if key != "wait_ms"},
+            "avg_wait_ms": round(self.stats["wait_ms"] / granted, 1),
+        }
+
+
+_schedulers: Dict[str, ModelScheduler] = {}
+
+
+def get_model_scheduler(model: str) -> ModelScheduler:
+    """Scheduler for a model (created on first use)"""
+    scheduler = _schedulers.get(model)
+    if scheduler is None:
+        rpm, tpm = MODEL_QUOTAS.get(model, DEFAULT_QUOTA)
+        scheduler = _schedulers[model] = ModelScheduler(model, rpm, tpm)
+    return scheduler
+
+
+def is_rate_limit_error(error: BaseException) -> bool:
+    """Whether an exception is the API's rate-limit/quota response"""
+    text = str(error)
+    return "429" in text or "quota" in text.lower() or "ResourceExhausted" in type(error).__name__
+
+
+def _usage_tokens(response: Any) -> Optional[float]:
+    usage = getattr(response, "usage_metadata", None)
+    if isinstance(usage, dict) and usage.get("total_tokens"):
+        return float(usage["total_tokens"])
+    return None
+
+
+class CallTiming:
+    """Filled in by ScheduledLLM: serving model, admission and upstream latency"""
+
+    def __init__(self):
+        self.model: Optional[str] = None
+        self.admitted = asyncio.Event()  # set once the call leaves the queue
+        self.upstream_seconds: Optional[float] = None
+
+
+class ScheduledLLM:
+    """
+    Runnable wrapper that admits each call through the model's scheduler
+
+    Args:
+        runnable: LLM client or wrapper (bind_tools / with_structured_output)
+        model: Model name (selects the quota)
+        priority: PRIORITY_* constant
+        degrade: Optional factory building the same runnable for another model
+    """
+
+    def __init__(self, runnable: Any, model: str, priority: int, degrade: Optional[Callable[[str], Any]] = None):
+        self.runnable = runnable
+        self.model = model
+        self.priority = priority
+        self.degrade = degrade
+
+    def _choose(self, cost: float) -> Tuple[str, Any]:
+        scheduler = get_model_scheduler(self.model)
+        max_wait = MAX_QUEUE_WAIT[self.priority]
+        wait = scheduler.estimate_wait(self.priority, cost)
+        if wait <= max_wait:
+            return self.model, self.runnable
+        if self.degrade and LLM_DEGRADE_MODEL and LLM_DEGRADE_MODEL != self.model:
+            fallback_wait = get_model_scheduler(LLM_DEGRADE_MODEL).estimate_wait(self.priority, cost)
+            if fallback_wait <= max_wait:
+                scheduler.stats["degraded"] += 1
+                return LLM_DEGRADE_MODEL, self.degrade(LLM_DEGRADE_MODEL)
+        scheduler.stats["shed"] += 1
+        raise LLMQuotaError(
+            f"LLM quota exhausted for {self.model}: expected wait {wait:.1f}s exceeds "
+            f"{max_wait:g}s for {PRIORITY_NAMES[self.priority]} calls"
+        )
+
+    async def _upstream(self, runnable: Any, model: str, timing: Optional[CallTiming], messages: Any, args, kwargs) -> Any:
+        if timing is None:
+            return await runnable.ainvoke(messages, *args, **kwargs)
+        timing.model = model
+        timing.admitted.set()
+        started = time.monotonic()
+        response = await runnable.ainvoke(messages, *args, **kwargs)
+        timing.upstream_seconds = time.monotonic() - started
+        return response
+
+    async def ainvoke(self, messages: Any, *args, timing: Optional[CallTiming] = None, **kwargs) -> Any:
+        """
+        Admit the call through the scheduler, then invoke the runnable
+
+        Args:
+            timing: Optional CallTiming to report admission and upstream latency
+                    (excluding queue wait) to the caller
+        """
+        if not LLM_SCHEDULER_ENABLED:
+            return await self._upstream(self.runnable, self.model, timing, messages, args, kwargs)
+        cost = estimate_prompt_tokens(messages) + EXPECTED_OUTPUT_TOKENS[self.priority]
+        model, runnable = self._choose(cost)
+        scheduler = get_model_scheduler(model)
+        await scheduler.acquire(self.priority, cost)
+        try:
+            response = await self._upstream(runnable, model, timing, messages, args, kwargs)
+        except Exception as e:
+            if is_rate_limit_error(e):
+                scheduler.rate_limited()
+            raise
+        scheduler.settle(cost, _usage_tokens(response))
+        return response
+
+    def __getattr__(self, name: str) -> Any:
+        # Everything else (invoke, astream, bind, ...) goes to the wrapped runnable unscheduled
+        return getattr(self.runnable, name)
+
+
+def get_scheduler_stats() -> Dict[str, Any]:
+    """Scheduler state per model"""
+    return {
+        "enabled": LLM_SCHEDULER_ENABLED,
+        "degrade_model": LLM_DEGRADE_MODEL,
+        "max_queue_wait": {PRIORITY_NAMES[priority]: wait for priority, wait in MAX_QUEUE_WAIT.items()},
+        "models": {model: scheduler.snapshot() for model, scheduler in _schedulers.items()},
+    }
@@ -0,0 +1,259 @@
+"""
+Web search result cache for FounderOS
+
+GrantHunter and MarketSensor ask Tavily nearly the same questions all day.
+Results are cached under a normalized query key in two tiers:
+- In-memory LRU (TTLCache) for the hot set
+- SQLite on disk, shared across workers and restarts
+
+Each search domain has its own TTL: grant notices change daily, market
+news hourly.
+"""
+
+import asyncio
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from typing import Any, Dict, Optional
+
+from cache import TTLCache, make_cache_key
+from singleflight import singleflight
+from trends import record_documents
+
+
+DEFAULT_SEARCH_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "search_cache.sqlite")
+
+SEARCH_CACHE_ENABLED = os.getenv("SEARCH_CACHE_ENABLED", "true").lower() == "true"
+SEARCH_CACHE_PATH = os.getenv("SEARCH_CACHE_PATH", DEFAULT_SEARCH_CACHE_PATH)
+SEARCH_CACHE_MEMORY_SIZE = int(os.getenv("SEARCH_CACHE_MEMORY_SIZE", "1024"))
+# Expired disk rows are deleted on open and every N writes
+SEARCH_CACHE_PURGE_EVERY = max(1, int(os.getenv("SEARCH_CACHE_PURGE_EVERY", "200")))
+
+# Time-to-live per search domain in seconds (SEARCH_CACHE_TTL_<DOMAIN> env var overrides)
+SEARCH_DOMAIN_TTLS: Dict[str, int] = {
+    "grants": 12 * 3600,
+    "market": 3600,
+}
+DEFAULT_SEARCH_TTL = int(os.getenv("SEARCH_CACHE_TTL", "3600"))
+
+_PUNCTUATION_RE = re.compile(r"[^\w\s]+")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_query(query: str) -> str:
+    """
+    Normalize a search query for cache lookups
+
+    NFKC, lowercase, punctuation dropped and whitespace collapsed, so
+    "K-Startup 2025 예비창업패키지?" and "k startup 2025  예비창업패키지"
+    share one entry.
+    """
+    text = unicodedata.normalize("NFKC", query or "").lower()
+    text = _PUNCTUATION_RE.sub(" ", text)
+    return _WHITESPACE_RE.sub(" ", text).strip()
+
+
+def get_search_ttl(domain: str) -> int:
+    """TTL for a search domain"""
+    override = os.getenv(f"SEARCH_CACHE_TTL_{domain.upper()}")
+    if override:
+        return int(override)
+    return SEARCH_DOMAIN_TTLS.get(domain, DEFAULT_SEARCH_TTL)
+
+
+def search_cache_key(domain: str, tool_args: Dict[str, Any]) -> str:
+    """Cache key from the domain, the normalized query and any other tool arguments"""
+    extra = sorted((key, str(value)) for key, value in tool_args.items() if key != "query")
+    return make_cache_key(domain, normalize_query(str(tool_args.get("query", ""))), extra)
+
+
+class SearchCache:
+    """
+    Two-tier (memory + SQLite) cache of search results
+
+    Args:
+        path: SQLite file (None = memory tier only)
+        memory_size: Entries kept in the in-memory LRU
+    """
+
+    def __init__(self, path: Optional[str] = SEARCH_CACHE_PATH, memory_size: int = SEARCH_CACHE_MEMORY_SIZE):
+        self.path = path
+        self.memory = TTLCache(maxsize=memory_size, ttl=DEFAULT_SEARCH_TTL)
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self.disk_hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.purged = 0
+        self.domain_stats: Dict[str, Dict[str, int]] = {}
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS search_cache (
+                    key TEXT PRIMARY KEY,
+                    domain TEXT NOT NULL,
+                    query TEXT NOT NULL,
+                    result TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_search_cache_expires ON search_cache (expires_at)")
+            self._purge(conn)
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def _count(self, domain: str, field: str):
+        counters = self.domain_stats.setdefault(domain, {"hits": 0, "misses": 0})
+        counters[field] += 1
+
+    def get(self, domain: str, tool_args: Dict[str, Any]) -> Optional[Any]:
+        """
+        Look up cached results
+
+        Args:
+            domain: Search domain ("grants", "market", ...)
+            tool_args: Search tool arguments
+
+        Returns:
+            Cached results, or None on a miss
+        """
+        key = search_cache_key(domain, tool_args)
+        result = self.memory.get(key)
+        if result is not None:
+            self._count(domain, "hits")
+            return result
+
+        if self.path:
+            with self._lock:
+                row = self._connect().execute(
+                    "SELECT result, expires_at FROM search_cache WHERE key = ? AND expires_at > ?",
+                    (key, time.time())
+                ).fetchone()
+            if row:
+                result = json.loads(row[0])
+                self.memory.set(key, result, ttl=row[1] - time.time())
+                self.disk_hits += 1
+                self._count(domain, "hits")
+                return result
+
+        self.misses += 1
+        self._count(domain, "misses")
+        return None
+
+    def set(self, domain: str, tool_args: Dict[str, Any], result: Any):
+        """Store results for the domain's TTL"""
+        key = search_cache_key(domain, tool_args)
+        ttl = get_search_ttl(domain)
+        self.memory.set(key, result, ttl=ttl)
+        self.stores += 1
+
+        if self.path:
+            now = time.time()
+            with self._lock:
+                conn = self._connect()
+                conn.execute(
+                    "INSERT OR REPLACE INTO search_cache (key, domain, query, result, created_at, expires_at) VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, domain, normalize_query(str(tool_args.get("query", ""))), json.dumps(result, ensure_ascii=False, default=str), now, now + ttl)
+                )
+                if self.stores % SEARCH_CACHE_PURGE_EVERY == 0:
+                    self._purge(conn)
+                conn.commit()
+
+    def _purge(self, conn: sqlite3.Connection) -> int:
+        deleted = conn.execute("DELETE FROM search_cache WHERE expires_at <= ?", (time.time(),)).rowcount
+        self.purged += deleted
+        return deleted
+
+    def purge_expired(self) -> int:
+        """Delete expired rows from disk"""
+        if not self.path:
+            return 0
+        with self._lock:
+            conn = self._connect()
+            deleted = self._purge(conn)
+            conn.commit()
+            return deleted
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit rates per tier and per domain"""
+        hits = self.memory.hits + self.disk_hits
+        lookups = hits + self.misses
+        return {
+            "enabled": SEARCH_CACHE_ENABLED,
+            "hits": hits,
+            "memory_hits": self.memory.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "stores": self.stores,
+            "purged": self.purged,
+            "memory": self.memory.stats(),
+            "domains": {
+                domain: {
+                    **counters,
+                    "hit_rate": round(counters["hits"] / (counters["hits"] + counters["misses"]), 4)
+                    if counters["hits"] + counters["misses"] else 0.0,
+                }
+                for domain, counters in self.domain_stats.items()
+            },
+        }
+
+
+# Shared cache instance
+search_cache = SearchCache()
+
+
+def _is_cacheable(result: Any) -> bool:
+    # Tavily returns a list of results; error strings and empty answers are not cached
+    return isinstance(result, list) and len(result) > 0
+
+
+async def cached_search(search_tool, tool_args: Dict[str, Any], domain: str) -> Any:
+    """
+    Run a search through the cache
+
+    Args:
+        search_tool: Search tool (from tools.get_search_tool_instance())
+        tool_args: Tool call arguments ({"query": ...})
+        domain: Search domain, selects the TTL
+
+    Returns:
+        Search results (cached or fresh)
+    """
+    if not SEARCH_CACHE_ENABLED:
+        return await search_tool.ainvoke(tool_args)
+
+    cached = await asyncio.to_thread(search_cache.get, domain, tool_args)
+    if cached is not None:
+        return cached
+
+    async def fetch():
+        result = await search_tool.ainvoke(tool_args)
+        if _is_cacheable(result):
+            try:
+                await asyncio.to_thread(search_cache.set, domain, tool_args, result)
+            except Exception as e:
+                print(f"Search cache store failed: {e}")
+            await asyncio.to_thread(record_documents, domain, result)
+        return result
+
+    # Identical searches already in flight share one upstream request
+    return await singleflight.do("search", search_cache_key(domain, tool_args), fetch)
+
+
+def get_search_cache_stats() -> Dict[str, Any]:
+    """Search cache statistics"""
+    return search_cache.stats()
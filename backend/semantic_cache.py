@@ -0,0 +1,346 @@
+"""
+Semantic response cache for FounderOS agents
+
+First-turn questions to the conversational agents are often paraphrases of
+each other ("VC가 물어볼 질문 뭐야?" / "VC들이 주로 묻는 질문은?"). For
+opted-in agents (SEMANTIC_CACHE_AGENTS), a fresh-context question (no
+history, only the system prompt) is embedded with the same hashed character
+n-gram features as the routing model and compared against earlier questions
+with a NumPy cosine index. Close paraphrases are answered from the cache
+without a Gemini call.
+
+- Per-agent similarity thresholds (SEMANTIC_CACHE_THRESHOLD_<AGENT> overrides),
+  calibrated on the labelled pairs in data/semantic_cache_pairs.jsonl:
+
+      python semantic_cache.py calibrate
+
+- A hit also requires the same numbers and negation markers in both
+  questions: character n-grams score "밸류에이션 10억" / "100억" or
+  "받아야" / "받지 말아야" as near-duplicates
+- TTL per entry, LRU eviction when the index is full
+- A sampled fraction of hits is audited: the model is called anyway and the
+  fresh answer is compared with the cached one to estimate the false-hit rate
+
+Hashed n-grams measure shared spelling, not meaning, so real paraphrases
+mostly miss; the cache is off by default (SEMANTIC_CACHE_ENABLED) until a
+real embedding model is plugged in.
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+import unicodedata
+from collections import deque
+from typing import Any, Dict, List, Optional, Tuple
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage
+
+from cache import make_cache_key
+from response_cache import cache_bypass
+from routing_model import extract_features, np
+
+
+DEFAULT_SEMANTIC_PAIRS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "semantic_cache_pairs.jsonl")
+
+SEMANTIC_CACHE_ENABLED = os.getenv("SEMANTIC_CACHE_ENABLED", "false").lower() == "true" and np is not None
+# Agents whose first-turn answers are cached (comma-separated node names)
+SEMANTIC_CACHE_AGENTS = {
+    agent.strip() for agent in os.getenv("SEMANTIC_CACHE_AGENTS", "cofounder,vc_simulator").split(",") if agent.strip()
+}
+SEMANTIC_CACHE_SIZE = int(os.getenv("SEMANTIC_CACHE_SIZE", "1024"))
+SEMANTIC_CACHE_TTL = float(os.getenv("SEMANTIC_CACHE_TTL", str(24 * 3600)))
+SEMANTIC_CACHE_DIM = int(os.getenv("SEMANTIC_CACHE_DIM", str(2 ** 12)))
+# Fraction of hits that are audited against a live answer
+SEMANTIC_CACHE_AUDIT_RATE = float(os.getenv("SEMANTIC_CACHE_AUDIT_RATE", "0.02"))
+# An audited hit whose cached and live answers are less similar than this counts as a false hit
+SEMANTIC_CACHE_AUDIT_AGREEMENT = float(os.getenv("SEMANTIC_CACHE_AUDIT_AGREEMENT", "0.5"))
+
+# Cosine similarity needed for a hit, per agent. `python semantic_cache.py calibrate`
+# puts the lowest false-hit-free threshold on the bundled pairs at 0.81 (recall 0.33);
+# 0.85 leaves margin for non-paraphrases the small set does not cover
+SEMANTIC_CACHE_THRESHOLDS: Dict[str, float] = {
+    "cofounder": 0.85,
+    "vc_simulator": 0.85,
+}
+DEFAULT_SEMANTIC_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.85"))
+
+_NUMBER_RE = re.compile(r"\d+(?:[.,]\d+)*")
+# Korean negation (안 only as a separate word: 안녕/안전 are not negations) and English
+_NEGATION_RE = re.compile(
+    r"않|못|말아|말고|말까|말자|지\s*마|아니|없|(?:^|\s)안\s|"
+    r"\b(?:not|no|never|without|dont|don't|doesn't|isn't|shouldn't|can't|won't)\b"
+)
+
+
+def is_semantic_cache_enabled(agent: Optional[str]) -> bool:
+    """Whether an agent's first-turn answers go through the semantic cache"""
+    return SEMANTIC_CACHE_ENABLED and agent in SEMANTIC_CACHE_AGENTS
+
+
+def get_semantic_threshold(agent: str) -> float:
+    """Similarity threshold for an agent"""
+    override = os.getenv(f"SEMANTIC_CACHE_THRESHOLD_{agent.upper()}")
+    if override:
+        return float(override)
+    return SEMANTIC_CACHE_THRESHOLDS.get(agent, DEFAULT_SEMANTIC_THRESHOLD)
+
+
+def embed(text: str, dim: int = SEMANTIC_CACHE_DIM):
+    """Dense, L2-normalized hashed n-gram embedding"""
+    indices, values = extract_features(text, dim=dim)
+    vector = np.zeros(dim, dtype=np.float32)
+    vector[indices] = values
+    return vector
+
+
+def question_guard(text: str) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+    """
+    Numbers and negation markers of a question
+
+    Two questions may share a cached answer only if their guards are equal.
+    """
+    text = unicodedata.normalize("NFKC", text or "").lower()
+    numbers = sorted({number.replace(",", "") for number in _NUMBER_RE.findall(text)})
+    negations = sorted({marker.strip() for marker in _NEGATION_RE.findall(text)})
+    return tuple(numbers), tuple(negations)
+
+
+def _guard_id(text: str) -> int:
+    return int(make_cache_key(*question_guard(text))[:15], 16)
+
+
+def fresh_context_question(messages: List[BaseMessage]) -> Optional[str]:
+    """The question when the prompt is a system prompt plus one user message, else None"""
+    turns = [msg for msg in messages if not isinstance(msg, SystemMessage)]
+    if len(turns) != 1 or not isinstance(turns[0], HumanMessage) or not isinstance(turns[0].content, str):
+        return None
+    return turns[0].content
+
+
+class SemanticCache:
+    """
+    Fixed-capacity cosine index of (question, answer) pairs
+
+    Entries are partitioned by scope (agent + system prompt), so a changed
+    prompt never serves answers written for the old one.
+
+    Args:
+        capacity: Maximum number of entries
+        ttl: Entry lifetime in seconds
+        dim: Embedding dimension
+    """
+
+    def __init__(self, capacity: int = SEMANTIC_CACHE_SIZE, ttl: float = SEMANTIC_CACHE_TTL, dim: int = SEMANTIC_CACHE_DIM):
+        self.capacity = capacity
+        self.ttl = ttl
+        self.dim = dim
+        self._vectors = np.zeros((capacity, dim), dtype=np.float32) if np is not None else None
+        self._expires_at = np.zeros(capacity, dtype=np.float64) if np is not None else None
+        self._last_used = np.zeros(capacity, dtype=np.float64) if np is not None else None
+        # Scope of each slot as a small integer id (-1 = empty)
+        self._scope_ids = np.full(capacity, -1, dtype=np.int32) if np is not None else None
+        # Hash of each slot's question_guard
+        self._guards = np.zeros(capacity, dtype=np.int64) if np is not None else None
+        self._scope_index: Dict[str, int] = {}
+        self._entries: List[Optional[Dict[str, Any]]] = [None] * capacity
+        self._lock = threading.Lock()
+        self.evictions = 0
+        self.agent_stats: Dict[str, Dict[str, int]] = {}
+        self.samples: deque = deque(maxlen=50)
+
+    def _count(self, agent: str, field: str):
+        counters = self.agent_stats.setdefault(agent, {"hits": 0, "misses": 0, "audits": 0, "false_hits": 0})
+        counters[field] += 1
+
+    def lookup(self, scope: str, vector, threshold: float, guard: int = 0) -> Optional[Dict[str, Any]]:
+        """
+        Best live entry in the scope with the same guard, at or above the threshold
+
+        Returns:
+            Entry dict (question, answer, similarity) or None
+        """
+        now = time.time()
+        with self._lock:
+            scope_id = self._scope_index.get(scope)
+            if scope_id is None:
+                return None
+            live = (self._scope_ids == scope_id) & (self._guards == guard) & (self._expires_at > now)
+            if not live.any():
+                return None
+            # One mat-vec over the whole index is cheaper than gathering the live rows
+            similarities = np.where(live, self._vectors @ vector, -1.0)
+            slot = int(np.argmax(similarities))
+            similarity = float(similarities[slot])
+            if similarity < threshold:
+                return None
+            self._last_used[slot] = now
+            return {**self._entries[slot], "similarity": similarity}
+
+    def store(self, scope: str, vector, question: str, answer: str, guard: int = 0):
+        """Insert an entry, replacing an expired or the least recently used slot when full"""
+        now = time.time()
+        with self._lock:
+            free = np.flatnonzero((self._scope_ids < 0) | (self._expires_at <= now))
+            if free.size:
+                slot = int(free[0])
+            else:
+                slot = int(np.argmin(self._last_used))
+                self.evictions += 1
+            self._vectors[slot] = vector
+            self._expires_at[slot] = now + self.ttl
+            self._last_used[slot] = now
+            self._scope_ids[slot] = self._scope_index.setdefault(scope, len(self._scope_index))
+            self._guards[slot] = guard
+            self._entries[slot] = {"question": question, "answer": answer}
+
+    def record_audit(self, agent: str, question: str, hit: Dict[str, Any], live_answer: str):
+        """Compare a live answer with the cached one for an audited hit"""
+        agreement = float(embed(hit["answer"], self.dim) @ embed(live_answer, self.dim))
+        false_hit = agreement < SEMANTIC_CACHE_AUDIT_AGREEMENT
+        self._count(agent, "audits")
+        if false_hit:
+            self._count(agent, "false_hits")
+        self.samples.append({
+            "agent": agent,
+            "question": question[:200],
+            "matched_question": hit["question"][:200],
+            "similarity": round(hit["similarity"], 4),
+            "answer_agreement": round(agreement, 4),
+            "false_hit": false_hit,
+        })
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit rates, audit results and recent audit samples"""
+        now = time.time()
+        size = int(np.count_nonzero((self._scope_ids >= 0) & (self._expires_at > now))) if np is not None else 0
+        per_agent = {}
+        for agent, counters in self.agent_stats.items():
+            lookups = counters["hits"] + counters["misses"]
+            per_agent[agent] = {
+                **counters,
+                "threshold": get_semantic_threshold(agent),
+                "hit_rate": round(counters["hits"] / lookups, 4) if lookups else 0.0,
+                "false_hit_rate": round(counters["false_hits"] / counters["audits"], 4) if counters["audits"] else None,
+            }
+        return {
+            "enabled": SEMANTIC_CACHE_ENABLED,
+            "agents": sorted(SEMANTIC_CACHE_AGENTS),
+            "size": size,
+            "capacity": self.capacity,
+            "evictions": self.evictions,
+            "per_agent": per_agent,
+            "audit_samples": list(self.samples),
+        }
+
+
+# Shared cache instance
+semantic_cache = SemanticCache()
+
+
+class SemanticCachedLLM:
+    """
+    Runnable wrapper that answers paraphrased first-turn questions from the semantic cache
+
+    Args:
+        runnable: LLM client
+        agent: Agent node name (threshold and metrics)
+        model: Model name (part of the scope)
+        temperature: Temperature (part of the scope)
+    """
+
+    def __init__(self, runnable: Any, agent: str, model: str, temperature: float):
+        self.runnable = runnable
+        self.agent = agent
+        self.model = model
+        self.temperature = temperature
+
+    async def ainvoke(self, messages: List[BaseMessage], *args, **kwargs) -> Any:
+        question = fresh_context_question(messages)
+        if question is None or cache_bypass.get():
+            return await self.runnable.ainvoke(messages, *args, **kwargs)
+
+        system_prompt = "\n".join(msg.content for msg in messages if isinstance(msg, SystemMessage))
+        scope = make_cache_key(self.agent, self.model, self.temperature, system_prompt)
+        vector = embed(question)
+        guard = _guard_id(question)
+        hit = semantic_cache.lookup(scope, vector, get_semantic_threshold(self.agent), guard)
+        audit = hit is not None and random.random() < SEMANTIC_CACHE_AUDIT_RATE
+        if hit is not None and not audit:
+            semantic_cache._count(self.agent, "hits")
+            return AIMessage(content=hit["answer"])
+
+        semantic_cache._count(self.agent, "hits" if hit is not None else "misses")
+        response = await self.runnable.ainvoke(messages, *args, **kwargs)
+        if isinstance(response.content, str) and response.content:
+            if audit:
+                semantic_cache.record_audit(self.agent, question, hit, response.content)
+            else:
+                semantic_cache.store(scope, vector, question, response.content, guard)
+        return response
+
+    def __getattr__(self, name: str) -> Any:
+        # Everything else (invoke, astream, bind, ...) goes to the wrapped runnable uncached
+        return getattr(self.runnable, name)
+
+
+def get_semantic_cache_stats() -> Dict[str, Any]:
+    """Semantic cache statistics"""
+    return semantic_cache.stats()
+
+
+def load_pairs(path: str = DEFAULT_SEMANTIC_PAIRS_PATH) -> List[Dict[str, Any]]:
+    """Labelled question pairs ({"a", "b", "same"} per JSONL line)"""
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def calibrate(pairs: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Lowest threshold at which no labelled non-paraphrase pair would be a hit
+
+    Pairs rejected by question_guard can never hit and are ignored.
+
+    Returns:
+        threshold, recall on paraphrase pairs at that threshold, per-pair scores
+    """
+    scored = []
+    for pair in pairs:
+        guarded = question_guard(pair["a"]) == question_guard(pair["b"])
+        similarity = float(embed(pair["a"]) @ embed(pair["b"])) if guarded else None
+        scored.append({**pair, "similarity": similarity})
+    negatives = [item["similarity"] for item in scored if not item["same"] and item["similarity"] is not None]
+    threshold = round(max(negatives, default=0.0) + 0.01, 2)
+    positives = [item for item in scored if item["same"]]
+    recalled = [item for item in positives if item["similarity"] is not None and item["similarity"] >= threshold]
+    return {
+        "threshold": threshold,
+        "recall": round(len(recalled) / len(positives), 4) if positives else 0.0,
+        "pairs": scored,
+    }
+
+
+def main(argv: List[str] = None):
+    """CLI entry point"""
+    parser = argparse.ArgumentParser(description="Calibrate FounderOS semantic cache thresholds")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    calibrate_parser = subparsers.add_parser("calibrate", help="Score labelled question pairs")
+    calibrate_parser.add_argument("--pairs", default=DEFAULT_SEMANTIC_PAIRS_PATH, help="Labelled pairs (JSONL)")
+    args = parser.parse_args(argv)
+
+    if np is None:
+        print("numpy is required", file=sys.stderr)
+        sys.exit(1)
+    result = calibrate(load_pairs(args.pairs))
+    for item in result["pairs"]:
+        similarity = "guard" if item["similarity"] is None else f"{item['similarity']:.3f}"
+        print(f"{'same' if item['same'] else 'diff'}  {similarity:>6}  {item['a']} / {item['b']}")
+    print(f"threshold={result['threshold']} recall={result['recall']}")
+
+
+if __name__ == "__main__":
+    main()
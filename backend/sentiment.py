@@ -0,0 +1,268 @@
+"""
+Local sentiment scoring for review text
+
+Korean/English lexicon plus bigram features, scored in batches with NumPy
+so hundreds of reviews cost milliseconds instead of an LLM call:
+- Korean stems match by prefix ("좋" covers 좋아요/좋은/좋네요)
+- Negators ("안", "못", "not") and trailing negation ("좋지 않아요", "문제 없어요")
+  flip polarity; "없" only negates as a separate predicate, and compounds
+  such as "문제없이" are positive lexicon entries
+- Intensifiers ("너무", "정말", "very") scale the next sentiment word
+
+MarketSensor puts only the per-competitor aggregates and the most polar
+excerpts into the prompt.
+"""
+
+import re
+import unicodedata
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+
+# Polarity weights; Korean entries are stems matched as token prefixes
+KO_LEXICON: Dict[str, float] = {
+    "좋": 1.0, "최고": 1.5, "만족": 1.2, "추천": 1.0, "강추": 1.5, "편리": 1.0, "편하": 1.0, "빠르": 0.8, "빨라": 0.8,
+    "친절": 1.0, "깔끔": 0.8, "훌륭": 1.3, "유용": 1.0, "감동": 1.2, "저렴": 0.7, "합리": 0.7, "안정": 0.7,
+    "직관": 0.8, "쉽": 0.7, "쉬워": 0.7, "재밌": 1.0, "재미있": 1.0, "예쁘": 0.8, "완벽": 1.3, "혁신": 0.8, "사랑": 1.2,
+    "나쁘": -1.0, "나빠": -1.0, "별로": -1.0, "최악": -1.6, "불편": -1.1, "불만": -1.2, "느리": -0.9, "느려": -0.9,
+    "비싸": -0.8, "비쌈": -0.8, "오류": -1.0, "버그": -1.0, "에러": -1.0, "실망": -1.3, "짜증": -1.3, "비추": -1.4,
+    "환불": -0.9, "해지": -0.6, "불친절": -1.3, "복잡": -0.7, "어렵": -0.7, "어려": -0.7, "튕": -1.0, "먹통": -1.3,
+    "끊기": -0.9, "끊겨": -0.9, "아쉽": -0.6, "아쉬": -0.6, "문제": -0.6, "사기": -1.6, "후회": -1.2, "쓰레기": -1.8,
+    # "없" compounds written as one word ("문제없이 잘 써요")
+    "문제없": 1.0, "걱정없": 0.8, "부족함없": 1.0, "불만없": 0.8,
+}
+EN_LEXICON: Dict[str, float] = {
+    "good": 1.0, "great": 1.3, "excellent": 1.5, "love": 1.3, "loved": 1.3, "awesome": 1.4, "amazing": 1.4,
+    "easy": 0.8, "fast": 0.8, "intuitive": 0.9, "helpful": 1.0, "recommend": 1.0, "reliable": 0.9, "best": 1.3,
+    "nice": 0.8, "useful": 0.9, "perfect": 1.4, "cheap": 0.5, "affordable": 0.8, "smooth": 0.8,
+    "bad": -1.0, "terrible": -1.5, "awful": -1.5, "hate": -1.4, "worst": -1.6, "slow": -0.9, "buggy": -1.1,
+    "bug": -0.9, "bugs": -0.9, "crash": -1.1, "crashes": -1.1, "expensive": -0.8, "overpriced": -1.1,
+    "confusing": -0.9, "useless": -1.3, "broken": -1.2, "disappointed": -1.3, "disappointing": -1.3,
+    "refund": -0.8, "poor": -1.0, "annoying": -1.1, "scam": -1.7, "laggy": -1.0, "clunky": -0.8,
+}
+# Two-token phrases; the second entry is matched as a prefix
+BIGRAM_LEXICON: Dict[Tuple[str, str], float] = {
+    ("돈", "아까"): -1.5, ("돈", "아깝"): -1.5, ("가성비", "좋"): 1.5, ("가성비", "최고"): 1.8,
+    ("가성비", "별로"): -1.3, ("고객", "센터"): 0.0, ("다시", "안"): -1.0, ("재구매", "의사"): 1.2,
+    ("not", "worth"): -1.3, ("waste", "of"): -1.4, ("well", "worth"): 1.3, ("highly", "recommend"): 1.6,
+    ("customer", "service"): 0.0, ("no", "issues"): 1.0, ("no", "problems"): 1.0,
+}
+NEGATORS = {"안", "못", "not", "no", "never", "don't", "doesn't", "didn't", "isn't", "wasn't", "can't", "cannot", "won't"}
+# Trailing negation: the token after a sentiment word ("좋지 않아요", "편하지 못해요")
+NEGATION_PREFIXES = ("않", "못")
+# Separate "없" predicate after a sentiment word ("문제 없어요", "불만 없음"; not "없애")
+_ABSENCE_RE = re.compile(r"없(?!애)")
+INTENSIFIERS = {"너무": 1.5, "정말": 1.5, "진짜": 1.5, "완전": 1.5, "매우": 1.5, "아주": 1.4, "very": 1.5, "really": 1.5, "so": 1.3, "extremely": 1.8}
+
+# Score above/below which a review counts as positive/negative
+POLARITY_THRESHOLD = 0.15
+
+_TOKEN_RE = re.compile(r"[a-z']+|[가-힣]+|\d+")
+_SENTENCE_RE = re.compile(r"(?<=[.!?。])\s+|\n+|(?<=[요다죠음임])\s+(?=[가-힣A-Za-z])")
+
+# Feature table: index 0 is unused, weights aligned with indices
+_FEATURES: List[Any] = [None]
+_FEATURE_INDEX: Dict[Any, int] = {}
+for _key in list(KO_LEXICON) + list(EN_LEXICON) + list(BIGRAM_LEXICON):
+    _FEATURE_INDEX[_key] = len(_FEATURES)
+    _FEATURES.append(_key)
+FEATURE_WEIGHTS = np.array(
+    [0.0] + [KO_LEXICON.get(key, EN_LEXICON.get(key, 0.0)) if isinstance(key, str) else BIGRAM_LEXICON[key] for key in _FEATURES[1:]]
+)
+_KO_MAX_STEM = max(len(stem) for stem in KO_LEXICON)
+_BIGRAM_FIRST = {first for first, _ in BIGRAM_LEXICON}
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased word tokens (Hangul runs, Latin words, numbers)"""
+    return _TOKEN_RE.findall(unicodedata.normalize("NFKC", text or "").lower())
+
+
+def split_sentences(text: str) -> List[str]:
+    """Split review text into sentences"""
+    return [part.strip() for part in _SENTENCE_RE.split(text or "") if part and part.strip()]
+
+
+def _unigram_feature(token: str) -> int:
+    index = _FEATURE_INDEX.get(token)
+    if index is not None:
+        return index
+    # Korean stems: longest lexicon prefix of the token ("불친절해요" -> "불친절", not "불")
+    for length in range(min(len(token), _KO_MAX_STEM), 0, -1):
+        index = _FEATURE_INDEX.get(token[:length])
+        if index is not None and token[:length] in KO_LEXICON:
+            return index
+    return 0
+
+
+def _bigram_feature(first: str, second: str) -> int:
+    if first not in _BIGRAM_FIRST:
+        return 0
+    for length in range(len(second), 0, -1):
+        index = _FEATURE_INDEX.get((first, second[:length]))
+        if index is not None:
+            return index
+    return 0
+
+
+def _extract(tokens: List[str]) -> Tuple[List[int], List[float]]:
+    """Feature indices and multipliers (negation/intensity) for one text"""
+    indices, multipliers = [], []
+    skip_next = False
+    for position, token in enumerate(tokens):
+        if skip_next:
+            skip_next = False
+            continue
+        feature = 0
+        if position + 1 < len(tokens):
+            feature = _bigram_feature(token, tokens[position + 1])
+            if feature:
+                skip_next = True
+        multiplier = 1.0
+        if not feature:
+            feature = _unigram_feature(token)
+        if not feature and len(token) > 2 and token[0] in ("안", "못"):
+            # Attached negation ("안좋아요", "못써요")
+            feature = _unigram_feature(token[1:])
+            multiplier = -1.0
+        if not feature:
+            continue
+
+        previous = tokens[position - 1] if position > 0 else ""
+        if previous in INTENSIFIERS:
+            multiplier *= INTENSIFIERS[previous]
+            previous = tokens[position - 2] if position > 1 else ""
+        if previous in NEGATORS:
+            multiplier = -multiplier
+        following = tokens[position + (2 if skip_next else 1)] if position + (2 if skip_next else 1) < len(tokens) else ""
+        if following.startswith(NEGATION_PREFIXES) or _ABSENCE_RE.match(following) or "지않" in token or "지못" in token:
+            multiplier = -multiplier
+        indices.append(feature)
+        multipliers.append(multiplier)
+    return indices, multipliers
+
+
+def score_texts(texts: List[str]) -> np.ndarray:
+    """
+    Sentiment score per text in [-1, 1]
+
+    Features of the whole batch are gathered into flat arrays and summed per
+    text with one np.bincount.
+
+    Args:
+        texts: Review texts or sentences
+
+    Returns:
+        Array of scores (0 = neutral / no sentiment words)
+    """
+    n = len(texts)
+    if n == 0:
+        return np.zeros(0)
+    doc_ids: List[int] = []
+    feature_ids: List[int] = []
+    multipliers: List[float] = []
+    lengths = np.ones(n)
+    for doc_id, text in enumerate(texts):
+        tokens = tokenize(text)
+        lengths[doc_id] = max(len(tokens), 1)
+        indices, mults = _extract(tokens)
+        doc_ids.extend([doc_id] * len(indices))
+        feature_ids.extend(indices)
+        multipliers.extend(mults)
+
+    weights = FEATURE_WEIGHTS[np.asarray(feature_ids, dtype=np.int64)] * np.asarray(multipliers)
+    raw = np.bincount(np.asarray(doc_ids, dtype=np.int64), weights=weights, minlength=n)
+    # Damp long texts so one long review doesn't dominate
+    return np.tanh(raw / np.sqrt(lengths))
+
+
+def _excerpts(sentences: List[str], scores: np.ndarray, order: np.ndarray, limit: int, sign: int) -> List[str]:
+    """Distinct sentences from `order` that are polar in the given direction"""
+    picked: List[str] = []
+    for i in order:
+        if sign * scores[i] <= POLARITY_THRESHOLD or len(picked) >= limit:
+            break
+        excerpt = sentences[i][:160]
+        if excerpt not in picked:
+            picked.append(excerpt)
+    return picked
+
+
+def analyze_reviews(reviews_by_competitor: Dict[str, Iterable[str]], excerpts: int = 2) -> Dict[str, Dict[str, Any]]:
+    """
+    Per-competitor sentiment aggregates
+
+    Args:
+        reviews_by_competitor: {competitor: [review text, ...]}
+        excerpts: Most positive/negative sentences kept per competitor
+
+    Returns:
+        {competitor: {"reviews", "mean", "positive", "negative", "neutral",
+                      "top_positive", "top_negative"}}
+    """
+    competitors = list(reviews_by_competitor)
+    review_owner: List[int] = []
+    sentences: List[str] = []
+    sentence_review: List[int] = []
+    review_count = 0
+    for owner, competitor in enumerate(competitors):
+        for review in reviews_by_competitor[competitor]:
+            for sentence in split_sentences(review):
+                sentences.append(sentence)
+                sentence_review.append(review_count)
+            review_owner.append(owner)
+            review_count += 1
+
+    if review_count == 0:
+        return {}
+
+    sentence_scores = score_texts(sentences)
+    sentence_review_arr = np.asarray(sentence_review, dtype=np.int64)
+    owners = np.asarray(review_owner, dtype=np.int64)
+
+    # Review score = mean of its sentences; competitor aggregates over reviews
+    sentence_counts = np.bincount(sentence_review_arr, minlength=review_count)
+    review_scores = np.bincount(sentence_review_arr, weights=sentence_scores, minlength=review_count) / np.maximum(sentence_counts, 1)
+    sentence_owner = owners[sentence_review_arr] if len(sentences) else np.zeros(0, dtype=np.int64)
+
+    results: Dict[str, Dict[str, Any]] = {}
+    for owner, competitor in enumerate(competitors):
+        mask = owners == owner
+        count = int(mask.sum())
+        if count == 0:
+            continue
+        scores = review_scores[mask]
+        owned = np.flatnonzero(sentence_owner == owner)
+        order = owned[np.argsort(sentence_scores[owned])]
+        results[competitor] = {
+            "reviews": count,
+            "mean": round(float(scores.mean()), 3),
+            "positive": round(float((scores > POLARITY_THRESHOLD).mean()), 3),
+            "negative": round(float((scores < -POLARITY_THRESHOLD).mean()), 3),
+            "neutral": round(float((np.abs(scores) <= POLARITY_THRESHOLD).mean()), 3),
+            "top_positive": _excerpts(sentences, sentence_scores, order[::-1], excerpts, 1),
+            "top_negative": _excerpts(sentences, sentence_scores, order, excerpts, -1),
+        }
+    return results
+
+
+def format_sentiment(summary: Dict[str, Dict[str, Any]]) -> str:
+    """Compact sentiment table for the agent prompt"""
+    lines = []
+    for competitor, stats in summary.items():
+        lines.append(
+            f"- {competitor}: 리뷰 {stats['reviews']}건, 평균 {stats['mean']:+.2f} "
+            f"(긍정 {stats['positive']:.0%} / 중립 {stats['neutral']:.0%} / 부정 {stats['negative']:.0%})"
+        )
+        for excerpt in stats["top_positive"]:
+            lines.append(f"  + \"{excerpt}\"")
+        for excerpt in stats["top_negative"]:
+            lines.append(f"  - \"{excerpt}\"")
+    return "\n".join(lines)
+
+
+def is_sentiment_question(message: Optional[str]) -> bool:
+    """Whether the user asks about reviews/sentiment"""
+    text = (message or "").lower()
+    return any(word in text for word in ("감정", "감성", "리뷰", "후기", "평판", "평가", "반응", "sentiment", "review"))
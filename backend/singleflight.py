@@ -0,0 +1,97 @@
+"""
+Request coalescing (singleflight) for FounderOS
+
+When a cohort workshop starts, dozens of founders send "정부 지원사업 알려줘"
+within seconds and each turn triggers the same supervisor, search and agent
+calls. Concurrent calls that share a key now share one upstream request:
+the first caller starts it, later callers with the same key await the same
+result (or error). Keys are the layers' own cache keys:
+- "routing": the full supervisor routing prompt
+- "search": the search cache key (domain + normalized query)
+- "agent": the response cache key of deterministic agent prompts
+"""
+
+import asyncio
+import os
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+
+SINGLEFLIGHT_ENABLED = os.getenv("SINGLEFLIGHT_ENABLED", "true").lower() == "true"
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent async calls by (group, key)
+
+    The shared call runs in its own task and callers await it shielded, so a
+    caller that disconnects does not cancel the request for the others.
+    """
+
+    def __init__(self):
+        self._in_flight: Dict[Tuple[str, str], asyncio.Task] = {}
+        self.stats: Dict[str, Dict[str, int]] = {}
+
+    def _count(self, group: str, field: str):
+        counters = self.stats.setdefault(group, {"calls": 0, "executed": 0, "collapsed": 0, "shared_errors": 0})
+        counters[field] += 1
+
+    def _finish(self, flight_key: Tuple[str, str], task: asyncio.Task):
+        self._in_flight.pop(flight_key, None)
+        # Mark the error as retrieved even if every caller went away
+        if not task.cancelled():
+            task.exception()
+
+    async def do(self, group: str, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run fn once for all concurrent callers with the same key
+
+        Args:
+            group: Call category ("routing", "search", "agent")
+            key: Cache key identifying identical calls
+            fn: Coroutine factory performing the upstream call
+
+        Returns:
+            The shared result (errors are raised to every caller)
+        """
+        if not SINGLEFLIGHT_ENABLED:
+            return await fn()
+
+        self._count(group, "calls")
+        flight_key = (group, key)
+        task = self._in_flight.get(flight_key)
+        if task is None:
+            self._count(group, "executed")
+            task = asyncio.ensure_future(fn())
+            self._in_flight[flight_key] = task
+            task.add_done_callback(lambda done: self._finish(flight_key, done))
+            leader = True
+        else:
+            self._count(group, "collapsed")
+            leader = False
+
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            if not leader:
+                self._count(group, "shared_errors")
+            raise
+
+    def snapshot(self) -> Dict[str, Any]:
+        groups = {}
+        for group, counters in self.stats.items():
+            groups[group] = {
+                **counters,
+                "collapse_rate": round(counters["collapsed"] / counters["calls"], 4) if counters["calls"] else 0.0,
+            }
+        return {"enabled": SINGLEFLIGHT_ENABLED, "in_flight": len(self._in_flight), "groups": groups}
+
+
+# Shared instance
+singleflight = SingleFlight()
+
+
+def get_singleflight_stats() -> Dict[str, Any]:
+    """Coalescing counters per call group"""
+    return singleflight.snapshot()
@@ -16,8 +16,14 @@ class AgentState(TypedDict):
         messages: List of messages in the conversation
         next: Name of the next agent to execute (or "FINISH")
         last_agent: Name of the last agent that responded (for tracking)
+        summary: Rolling summary of turns that fell out of the agents' context window
+        summary_upto: Number of leading messages covered by the summary
+        founder_id: Founder the thread belongs to (selects the competitor watchlist)
     """
     messages: Annotated[List[BaseMessage], add_messages]
     next: str
     last_agent: str  # Track which agent responded
+    summary: str
+    summary_upto: int
+    founder_id: str
 
@@ -0,0 +1,194 @@
+"""
+Streaming helpers for FounderOS
+
+Translates LangGraph / LangChain `astream_events` output into small JSON frames
+that the /ws and /chat/stream (SSE) endpoints send as they arrive:
+
+    {"type": "routing",   "agent": ..., "thread_id": ..., "next": ..., "mode": "supervisor" | "direct"}
+    {"type": "start",     "agent": ..., "thread_id": ...}
+    {"type": "token",     "agent": ..., "thread_id": ..., "delta": "..."}
+    {"type": "tool_call", "agent": ..., "thread_id": ..., "name": ..., "args": {...}}
+    {"type": "end",       "agent": ..., "thread_id": ..., "response": "..."}
+"""
+
+import asyncio
+import json
+import os
+from typing import Any, AsyncIterator, Dict, Optional
+from langchain_core.messages import HumanMessage
+
+
+# Seconds of silence before an SSE keep-alive comment is sent
+SSE_KEEPALIVE_INTERVAL = float(os.getenv("SSE_KEEPALIVE_INTERVAL", "15"))
+
+
+# Graph node names that produce user-facing output
+AGENT_NODE_NAMES = {
+    "cofounder",
+    "vc_simulator",
+    "grant_hunter",
+    "market_sensor",
+    "mvp_builder",
+    "framework_designer",
+    "growth_hacker",
+    "legal_advisor",
+}
+
+
+def make_frame(frame_type: str, thread_id: str, agent: str, **payload) -> Dict[str, Any]:
+    """Build a stream frame tagged with the responding agent and thread_id"""
+    return {
+        "type": frame_type,
+        "agent": agent,
+        "thread_id": thread_id,
+        **payload
+    }
+
+
+def _chunk_text(chunk: Any) -> str:
+    """Extract the text delta from an AIMessageChunk"""
+    content = getattr(chunk, "content", "")
+    if isinstance(content, str):
+        return content
+    # Gemini may return a list of content parts
+    parts = []
+    for part in content or []:
+        if isinstance(part, str):
+            parts.append(part)
+        elif isinstance(part, dict) and part.get("type") == "text":
+            parts.append(part.get("text", ""))
+    return "".join(parts)
+
+
+def translate_event(event: Dict[str, Any], thread_id: str, agent: str) -> Optional[Dict[str, Any]]:
+    """
+    Convert one astream_events (v2) event into a frame
+
+    Args:
+        event: Event emitted by astream_events
+        thread_id: Conversation thread ID
+        agent: Agent currently responding
+
+    Returns:
+        Frame dict, or None if the event is not forwarded
+    """
+    kind = event["event"]
+
+    if kind == "on_chat_model_stream":
+        delta = _chunk_text(event["data"].get("chunk"))
+        if delta:
+            return make_frame("token", thread_id, agent, delta=delta)
+
+    elif kind == "on_custom_event" and event.get("name") == "tool_call":
+        # Dispatched by AgentExecutor for every tool call it runs
+        data = event.get("data") or {}
+        tool_args = data.get("args", {})
+        if not isinstance(tool_args, dict):
+            tool_args = {"query": str(tool_args)}
+        return make_frame("tool_call", thread_id, agent, name=data.get("name"), args=tool_args)
+
+    return None
+
+
+def make_graph_input(message: str, founder_id: Optional[str] = None) -> Dict[str, Any]:
+    """Graph input for one user turn"""
+    graph_input: Dict[str, Any] = {"messages": [HumanMessage(content=message)]}
+    if founder_id:
+        graph_input["founder_id"] = founder_id
+    return graph_input
+
+
+async def stream_graph(graph_with_memory, message: str, thread_id: str, founder_id: Optional[str] = None) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Run the supervisor graph for one user turn and stream frames
+
+    Args:
+        graph_with_memory: Compiled graph with checkpointer
+        message: User message
+        thread_id: Conversation thread ID
+        founder_id: Founder the thread belongs to (optional)
+
+    Yields:
+        routing / start / token / tool_call / end frames
+    """
+    config = {
+        "configurable": {"thread_id": thread_id},
+        "recursion_limit": 50
+    }
+
+    current_agent = None
+    async for event in graph_with_memory.astream_events(
+        make_graph_input(message, founder_id),
+        config=config,
+        version="v2"
+    ):
+        node = event.get("metadata", {}).get("langgraph_node")
+        if node == "supervisor" and event["event"] == "on_chain_end" and event.get("name") == "supervisor":
+            output = event["data"].get("output") or {}
+            next_node = output.get("next") if isinstance(output, dict) else None
+            if next_node in AGENT_NODE_NAMES:
+                yield make_frame("routing", thread_id, "supervisor", next=next_node, mode="supervisor")
+            continue
+        if node not in AGENT_NODE_NAMES:
+            # Skip supervisor routing output and graph bookkeeping
+            continue
+
+        if event["event"] == "on_chain_start" and event.get("name") == node and current_agent != node:
+            current_agent = node
+            yield make_frame("start", thread_id, current_agent)
+            continue
+
+        frame = translate_event(event, thread_id, node)
+        if frame:
+            yield frame
+
+    # Read the final turn result from memory
+    state = await graph_with_memory.aget_state(config)
+    values = state.values if state else {}
+    messages = values.get("messages", [])
+    last_message = messages[-1] if messages else None
+    response_text = last_message.content if last_message else "No response generated"
+    agent = current_agent or values.get("last_agent") or "supervisor"
+
+    if current_agent is None:
+        yield make_frame("start", thread_id, agent)
+    yield make_frame("end", thread_id, agent, response=response_text)
+
+
+def format_sse(frame: Dict[str, Any]) -> str:
+    """Encode a frame as a Server-Sent Event"""
+    data = json.dumps(frame, ensure_ascii=False)
+    return f"event: {frame['type']}\ndata: {data}\n\n"
+
+
+async def with_keepalive(frames: AsyncIterator[Dict[str, Any]], interval: float = SSE_KEEPALIVE_INTERVAL) -> AsyncIterator[str]:
+    """
+    Encode frames as SSE and emit keep-alive comments while the stream is idle
+
+    Proxies (Vercel/Railway) close idle connections, so a comment line is sent
+    whenever no frame has been produced for `interval` seconds.
+
+    Args:
+        frames: Frame iterator (stream_graph / stream_to_agent)
+        interval: Idle seconds before a keep-alive comment
+
+    Yields:
+        SSE-encoded strings
+    """
+    iterator = frames.__aiter__()
+    pending = asyncio.ensure_future(iterator.__anext__())
+    try:
+        while True:
+            done, _ = await asyncio.wait({pending}, timeout=interval)
+            if not done:
+                yield ": keep-alive\n\n"
+                continue
+            try:
+                frame = pending.result()
+            except StopAsyncIteration:
+                break
+            yield format_sse(frame)
+            pending = asyncio.ensure_future(iterator.__anext__())
+    finally:
+        if not pending.done():
+            pending.cancel()
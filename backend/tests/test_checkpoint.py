@@ -0,0 +1,131 @@
+"""
+Tests for the checkpointers (SQLite persistence and pruning, bounded memory, spill/restore)
+"""
+
+import asyncio
+import operator
+import os
+import sys
+import time
+from typing import Annotated, List, TypedDict
+
+import pytest
+from langgraph.checkpoint.base import empty_checkpoint
+from langgraph.graph import END, StateGraph
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from checkpoint import BoundedMemorySaver, SQLiteCheckpointSaver
+
+
+def make_checkpoint(step: int, note: str = ""):
+    """Checkpoint with an id that sorts by step, like LangGraph's uuid6 ids"""
+    checkpoint = empty_checkpoint()
+    checkpoint["id"] = f"1ef-{step:04d}"
+    checkpoint["channel_values"] = {"note": note or f"step {step}"}
+    return checkpoint
+
+
+def put_steps(saver, thread_id: str, steps: int):
+    config = {"configurable": {"thread_id": thread_id, "checkpoint_ns": ""}}
+    for step in range(1, steps + 1):
+        config = saver.put(config, make_checkpoint(step), {"step": step}, {})
+    return config
+
+
+@pytest.fixture
+def sqlite_saver(tmp_path):
+    saver = SQLiteCheckpointSaver(path=str(tmp_path / "checkpoints.sqlite"), retention_days=0)
+    yield saver
+    saver.close()
+
+
+def test_sqlite_saver_persists_across_restarts(tmp_path):
+    path = str(tmp_path / "checkpoints.sqlite")
+    saver = SQLiteCheckpointSaver(path=path, retention_days=0)
+    config = put_steps(saver, "thread-1", 2)
+    saver.put_writes(config, [("messages", "pending")], task_id="task-1")
+    saver.close()
+
+    reopened = SQLiteCheckpointSaver(path=path, retention_days=0)
+    try:
+        result = reopened.get_tuple({"configurable": {"thread_id": "thread-1"}})
+        assert result.checkpoint["id"] == "1ef-0002"
+        assert result.checkpoint["channel_values"] == {"note": "step 2"}
+        assert result.parent_config["configurable"]["checkpoint_id"] == "1ef-0001"
+        assert result.pending_writes == [("task-1", "messages", "pending")]
+        assert reopened.thread_ids() == ["thread-1"]
+    finally:
+        reopened.close()
+
+
+def test_sqlite_saver_keeps_newest_checkpoints(tmp_path):
+    saver = SQLiteCheckpointSaver(path=str(tmp_path / "checkpoints.sqlite"), retention_days=0, max_checkpoints_per_thread=2)
+    try:
+        put_steps(saver, "thread-1", 4)
+        saver.flush()
+        ids = [result.checkpoint["id"] for result in saver.list({"configurable": {"thread_id": "thread-1"}})]
+        assert ids == ["1ef-0004", "1ef-0003"]
+    finally:
+        saver.close()
+
+
+def test_sqlite_saver_prunes_idle_threads(sqlite_saver):
+    put_steps(sqlite_saver, "old", 1)
+    sqlite_saver.flush()
+    cutoff = time.time() + 1
+    assert sqlite_saver.prune_idle_threads(cutoff) == 1
+    assert sqlite_saver.get_tuple({"configurable": {"thread_id": "old"}}) is None
+
+
+def test_bounded_saver_keeps_newest_checkpoints():
+    saver = BoundedMemorySaver(max_checkpoints_per_thread=3, idle_ttl=0)
+    put_steps(saver, "thread-1", 5)
+
+    ids = [result.checkpoint["id"] for result in saver.list({"configurable": {"thread_id": "thread-1"}})]
+    assert ids == ["1ef-0005", "1ef-0004", "1ef-0003"]
+    assert saver.stats()["checkpoints_pruned"] == 2
+
+
+def test_bounded_saver_spills_idle_threads_and_restores_them(sqlite_saver):
+    saver = BoundedMemorySaver(max_checkpoints_per_thread=3, idle_ttl=60, spill_saver=sqlite_saver)
+    config = put_steps(saver, "thread-1", 2)
+    saver.put_writes(config, [("messages", "pending")], task_id="task-1")
+
+    assert saver.evict_idle_threads(time.monotonic() + 1) == 1
+    assert saver.stats()["threads"] == 0
+    assert sqlite_saver.thread_ids() == ["thread-1"]
+
+    result = asyncio.run(saver.aget_tuple({"configurable": {"thread_id": "thread-1"}}))
+    assert result.checkpoint["id"] == "1ef-0002"
+    assert result.parent_config["configurable"]["checkpoint_id"] == "1ef-0001"
+    assert result.pending_writes == [("task-1", "messages", "pending")]
+    assert saver.stats()["threads_restored"] == 1
+    # The restored thread lives in memory again and is removed from the spill store
+    assert sqlite_saver.thread_ids() == []
+
+
+def test_bounded_saver_new_thread_misses_without_spill_lookup(sqlite_saver, monkeypatch):
+    saver = BoundedMemorySaver(spill_saver=sqlite_saver)
+    monkeypatch.setattr(sqlite_saver, "list", lambda *args, **kwargs: pytest.fail("spill store queried"))
+    assert saver.get_tuple({"configurable": {"thread_id": "new-thread"}}) is None
+
+
+class CounterState(TypedDict):
+    turns: Annotated[List[str], operator.add]
+
+
+def test_graph_state_survives_across_turns():
+    builder = StateGraph(CounterState)
+    builder.add_node("reply", lambda state: {"turns": [f"reply {len(state['turns'])}"]})
+    builder.set_entry_point("reply")
+    builder.add_edge("reply", END)
+    graph = builder.compile(checkpointer=BoundedMemorySaver(max_checkpoints_per_thread=2))
+    config = {"configurable": {"thread_id": "founder-1"}}
+
+    async def run():
+        await graph.ainvoke({"turns": ["hi"]}, config)
+        return await graph.ainvoke({"turns": ["again"]}, config)
+
+    state = asyncio.run(run())
+    assert state["turns"] == ["hi", "reply 1", "again", "reply 3"]
@@ -0,0 +1,130 @@
+"""
+Tests for the agent tool loop (concurrent calls, ordering, timeouts, budgets)
+"""
+
+import asyncio
+import os
+import sys
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# executor pulls in the Gemini and Tavily clients (llm.py, tools.py)
+executor = pytest.importorskip("executor", reason="LLM/search client packages not installed")
+from tools import gather_tool_calls
+
+
+class ScriptedModel:
+    """Model stand-in that returns scripted responses and records the prompts it saw"""
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.prompts = []
+
+    async def ainvoke(self, messages, *args, **kwargs):
+        self.prompts.append(list(messages))
+        return self.responses.pop(0)
+
+
+def tool_round(*queries):
+    return AIMessage(content="", tool_calls=[
+        {"name": "search", "args": {"query": query}, "id": f"call-{i}"} for i, query in enumerate(queries)
+    ])
+
+
+@pytest.fixture
+def use_model(monkeypatch):
+    def install(model):
+        monkeypatch.setattr(executor, "get_agent_llm", lambda **kwargs: model)
+        monkeypatch.setattr(executor, "get_agent_llm_with_tools", lambda tools, **kwargs: model)
+        return model
+    return install
+
+
+def test_gather_keeps_call_order_and_isolates_timeouts():
+    async def answer(value, delay):
+        await asyncio.sleep(delay)
+        return value
+
+    async def broken():
+        raise ValueError("boom")
+
+    results = asyncio.run(gather_tool_calls(
+        [lambda: answer("slow", 0.05), lambda: answer("fast", 0.0), lambda: answer("late", 1.0), broken],
+        timeout=0.2
+    ))
+    assert results[:2] == ["slow", "fast"]
+    assert results[2].startswith("Error: tool call timed out")
+    assert results[3] == "Error: boom"
+
+
+def test_tool_results_follow_call_order(use_model):
+    model = use_model(ScriptedModel([tool_round("느린 검색", "빠른 검색"), AIMessage(content="정리했습니다")]))
+
+    async def search(tool_args):
+        await asyncio.sleep(0.05 if tool_args["query"] == "느린 검색" else 0.0)
+        return f"result for {tool_args['query']}"
+
+    agent_executor = executor.AgentExecutor("market_sensor", tools=[], handlers={"search": search})
+    content, rounds = asyncio.run(agent_executor.run([HumanMessage(content="시장 조사")]))
+
+    assert content == "정리했습니다"
+    tool_messages = [msg for msg in model.prompts[1] if isinstance(msg, ToolMessage)]
+    assert [msg.tool_call_id for msg in tool_messages] == ["call-0", "call-1"]
+    assert "느린 검색" in tool_messages[0].content
+    assert rounds[0]["tool_calls"] == 2
+
+
+def test_unknown_tool_and_timeout_become_tool_messages(use_model):
+    model = use_model(ScriptedModel([
+        AIMessage(content="", tool_calls=[
+            {"name": "search", "args": {"query": "q"}, "id": "call-0"},
+            {"name": "missing", "args": {}, "id": "call-1"},
+        ]),
+        AIMessage(content="done"),
+    ]))
+
+    async def hanging(tool_args):
+        await asyncio.sleep(5)
+
+    agent_executor = executor.AgentExecutor("market_sensor", tools=[], handlers={"search": hanging}, tool_timeout=0.05)
+    content, _ = asyncio.run(agent_executor.run([HumanMessage(content="q")]))
+
+    assert content == "done"
+    tool_messages = [msg.content for msg in model.prompts[1] if isinstance(msg, ToolMessage)]
+    assert "timed out" in tool_messages[0]
+    assert "unknown tool 'missing'" in tool_messages[1]
+
+
+def test_max_iterations_forces_a_final_answer(use_model):
+    model = use_model(ScriptedModel([tool_round("a"), tool_round("b"), AIMessage(content="final")]))
+
+    async def search(tool_args):
+        return "result"
+
+    agent_executor = executor.AgentExecutor("grant_hunter", tools=[], handlers={"search": search}, max_iterations=2)
+    content, rounds = asyncio.run(agent_executor.run([HumanMessage(content="q")]))
+
+    assert content == "final"
+    assert len(model.prompts) == 3
+    assert [round_["tool_calls"] for round_ in rounds] == [1, 1, 0]
+
+
+def test_time_budget_stops_the_loop(use_model):
+    model = use_model(ScriptedModel([tool_round("a"), AIMessage(content="final")]))
+
+    async def slow_search(tool_args):
+        await asyncio.sleep(0.1)
+        return "result"
+
+    agent_executor = executor.AgentExecutor(
+        "grant_hunter", tools=[], handlers={"search": slow_search}, max_iterations=5, time_budget=0.05
+    )
+    content, rounds = asyncio.run(agent_executor.run([HumanMessage(content="q")]))
+
+    # The call is cut off at the remaining budget and the model answers without another tool round
+    assert content == "final"
+    assert len(model.prompts) == 2
+    assert len(rounds) == 2
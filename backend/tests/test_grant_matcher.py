@@ -0,0 +1,88 @@
+"""
+Tests for founder profile extraction and grant eligibility matching
+"""
+
+import os
+import sys
+from datetime import date
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from grant_matcher import FounderProfile, GrantMatrix, extract_profile
+
+
+TODAY = date(2025, 3, 1)
+
+
+def notice(notice_id: str, stage=None, industry=None, region=None, eligibility=None, deadline="2025-04-30", amount=0):
+    """Catalog notice shaped like GrantIndex.all_notices() rows"""
+    return {
+        "id": notice_id,
+        "title": notice_id,
+        "stage": stage or [],
+        "industry": industry or [],
+        "region": region or [],
+        "eligibility": eligibility or {},
+        "deadline": deadline,
+        "amount_krw": amount,
+    }
+
+
+@pytest.mark.parametrize("text", [
+    "요즘 경기가 안 좋아서 매출이 줄었어요. 받을 수 있는 지원사업 추천해줘",
+    "경기도 안 좋고 투자도 막혔어요",
+    "경기 침체로 폐업을 고민 중입니다",
+    "부산물 재활용 아이템입니다",
+    "세종대왕 이름을 딴 한글 교육 앱",
+])
+def test_region_needs_context(text):
+    assert extract_profile(text).region is None
+
+
+@pytest.mark.parametrize("text, region", [
+    ("경기도 성남에서 창업했어요", "경기"),
+    ("경기 지역 소재 법인입니다", "경기"),
+    ("서울에서 카페를 준비하고 있어요", "서울"),
+    ("서울 강남 오피스", "서울"),
+    ("충청북도 청주 소재 제조 스타트업", "충북"),
+    ("세종시에서 창업", "세종"),
+])
+def test_region_with_context(text, region):
+    assert extract_profile(text).region == region
+
+
+def test_generic_words_are_not_industries():
+    assert "environment" not in extract_profile("창업 환경이 너무 어려워요").industries
+    assert "local" not in extract_profile("지역 제한 없는 지원사업 있나요").industries
+    assert extract_profile("친환경 포장재 사업").industries == ["environment"]
+    assert "local" in extract_profile("지역 기반 관광 창업").industries
+
+
+def test_founder_age_needs_context():
+    assert extract_profile("직원 12살 아들이 있는 대표입니다").founder_age is None
+    assert extract_profile("저는 34살 개발자입니다").founder_age == 34
+    assert extract_profile("대표자 만 29세").founder_age == 29
+
+
+def test_match_applies_hard_filters_and_ranks_specific_programs():
+    matrix = GrantMatrix([
+        notice("nationwide"),
+        notice("seoul-only", region=["서울"]),
+        notice("gyeonggi-ai", industry=["ai"], region=["경기"], amount=100_000_000),
+        notice("youth", eligibility={"founder_age_max": 39}),
+        notice("closed", deadline="2025-01-31"),
+    ])
+    profile = FounderProfile(stage="pre", industries=["ai"], region="경기", founder_age=45)
+
+    ids = [result["notice"]["id"] for result in matrix.match(profile, today=TODAY)]
+    assert ids[0] == "gyeonggi-ai"
+    assert set(ids) == {"gyeonggi-ai", "nationwide"}
+
+
+def test_unknown_region_keeps_regional_programs():
+    matrix = GrantMatrix([notice("seoul-only", region=["서울"]), notice("busan-only", region=["부산"])])
+    results = matrix.match(extract_profile("요즘 경기가 안 좋아서 지원사업 추천해줘"), today=TODAY)
+    assert {result["notice"]["id"] for result in results} == {"seoul-only", "busan-only"}
+    assert all("확인 필요: 소재지" in result["reasons"] for result in results)
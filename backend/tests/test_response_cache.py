@@ -0,0 +1,104 @@
+"""
+Tests for the exact-match LLM response cache (serialization round-trip, memory/disk tiers)
+"""
+
+import asyncio
+import os
+import sys
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+from pydantic import BaseModel
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import response_cache as response_cache_module
+from response_cache import CachedLLM, ResponseCache, _deserialize, _serialize
+
+
+class Canvas(BaseModel):
+    """Small structured-output schema"""
+
+    problem: str
+    solution: str
+
+
+class CountingLLM:
+    """Runnable stand-in that counts upstream calls"""
+
+    def __init__(self, result):
+        self.result = result
+        self.calls = 0
+
+    async def ainvoke(self, messages, *args, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        return self.result
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache(monkeypatch, tmp_path):
+    cache = ResponseCache(path=str(tmp_path / "response_cache.sqlite"))
+    monkeypatch.setattr(response_cache_module, "response_cache", cache)
+    return cache
+
+
+def test_message_round_trip_keeps_content():
+    restored = _deserialize(_serialize(AIMessage(content="hello")), None)
+    assert isinstance(restored, AIMessage)
+    assert restored.content == "hello"
+
+
+def test_structured_round_trip_returns_schema_instance():
+    canvas = Canvas(problem="늦은 배달", solution="동네 공유 주방")
+    restored = _deserialize(_serialize(canvas), Canvas)
+    assert restored == canvas
+
+
+def test_cached_llm_answers_repeat_prompt_from_cache(fresh_cache):
+    llm = CountingLLM(AIMessage(content="린 캔버스 초안"))
+    cached = CachedLLM(llm, agent="framework_designer", model="test-model", temperature=0.0)
+    messages = [HumanMessage(content="카페 창업 아이디어")]
+
+    async def run():
+        first = await cached.ainvoke(messages)
+        second = await cached.ainvoke(messages)
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert llm.calls == 1
+    assert second.content == first.content == "린 캔버스 초안"
+
+
+def test_disk_tier_survives_a_new_memory_tier(fresh_cache, monkeypatch):
+    llm = CountingLLM(Canvas(problem="p", solution="s"))
+    messages = [HumanMessage(content="BMC 만들어줘")]
+    cached = CachedLLM(llm, agent="framework_designer", model="test-model", temperature=0.0, schema=Canvas)
+    asyncio.run(cached.ainvoke(messages))
+
+    # A restarted worker has an empty memory tier but the same SQLite file
+    restarted = ResponseCache(path=fresh_cache.path)
+    monkeypatch.setattr(response_cache_module, "response_cache", restarted)
+    result = asyncio.run(cached.ainvoke(messages))
+
+    assert llm.calls == 1
+    assert restarted.disk_hits == 1
+    assert result == Canvas(problem="p", solution="s")
+
+
+def test_bypass_does_not_join_an_in_flight_call(fresh_cache):
+    llm = CountingLLM(AIMessage(content="초안"))
+    cached = CachedLLM(llm, agent="framework_designer", model="test-model", temperature=0.0)
+    messages = [HumanMessage(content="린 캔버스 다시 만들어줘")]
+
+    async def bypassed():
+        response_cache_module.cache_bypass.set(True)
+        return await cached.ainvoke(messages)
+
+    async def run():
+        # The bypass runs in its own task so the context variable stays local to it
+        await asyncio.gather(cached.ainvoke(messages), asyncio.create_task(bypassed()))
+
+    asyncio.run(run())
+    assert llm.calls == 2
+    assert fresh_cache.bypasses == 1
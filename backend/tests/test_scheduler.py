@@ -0,0 +1,119 @@
+"""
+Tests for the quota-aware LLM scheduler (priority order, cancellation, shed/degrade)
+"""
+
+import asyncio
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import scheduler
+from scheduler import (
+    LLMQuotaError,
+    ModelScheduler,
+    ScheduledLLM,
+    PRIORITY_BACKGROUND,
+    PRIORITY_INTERACTIVE,
+    PRIORITY_ROUTING,
+)
+
+
+class FakeLLM:
+    """Runnable stand-in that records which model served each call"""
+
+    def __init__(self, model: str, served: list):
+        self.model = model
+        self.served = served
+
+    async def ainvoke(self, messages, *args, **kwargs):
+        self.served.append(self.model)
+        return f"answer from {self.model}"
+
+
+def drained_scheduler(model: str = "test-model", rpm: float = 600) -> ModelScheduler:
+    """Scheduler with an empty request bucket (refills one request per 60/rpm seconds)"""
+    model_scheduler = ModelScheduler(model, rpm=rpm, tpm=1_000_000)
+    model_scheduler.requests.level = 0.0
+    return model_scheduler
+
+
+@pytest.fixture(autouse=True)
+def isolated_schedulers(monkeypatch):
+    monkeypatch.setattr(scheduler, "_schedulers", {})
+    monkeypatch.setattr(scheduler, "LLM_SCHEDULER_ENABLED", True)
+
+
+def test_waiting_calls_are_served_by_priority():
+    async def run():
+        model_scheduler = drained_scheduler()
+        granted = []
+
+        async def call(name, priority):
+            await model_scheduler.acquire(priority, 10)
+            granted.append(name)
+
+        tasks = []
+        # Lowest priority arrives first, routing last
+        for name, priority in [("background", PRIORITY_BACKGROUND), ("interactive", PRIORITY_INTERACTIVE), ("routing", PRIORITY_ROUTING)]:
+            tasks.append(asyncio.create_task(call(name, priority)))
+            await asyncio.sleep(0.01)
+        await asyncio.wait_for(asyncio.gather(*tasks), timeout=5)
+        return granted, model_scheduler
+
+    granted, model_scheduler = asyncio.run(run())
+    assert granted == ["routing", "interactive", "background"]
+    assert model_scheduler.stats["granted"] == 3
+    assert model_scheduler._queue == []
+
+
+def test_cancelled_call_leaves_the_queue():
+    async def run():
+        model_scheduler = drained_scheduler()
+        first = asyncio.create_task(model_scheduler.acquire(PRIORITY_INTERACTIVE, 10))
+        await asyncio.sleep(0.01)
+        second = asyncio.create_task(model_scheduler.acquire(PRIORITY_BACKGROUND, 10))
+        await asyncio.sleep(0.01)
+        assert len(model_scheduler._queue) == 2
+
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        # The next call moves up and is granted with the first refill
+        await asyncio.wait_for(second, timeout=5)
+        return model_scheduler
+
+    model_scheduler = asyncio.run(run())
+    assert model_scheduler._queue == []
+    assert model_scheduler.stats["granted"] == 1
+
+
+def test_long_queue_degrades_to_lighter_model(monkeypatch):
+    monkeypatch.setattr(scheduler, "LLM_DEGRADE_MODEL", "light-model")
+    monkeypatch.setitem(scheduler.MAX_QUEUE_WAIT, PRIORITY_INTERACTIVE, 1.0)
+    scheduler._schedulers["main-model"] = drained_scheduler("main-model", rpm=6)
+    served = []
+    llm = ScheduledLLM(FakeLLM("main-model", served), "main-model", PRIORITY_INTERACTIVE, degrade=lambda name: FakeLLM(name, served))
+
+    answer = asyncio.run(llm.ainvoke("안녕하세요"))
+
+    assert answer == "answer from light-model"
+    assert served == ["light-model"]
+    assert scheduler._schedulers["main-model"].stats["degraded"] == 1
+
+
+def test_call_is_shed_when_no_model_can_serve_in_time(monkeypatch):
+    monkeypatch.setattr(scheduler, "LLM_DEGRADE_MODEL", "light-model")
+    monkeypatch.setitem(scheduler.MAX_QUEUE_WAIT, PRIORITY_ROUTING, 1.0)
+    scheduler._schedulers["main-model"] = drained_scheduler("main-model", rpm=6)
+    scheduler._schedulers["light-model"] = drained_scheduler("light-model", rpm=6)
+    served = []
+    llm = ScheduledLLM(FakeLLM("main-model", served), "main-model", PRIORITY_ROUTING, degrade=lambda name: FakeLLM(name, served))
+
+    with pytest.raises(LLMQuotaError, match="quota"):
+        asyncio.run(llm.ainvoke("라우팅"))
+
+    assert served == []
+    assert scheduler._schedulers["main-model"].stats["shed"] == 1
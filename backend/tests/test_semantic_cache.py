@@ -0,0 +1,118 @@
+"""
+Tests for the semantic response cache (lookup/store, guards, eviction, LLM wrapper)
+"""
+
+import asyncio
+import os
+import sys
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import semantic_cache as semantic_cache_module
+from response_cache import cache_bypass
+from semantic_cache import SemanticCache, SemanticCachedLLM, _guard_id, embed, question_guard
+
+
+DIM = 1024
+
+
+def store(cache: SemanticCache, question: str, answer: str, scope: str = "cofounder"):
+    cache.store(scope, embed(question, DIM), question, answer, _guard_id(question))
+
+
+def lookup(cache: SemanticCache, question: str, threshold: float = 0.85, scope: str = "cofounder"):
+    return cache.lookup(scope, embed(question, DIM), threshold, _guard_id(question))
+
+
+class CountingLLM:
+    """Runnable stand-in that counts upstream calls"""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def ainvoke(self, messages, *args, **kwargs):
+        self.calls += 1
+        return AIMessage(content=f"answer {self.calls}")
+
+
+def test_identical_question_hits_within_its_scope():
+    cache = SemanticCache(capacity=8, dim=DIM)
+    store(cache, "초기 스타트업 팀 빌딩은 어떻게 하나요?", "공동창업자부터 찾으세요")
+
+    hit = lookup(cache, "초기 스타트업 팀 빌딩은 어떻게 하나요?")
+    assert hit["answer"] == "공동창업자부터 찾으세요"
+    assert hit["similarity"] == pytest.approx(1.0, abs=1e-4)
+    assert lookup(cache, "초기 스타트업 팀 빌딩은 어떻게 하나요?", scope="vc_simulator") is None
+
+
+def test_numbers_and_negation_must_match():
+    cache = SemanticCache(capacity=8, dim=DIM)
+    store(cache, "월 매출 100만원이면 투자 받을 수 있나요?", "아직 이릅니다")
+
+    # Even with no similarity requirement, a different guard never shares the answer
+    assert lookup(cache, "월 매출 1,000만원이면 투자 받을 수 있나요?", threshold=0.0) is None
+    assert lookup(cache, "월 매출 100만원이면 투자 받을 수 없나요?", threshold=0.0) is None
+    assert question_guard("매출 1,000만원") == (("1000",), ())
+    assert question_guard("안녕하세요 안전한 결제") == ((), ())
+
+
+def test_least_recently_used_entry_is_evicted_when_full():
+    cache = SemanticCache(capacity=2, dim=DIM)
+    store(cache, "첫 번째 질문", "a")
+    store(cache, "두 번째 질문", "b")
+    assert lookup(cache, "첫 번째 질문") is not None  # refresh the first entry
+    store(cache, "세 번째 질문", "c")
+
+    assert cache.evictions == 1
+    assert lookup(cache, "두 번째 질문") is None
+    assert lookup(cache, "첫 번째 질문")["answer"] == "a"
+    assert lookup(cache, "세 번째 질문")["answer"] == "c"
+
+
+def test_expired_entries_are_not_served():
+    cache = SemanticCache(capacity=2, ttl=-1, dim=DIM)
+    store(cache, "만료된 질문", "old")
+    assert lookup(cache, "만료된 질문") is None
+
+
+@pytest.fixture
+def shared_cache(monkeypatch):
+    cache = SemanticCache(capacity=8)
+    monkeypatch.setattr(semantic_cache_module, "semantic_cache", cache)
+    monkeypatch.setattr(semantic_cache_module, "SEMANTIC_CACHE_AUDIT_RATE", 0.0)
+    return cache
+
+
+def test_cached_llm_serves_repeat_first_turn_questions(shared_cache):
+    llm = CountingLLM()
+    cached = SemanticCachedLLM(llm, agent="cofounder", model="test-model", temperature=0.7)
+    prompt = [SystemMessage(content="You are a cofounder."), HumanMessage(content="MVP 범위는 어떻게 정하나요?")]
+
+    async def run():
+        return await cached.ainvoke(prompt), await cached.ainvoke(prompt)
+
+    first, second = asyncio.run(run())
+    assert llm.calls == 1
+    assert second.content == first.content == "answer 1"
+
+
+def test_cached_llm_skips_follow_ups_and_bypass(shared_cache):
+    llm = CountingLLM()
+    cached = SemanticCachedLLM(llm, agent="cofounder", model="test-model", temperature=0.7)
+    question = HumanMessage(content="MVP 범위는 어떻게 정하나요?")
+    follow_up = [question, AIMessage(content="핵심 기능 하나만"), HumanMessage(content="MVP 범위는 어떻게 정하나요?")]
+
+    async def bypassed():
+        cache_bypass.set(True)
+        return await cached.ainvoke([question])
+
+    async def run():
+        await cached.ainvoke([question])
+        await cached.ainvoke(follow_up)
+        await asyncio.create_task(bypassed())
+
+    asyncio.run(run())
+    assert llm.calls == 3
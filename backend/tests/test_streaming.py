@@ -0,0 +1,92 @@
+"""
+Tests for astream_events -> frame translation (token and tool_call frames)
+"""
+
+import asyncio
+import os
+import sys
+
+import pytest
+from langchain_core.callbacks import adispatch_custom_event
+from langchain_core.messages import AIMessage, AIMessageChunk, HumanMessage
+from langchain_core.runnables import RunnableLambda
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from streaming import translate_event
+
+
+async def collect_frames(runnable, payload, agent: str = "grant_hunter"):
+    """Run a runnable through astream_events (v2) and translate every event"""
+    frames = []
+    async for event in runnable.astream_events(payload, version="v2"):
+        frame = translate_event(event, "thread-1", agent)
+        if frame:
+            frames.append(frame)
+    return frames
+
+
+def test_token_frame_from_model_stream():
+    event = {"event": "on_chat_model_stream", "data": {"chunk": AIMessageChunk(content="안녕")}}
+    frame = translate_event(event, "thread-1", "cofounder")
+    assert frame == {"type": "token", "agent": "cofounder", "thread_id": "thread-1", "delta": "안녕"}
+
+
+def test_unrelated_events_are_dropped():
+    assert translate_event({"event": "on_chain_start", "data": {}}, "thread-1", "cofounder") is None
+    assert translate_event({"event": "on_custom_event", "name": "other", "data": {}}, "thread-1", "cofounder") is None
+
+
+def test_tool_call_frame_from_custom_event():
+    async def node(_):
+        await adispatch_custom_event("tool_call", {"name": "tavily_search", "args": {"query": "예비창업패키지"}})
+        return "done"
+
+    frames = asyncio.run(collect_frames(RunnableLambda(node), "input"))
+    assert frames == [{
+        "type": "tool_call",
+        "agent": "grant_hunter",
+        "thread_id": "thread-1",
+        "name": "tavily_search",
+        "args": {"query": "예비창업패키지"},
+    }]
+
+
+class ToolCallingModel:
+    """Model stand-in that asks for one search, then answers"""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def ainvoke(self, messages, *args, **kwargs):
+        self.calls += 1
+        if self.calls == 1:
+            return AIMessage(content="", tool_calls=[{"name": "search", "args": {"query": "청년창업 지원금"}, "id": "call-1"}])
+        return AIMessage(content="지원사업 3건을 찾았습니다.")
+
+
+def test_executor_search_emits_tool_call_frame(monkeypatch):
+    # executor pulls in the Gemini and Tavily clients (llm.py, tools.py)
+    executor = pytest.importorskip("executor", reason="LLM/search client packages not installed")
+
+    model = ToolCallingModel()
+    monkeypatch.setattr(executor, "get_agent_llm", lambda **kwargs: model)
+    monkeypatch.setattr(executor, "get_agent_llm_with_tools", lambda tools, **kwargs: model)
+    searches = []
+
+    async def search(tool_args):
+        # Plain coroutine handler, like the pooled search client: no LangChain callbacks fire
+        searches.append(tool_args)
+        return [{"title": "청년창업사관학교", "url": "https://example.com", "content": "모집 공고"}]
+
+    agent_executor = executor.AgentExecutor("grant_hunter", tools=[], handlers={"search": search})
+
+    async def node(messages):
+        content, _ = await agent_executor.run(messages)
+        return content
+
+    frames = asyncio.run(collect_frames(RunnableLambda(node), [HumanMessage(content="지원사업 찾아줘")]))
+    assert searches == [{"query": "청년창업 지원금"}]
+    assert [frame["type"] for frame in frames] == ["tool_call"]
+    assert frames[0]["name"] == "search"
+    assert frames[0]["args"] == {"query": "청년창업 지원금"}
@@ -2,7 +2,10 @@
 Tools for FounderOS Agents
 """
 
+import asyncio
 import os
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
+import httpx
 from dotenv import load_dotenv
 try:
     from langchain_tavily import TavilySearchResults
@@ -48,3 +51,112 @@ def get_search_tool_instance():
 # For backward compatibility
 search_tool = get_search_tool_instance()
 
+
+# Tavily REST endpoint used by the pooled async client
+TAVILY_SEARCH_URL = os.getenv("TAVILY_SEARCH_URL", "https://api.tavily.com/search")
+
+# Per-call timeout for tool executions in seconds
+TOOL_CALL_TIMEOUT = float(os.getenv("TOOL_CALL_TIMEOUT", "15"))
+
+
+class AsyncSearchClient:
+    """
+    Async Tavily client over a shared connection pool
+
+    The LangChain tool opens a new HTTP session per call; this client reuses
+    one httpx.AsyncClient so concurrent searches share keep-alive connections.
+    `ainvoke(tool_args)` mirrors the tool interface, so it can be used anywhere
+    the tool's results were used.
+
+    Args:
+        api_key: Tavily API key
+        max_results: Results per query
+        max_connections: Connection pool size
+    """
+
+    def __init__(self, api_key: str, max_results: int = 3, max_connections: int = 20):
+        self.api_key = api_key
+        self.max_results = max_results
+        self.max_connections = max_connections
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=httpx.Timeout(TOOL_CALL_TIMEOUT, connect=5.0),
+                limits=httpx.Limits(max_connections=self.max_connections, max_keepalive_connections=self.max_connections)
+            )
+        return self._client
+
+    async def ainvoke(self, tool_args: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Run a search
+
+        Args:
+            tool_args: Tool call arguments ({"query": ..., optional Tavily options})
+
+        Returns:
+            List of {"title", "url", "content"} results
+        """
+        payload = {"max_results": self.max_results, **tool_args}
+        response = await self._get_client().post(
+            TAVILY_SEARCH_URL,
+            json=payload,
+            headers={"Authorization": f"Bearer {self.api_key}"}
+        )
+        response.raise_for_status()
+        return [
+            {"title": item.get("title", ""), "url": item.get("url", ""), "content": item.get("content", "")}
+            for item in response.json().get("results", [])
+        ]
+
+    async def aclose(self):
+        """Close the connection pool"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+_search_client = None
+
+def get_search_client() -> Optional[AsyncSearchClient]:
+    """Get or create the pooled async search client (None if no API key)"""
+    global _search_client
+    if _search_client is None:
+        api_key = os.getenv("TAVILY_API_KEY")
+        if not api_key:
+            return None
+        _search_client = AsyncSearchClient(api_key=api_key, max_results=3)
+    return _search_client
+
+
+async def close_search_client():
+    """Close the pooled search client (app shutdown)"""
+    if _search_client is not None:
+        await _search_client.aclose()
+
+
+async def gather_tool_calls(
+    calls: Sequence[Callable[[], Awaitable[Any]]],
+    timeout: float = TOOL_CALL_TIMEOUT
+) -> List[Any]:
+    """
+    Run tool calls concurrently, each with its own timeout
+
+    Args:
+        calls: Zero-argument coroutine factories, one per tool call
+        timeout: Per-call timeout in seconds
+
+    Returns:
+        Results in the original order; a failed or timed-out call yields an error string
+    """
+    async def run(call):
+        try:
+            return await asyncio.wait_for(call(), timeout=timeout)
+        except asyncio.TimeoutError:
+            return f"Error: tool call timed out after {timeout:g}s"
+        except Exception as e:
+            return f"Error: {e}"
+
+    return await asyncio.gather(*(run(call) for call in calls))
+
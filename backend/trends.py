@@ -0,0 +1,291 @@
+"""
+Trend detection over cached market data
+
+Every cached search result and watchlist snapshot is folded into daily
+document-frequency counts per topic (search domain or watched competitor):
+- Ingestion is incremental: documents are deduplicated by hash, so each
+  new document costs one UPSERT per distinct term and nothing is recounted
+- Rising topics come from a burst score comparing the recent window with
+  the baseline window (Poisson z-score with a small prior); until the
+  baseline window holds TREND_MIN_BASELINE_DOCS documents (cold start, new
+  topic) nothing is reported, since every term would look like a burst
+
+MarketSensor gets the resulting trend table instead of inferring trends
+from a handful of raw search hits.
+"""
+
+import hashlib
+import math
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+from grant_index import query_terms
+
+
+_BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_TRENDS_PATH = os.path.join(_BACKEND_DIR, "data", "trends.sqlite")
+
+TRENDS_ENABLED = os.getenv("TRENDS_ENABLED", "true").lower() == "true"
+TRENDS_PATH = os.getenv("TRENDS_PATH", DEFAULT_TRENDS_PATH)
+# Rolling windows in days: recent activity vs. the baseline before it
+TREND_RECENT_DAYS = int(os.getenv("TREND_RECENT_DAYS", "3"))
+TREND_BASELINE_DAYS = int(os.getenv("TREND_BASELINE_DAYS", "28"))
+# A term needs this many recent documents to count as rising
+TREND_MIN_RECENT_DOCS = int(os.getenv("TREND_MIN_RECENT_DOCS", "3"))
+# The pooled topics need this many baseline documents before any term is scored
+TREND_MIN_BASELINE_DOCS = int(os.getenv("TREND_MIN_BASELINE_DOCS", "50"))
+
+BUCKET_SECONDS = 86400
+
+# Generic words that say nothing about a market
+STOPWORDS = {
+    "그리고", "하지만", "있는", "있다", "있습니다", "합니다", "했다", "한다", "위해", "대한", "통해", "이번", "지난", "오늘",
+    "최근", "관련", "기자", "뉴스", "사용자", "리뷰", "후기", "가격", "요금제", "최신", "the", "and", "for", "with",
+    "that", "this", "from", "are", "was", "has", "have", "will", "its", "you", "your", "our", "but", "not", "all",
+    "com", "www", "http", "https", "html",
+}
+_ENTITY_RE = re.compile(r"\b[A-Z][A-Za-z0-9]*[A-Za-z0-9]\b")
+
+
+def _bucket(timestamp: float) -> int:
+    return int(timestamp // BUCKET_SECONDS)
+
+
+def document_terms(text: str, max_terms: int = 200) -> Dict[str, str]:
+    """
+    Distinct terms and entities of a document
+
+    Returns:
+        {term: "term" | "entity"}; entities are capitalized Latin names
+        (product/company names), terms are particle-stripped words
+    """
+    terms: Dict[str, str] = {}
+    for match in _ENTITY_RE.findall(text or ""):
+        if match.lower() not in STOPWORDS and len(match) >= 2:
+            terms[match.lower()] = "entity"
+    for term in query_terms(text, min_length=2):
+        if term not in STOPWORDS and not term.isdigit() and term not in terms:
+            terms[term] = "term"
+        if len(terms) >= max_terms:
+            break
+    return terms
+
+
+class TrendTracker:
+    """
+    Incremental term time series in SQLite
+
+    Args:
+        path: SQLite file path
+    """
+
+    def __init__(self, path: str = TRENDS_PATH):
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._last_prune_bucket: Optional[int] = None
+        self.stats_counters = {"documents": 0, "duplicates": 0}
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS term_counts (
+                    topic TEXT NOT NULL,
+                    bucket INTEGER NOT NULL,
+                    term TEXT NOT NULL,
+                    kind TEXT NOT NULL,
+                    docs INTEGER NOT NULL,
+                    PRIMARY KEY (topic, bucket, term)
+                );
+                CREATE TABLE IF NOT EXISTS topic_docs (
+                    topic TEXT NOT NULL,
+                    bucket INTEGER NOT NULL,
+                    docs INTEGER NOT NULL,
+                    PRIMARY KEY (topic, bucket)
+                );
+                CREATE TABLE IF NOT EXISTS seen_docs (
+                    doc_hash TEXT PRIMARY KEY,
+                    bucket INTEGER NOT NULL
+                );
+                """
+            )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def ingest(self, topic: str, documents: Iterable[Dict[str, Any]], timestamp: Optional[float] = None) -> int:
+        """
+        Fold new documents into the time series
+
+        Args:
+            topic: Search domain or competitor key
+            documents: Search results ({"title", "url", "content"})
+            timestamp: Observation time (defaults to now)
+
+        Returns:
+            Number of documents that were new
+        """
+        bucket = _bucket(timestamp or time.time())
+        added = 0
+        with self._lock:
+            conn = self._connect()
+            for document in documents:
+                if not isinstance(document, dict):
+                    continue
+                text = f"{document.get('title', '')} {document.get('content', '')}"
+                doc_hash = hashlib.sha1(f"{topic}|{document.get('url', '')}|{text}".encode("utf-8")).hexdigest()
+                cursor = conn.execute("INSERT OR IGNORE INTO seen_docs (doc_hash, bucket) VALUES (?, ?)", (doc_hash, bucket))
+                if cursor.rowcount == 0:
+                    self.stats_counters["duplicates"] += 1
+                    continue
+                conn.executemany(
+                    """
+                    INSERT INTO term_counts (topic, bucket, term, kind, docs) VALUES (?, ?, ?, ?, 1)
+                    ON CONFLICT(topic, bucket, term) DO UPDATE SET docs = docs + 1
+                    """,
+                    [(topic, bucket, term, kind) for term, kind in document_terms(text).items()]
+                )
+                conn.execute(
+                    """
+                    INSERT INTO topic_docs (topic, bucket, docs) VALUES (?, ?, 1)
+                    ON CONFLICT(topic, bucket) DO UPDATE SET docs = docs + 1
+                    """,
+                    (topic, bucket)
+                )
+                added += 1
+            if self._last_prune_bucket != bucket:
+                self._prune(conn, bucket)
+                self._last_prune_bucket = bucket
+            conn.commit()
+        self.stats_counters["documents"] += added
+        return added
+
+    def _prune(self, conn: sqlite3.Connection, bucket: int):
+        # Buckets older than both windows never contribute again
+        cutoff = bucket - TREND_RECENT_DAYS - TREND_BASELINE_DAYS
+        conn.execute("DELETE FROM term_counts WHERE bucket < ?", (cutoff,))
+        conn.execute("DELETE FROM topic_docs WHERE bucket < ?", (cutoff,))
+        conn.execute("DELETE FROM seen_docs WHERE bucket < ?", (cutoff,))
+
+    def rising_terms(
+        self,
+        topics: List[str],
+        limit: int = 10,
+        now: Optional[float] = None,
+        min_recent_docs: int = TREND_MIN_RECENT_DOCS
+    ) -> List[Dict[str, Any]]:
+        """
+        Terms whose document share jumped in the recent window
+
+        Args:
+            topics: Topics to pool (a founder's competitors plus "market")
+            limit: Maximum rows
+            now: Reference time (defaults to now)
+            min_recent_docs: Minimum recent documents for a term
+
+        Returns:
+            Rows with term, kind, recent_docs, baseline_per_day, growth, score; best first
+        """
+        if not topics:
+            return []
+        current = _bucket(now or time.time())
+        recent_start = current - TREND_RECENT_DAYS + 1
+        baseline_start = recent_start - TREND_BASELINE_DAYS
+        placeholders = ",".join("?" * len(topics))
+        with self._lock:
+            conn = self._connect()
+            rows = conn.execute(
+                f"""
+                SELECT term, MAX(kind) AS kind,
+                       SUM(CASE WHEN bucket >= ? THEN docs ELSE 0 END) AS recent,
+                       SUM(CASE WHEN bucket < ? THEN docs ELSE 0 END) AS baseline
+                FROM term_counts
+                WHERE topic IN ({placeholders}) AND bucket >= ? AND bucket <= ?
+                GROUP BY term
+                HAVING recent >= ?
+                """,
+                (recent_start, recent_start, *topics, baseline_start, current, min_recent_docs)
+            ).fetchall()
+            totals = conn.execute(
+                f"""
+                SELECT SUM(CASE WHEN bucket >= ? THEN docs ELSE 0 END),
+                       SUM(CASE WHEN bucket < ? THEN docs ELSE 0 END)
+                FROM topic_docs WHERE topic IN ({placeholders}) AND bucket >= ? AND bucket <= ?
+                """,
+                (recent_start, recent_start, *topics, baseline_start, current)
+            ).fetchone()
+
+        recent_total, baseline_total = (totals[0] or 0), (totals[1] or 0)
+        # Without a baseline every recent term looks like a burst
+        if recent_total == 0 or baseline_total < TREND_MIN_BASELINE_DOCS:
+            return []
+        results = []
+        for term, kind, recent, baseline in rows:
+            # Expected recent docs if the term kept its baseline share (+1 prior for unseen terms)
+            baseline_share = (baseline + 1) / (baseline_total + TREND_BASELINE_DAYS)
+            expected = baseline_share * recent_total
+            score = (recent - expected) / math.sqrt(expected)
+            if score <= 0:
+                continue
+            results.append({
+                "term": term,
+                "kind": kind,
+                "recent_docs": int(recent),
+                "baseline_per_day": round(baseline / TREND_BASELINE_DAYS, 2),
+                "growth": round(recent / expected, 2),
+                "score": round(score, 2),
+            })
+        results.sort(key=lambda row: row["score"], reverse=True)
+        return results[:limit]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            conn = self._connect()
+            terms = conn.execute("SELECT COUNT(DISTINCT term) FROM term_counts").fetchone()[0]
+            topics = conn.execute("SELECT COUNT(DISTINCT topic) FROM topic_docs").fetchone()[0]
+        return {"enabled": TRENDS_ENABLED, "terms": terms, "topics": topics, **self.stats_counters}
+
+
+# Shared tracker instance
+trend_tracker = TrendTracker()
+
+
+def record_documents(topic: str, documents: Any):
+    """Feed search results into the trend tracker (call from a worker thread)"""
+    if not TRENDS_ENABLED or not isinstance(documents, list):
+        return
+    try:
+        trend_tracker.ingest(topic, documents)
+    except Exception as e:
+        print(f"Trend ingest failed: {e}")
+
+
+def format_trend_table(rows: List[Dict[str, Any]]) -> str:
+    """Markdown trend table for the agent prompt"""
+    if not rows:
+        return ""
+    lines = ["| 키워드 | 유형 | 최근 문서 수 | 기준 일평균 | 증가 배수 |", "|---|---|---|---|---|"]
+    for row in rows:
+        kind = "기업/제품" if row["kind"] == "entity" else "키워드"
+        lines.append(f"| {row['term']} | {kind} | {row['recent_docs']} | {row['baseline_per_day']} | x{row['growth']} |")
+    return "\n".join(lines)
+
+
+def is_trend_question(message: Optional[str]) -> bool:
+    """Whether the user asks about trends"""
+    text = (message or "").lower()
+    return any(word in text for word in ("트렌드", "동향", "추세", "요즘", "뜨는", "떠오르", "급상승", "trend"))
+
+
+def get_trend_stats() -> Dict[str, Any]:
+    """Trend tracker statistics"""
+    return trend_tracker.stats()
@@ -0,0 +1,398 @@
+"""
+Competitor watchlists for MarketSensor
+
+Founders keep a watchlist of competitors. A background refresher keeps
+snapshots of each competitor's news, reviews and pricing in SQLite:
+- Competitors are refreshed on a jittered interval so refreshes spread out
+- A semaphore bounds how many competitors are searched at once
+- Snapshots are shared between founders watching the same competitor
+
+market_sensor_node reads the snapshots instead of searching live, which
+moves search spend off the request path.
+"""
+
+import asyncio
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+import unicodedata
+from typing import Any, Dict, List, Optional
+
+from tools import get_search_client, get_search_tool_instance, gather_tool_calls
+from trends import record_documents
+
+
+_BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_WATCHLIST_PATH = os.path.join(_BACKEND_DIR, "data", "watchlist.sqlite")
+
+WATCHLIST_ENABLED = os.getenv("WATCHLIST_ENABLED", "true").lower() == "true"
+WATCHLIST_PATH = os.getenv("WATCHLIST_PATH", DEFAULT_WATCHLIST_PATH)
+# Seconds between refreshes of one competitor (jittered by +/- WATCHLIST_JITTER)
+WATCHLIST_REFRESH_INTERVAL = float(os.getenv("WATCHLIST_REFRESH_INTERVAL", str(6 * 3600)))
+WATCHLIST_JITTER = float(os.getenv("WATCHLIST_JITTER", "0.2"))
+# Competitors refreshed concurrently
+WATCHLIST_CONCURRENCY = int(os.getenv("WATCHLIST_CONCURRENCY", "3"))
+# How often the scheduler looks for due competitors (seconds)
+WATCHLIST_TICK = float(os.getenv("WATCHLIST_TICK", "60"))
+# Snapshots older than this are not used to answer (seconds)
+WATCHLIST_MAX_AGE = float(os.getenv("WATCHLIST_MAX_AGE", str(24 * 3600)))
+MAX_COMPETITORS_PER_FOUNDER = int(os.getenv("WATCHLIST_MAX_COMPETITORS", "20"))
+
+# Snapshot kinds and the search query for each
+SNAPSHOT_QUERIES: Dict[str, str] = {
+    "news": "{competitor} 최신 뉴스",
+    "reviews": "{competitor} 사용자 리뷰 후기",
+    "pricing": "{competitor} 요금제 가격",
+}
+SNAPSHOT_LABELS = {"news": "뉴스", "reviews": "리뷰", "pricing": "가격"}
+# Results fetched per kind (reviews feed the local sentiment stage, so fetch more)
+SNAPSHOT_MAX_RESULTS = {"news": 5, "reviews": 10, "pricing": 3}
+
+# Snippet length kept per search result
+SNIPPET_CHARS = 500
+
+
+def competitor_key(name: str) -> str:
+    """Normalized competitor key ("Notion", " notion " -> "notion")"""
+    return " ".join(unicodedata.normalize("NFKC", name or "").lower().split())
+
+
+class WatchlistStore:
+    """
+    SQLite store for watchlists and competitor snapshots
+
+    Args:
+        path: SQLite file path
+    """
+
+    def __init__(self, path: str = WATCHLIST_PATH):
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS watchlist (
+                    founder_id TEXT NOT NULL,
+                    competitor_key TEXT NOT NULL,
+                    competitor TEXT NOT NULL,
+                    added_at REAL NOT NULL,
+                    PRIMARY KEY (founder_id, competitor_key)
+                );
+                CREATE INDEX IF NOT EXISTS idx_watchlist_competitor ON watchlist (competitor_key);
+                CREATE TABLE IF NOT EXISTS competitors (
+                    competitor_key TEXT PRIMARY KEY,
+                    competitor TEXT NOT NULL,
+                    next_refresh_at REAL NOT NULL,
+                    last_refreshed_at REAL,
+                    last_error TEXT
+                );
+                CREATE TABLE IF NOT EXISTS snapshots (
+                    competitor_key TEXT NOT NULL,
+                    kind TEXT NOT NULL,
+                    results TEXT NOT NULL,
+                    fetched_at REAL NOT NULL,
+                    PRIMARY KEY (competitor_key, kind)
+                );
+                """
+            )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    # ------------------------------------------------------------------ watchlists
+
+    def add(self, founder_id: str, competitor: str) -> bool:
+        """
+        Add a competitor to a founder's watchlist
+
+        Returns:
+            False if the watchlist is full
+        """
+        key = competitor_key(competitor)
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            count = conn.execute("SELECT COUNT(*) FROM watchlist WHERE founder_id = ?", (founder_id,)).fetchone()[0]
+            exists = conn.execute(
+                "SELECT 1 FROM watchlist WHERE founder_id = ? AND competitor_key = ?", (founder_id, key)
+            ).fetchone()
+            if not exists and count >= MAX_COMPETITORS_PER_FOUNDER:
+                return False
+            conn.execute(
+                "INSERT OR IGNORE INTO watchlist (founder_id, competitor_key, competitor, added_at) VALUES (?, ?, ?, ?)",
+                (founder_id, key, competitor.strip(), now)
+            )
+            # New competitors are due immediately
+            conn.execute(
+                "INSERT OR IGNORE INTO competitors (competitor_key, competitor, next_refresh_at) VALUES (?, ?, ?)",
+                (key, competitor.strip(), now)
+            )
+            conn.commit()
+        return True
+
+    def remove(self, founder_id: str, competitor: str) -> bool:
+        """Remove a competitor; snapshots go once nobody watches it"""
+        key = competitor_key(competitor)
+        with self._lock:
+            conn = self._connect()
+            cursor = conn.execute("DELETE FROM watchlist WHERE founder_id = ? AND competitor_key = ?", (founder_id, key))
+            if not conn.execute("SELECT 1 FROM watchlist WHERE competitor_key = ?", (key,)).fetchone():
+                conn.execute("DELETE FROM competitors WHERE competitor_key = ?", (key,))
+                conn.execute("DELETE FROM snapshots WHERE competitor_key = ?", (key,))
+            conn.commit()
+            return cursor.rowcount > 0
+
+    def list(self, founder_id: str) -> List[Dict[str, Any]]:
+        """A founder's competitors with their refresh status"""
+        with self._lock:
+            rows = self._connect().execute(
+                """
+                SELECT w.competitor, w.competitor_key, w.added_at, c.last_refreshed_at, c.next_refresh_at, c.last_error
+                FROM watchlist w LEFT JOIN competitors c ON c.competitor_key = w.competitor_key
+                WHERE w.founder_id = ? ORDER BY w.added_at
+                """,
+                (founder_id,)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    # ------------------------------------------------------------------ snapshots
+
+    def due_competitors(self, now: float, limit: int) -> List[Dict[str, Any]]:
+        """Competitors whose next refresh time has passed, most overdue first"""
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT competitor_key, competitor FROM competitors WHERE next_refresh_at <= ? ORDER BY next_refresh_at LIMIT ?",
+                (now, limit)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def save_snapshots(self, key: str, snapshots: Dict[str, List[Dict[str, Any]]], next_refresh_at: float, error: Optional[str] = None):
+        """Store fresh snapshots and schedule the next refresh"""
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            for kind, results in snapshots.items():
+                conn.execute(
+                    "INSERT OR REPLACE INTO snapshots (competitor_key, kind, results, fetched_at) VALUES (?, ?, ?, ?)",
+                    (key, kind, json.dumps(results, ensure_ascii=False), now)
+                )
+            conn.execute(
+                "UPDATE competitors SET next_refresh_at = ?, last_refreshed_at = CASE WHEN ? THEN ? ELSE last_refreshed_at END, last_error = ? WHERE competitor_key = ?",
+                (next_refresh_at, int(bool(snapshots)), now, error, key)
+            )
+            conn.commit()
+
+    def snapshots(self, key: str) -> Dict[str, Dict[str, Any]]:
+        """Snapshots of a competitor by kind: {"results", "fetched_at"}"""
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT kind, results, fetched_at FROM snapshots WHERE competitor_key = ?", (key,)
+            ).fetchall()
+        return {row["kind"]: {"results": json.loads(row["results"]), "fetched_at": row["fetched_at"]} for row in rows}
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            conn = self._connect()
+            return {
+                "founders": conn.execute("SELECT COUNT(DISTINCT founder_id) FROM watchlist").fetchone()[0],
+                "competitors": conn.execute("SELECT COUNT(*) FROM competitors").fetchone()[0],
+                "snapshots": conn.execute("SELECT COUNT(*) FROM snapshots").fetchone()[0],
+            }
+
+
+def _compact_results(results: Any) -> List[Dict[str, Any]]:
+    if not isinstance(results, list):
+        return []
+    return [
+        {"title": item.get("title", ""), "url": item.get("url", ""), "content": (item.get("content") or "")[:SNIPPET_CHARS]}
+        for item in results if isinstance(item, dict)
+    ]
+
+
+class WatchlistRefresher:
+    """
+    Background scheduler that keeps competitor snapshots warm
+
+    Args:
+        store: Watchlist store
+        interval: Seconds between refreshes of one competitor
+        concurrency: Competitors refreshed at once
+        tick: Seconds between scheduler passes
+    """
+
+    def __init__(
+        self,
+        store: WatchlistStore,
+        interval: float = WATCHLIST_REFRESH_INTERVAL,
+        concurrency: int = WATCHLIST_CONCURRENCY,
+        tick: float = WATCHLIST_TICK
+    ):
+        self.store = store
+        self.interval = interval
+        self.tick = tick
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._wakeup = asyncio.Event()
+        self._in_flight: Dict[str, asyncio.Task] = {}
+        self.stats = {"refreshes": 0, "failures": 0, "searches": 0, "last_pass_at": None}
+
+    def _next_refresh_at(self) -> float:
+        # Jitter spreads refreshes so competitors added together don't stay in lockstep
+        return time.time() + self.interval * random.uniform(1 - WATCHLIST_JITTER, 1 + WATCHLIST_JITTER)
+
+    def wake(self):
+        """Run a scheduler pass now (e.g. after a competitor was added)"""
+        self._wakeup.set()
+
+    async def refresh_competitor(self, key: str, competitor: str):
+        """Search news, reviews and pricing for one competitor and store the snapshots"""
+        search = get_search_client() or get_search_tool_instance()
+        if search is None:
+            return
+        async with self._semaphore:
+            kinds = list(SNAPSHOT_QUERIES)
+            results = await gather_tool_calls([
+                lambda kind=kind: search.ainvoke({
+                    "query": SNAPSHOT_QUERIES[kind].format(competitor=competitor),
+                    "max_results": SNAPSHOT_MAX_RESULTS[kind]
+                })
+                for kind in kinds
+            ])
+            self.stats["searches"] += len(kinds)
+            snapshots = {kind: _compact_results(result) for kind, result in zip(kinds, results) if isinstance(result, list)}
+            errors = [str(result) for result in results if not isinstance(result, list)]
+            await asyncio.to_thread(
+                self.store.save_snapshots, key, snapshots, self._next_refresh_at(), "; ".join(errors) or None
+            )
+            for documents in snapshots.values():
+                await asyncio.to_thread(record_documents, key, documents)
+            if errors:
+                self.stats["failures"] += 1
+                print(f"Watchlist refresh for {competitor} incomplete: {errors[0]}")
+            else:
+                self.stats["refreshes"] += 1
+
+    async def _run_refresh(self, key: str, competitor: str):
+        try:
+            await self.refresh_competitor(key, competitor)
+        except Exception as e:
+            self.stats["failures"] += 1
+            print(f"Watchlist refresh for {competitor} failed: {e}")
+            await asyncio.to_thread(self.store.save_snapshots, key, {}, self._next_refresh_at(), str(e))
+        finally:
+            self._in_flight.pop(key, None)
+
+    async def run_pass(self) -> int:
+        """Start refreshes for every due competitor; returns how many were started"""
+        due = await asyncio.to_thread(self.store.due_competitors, time.time(), 100)
+        started = 0
+        for competitor in due:
+            if competitor["competitor_key"] in self._in_flight:
+                continue
+            self._in_flight[competitor["competitor_key"]] = asyncio.create_task(
+                self._run_refresh(competitor["competitor_key"], competitor["competitor"])
+            )
+            started += 1
+        self.stats["last_pass_at"] = time.time()
+        return started
+
+    async def run(self):
+        """Scheduler loop for the lifetime of the app"""
+        # Start with a small random delay so several workers don't search in lockstep
+        await asyncio.sleep(random.uniform(0, min(self.tick, 10)))
+        while True:
+            try:
+                await self.run_pass()
+            except Exception as e:
+                print(f"Watchlist scheduler pass failed: {e}")
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.tick * random.uniform(0.9, 1.1))
+            except asyncio.TimeoutError:
+                pass
+
+
+# Shared instances
+watchlist_store = WatchlistStore()
+_refresher: Optional[WatchlistRefresher] = None
+
+
+def get_watchlist_refresher() -> WatchlistRefresher:
+    """Get or create the refresher (must be called from the event loop)"""
+    global _refresher
+    if _refresher is None:
+        _refresher = WatchlistRefresher(watchlist_store)
+    return _refresher
+
+
+def find_watched_competitors(founder_id: str, message: str) -> List[Dict[str, Any]]:
+    """
+    Watchlist entries relevant to a question
+
+    Competitors named in the message; every watched competitor when the
+    question is about competitors in general.
+    """
+    if not founder_id:
+        return []
+    watched = watchlist_store.list(founder_id)
+    text = competitor_key(message)
+    named = [entry for entry in watched if entry["competitor_key"] in text]
+    if named:
+        return named
+    if any(word in text for word in ("경쟁사", "경쟁 업체", "경쟁업체", "competitor", "watchlist", "워치리스트")):
+        return watched
+    return []
+
+
+def load_competitor_snapshots(entries: List[Dict[str, Any]], max_age: float = WATCHLIST_MAX_AGE) -> tuple:
+    """
+    Snapshots for watchlist entries
+
+    Returns:
+        ({competitor: {kind: snapshot}}, whether every entry has fresh snapshots of all kinds)
+    """
+    now = time.time()
+    snapshots = {}
+    fresh = bool(entries)
+    for entry in entries:
+        competitor_snapshots = watchlist_store.snapshots(entry["competitor_key"])
+        snapshots[entry["competitor"]] = competitor_snapshots
+        if set(competitor_snapshots) != set(SNAPSHOT_QUERIES) or any(
+            now - snapshot["fetched_at"] > max_age for snapshot in competitor_snapshots.values()
+        ):
+            fresh = False
+    return snapshots, fresh
+
+
+def format_snapshots(snapshots: Dict[str, Dict[str, Dict[str, Any]]], kinds: Optional[List[str]] = None) -> str:
+    """Compact text block of competitor snapshots for the agent prompt"""
+    lines = []
+    for competitor, by_kind in snapshots.items():
+        lines.append(f"## {competitor}")
+        for kind in kinds or SNAPSHOT_QUERIES:
+            snapshot = by_kind.get(kind)
+            if not snapshot:
+                continue
+            fetched = time.strftime("%Y-%m-%d %H:%M", time.localtime(snapshot["fetched_at"]))
+            lines.append(f"[{SNAPSHOT_LABELS[kind]} - {fetched} 수집]")
+            for item in snapshot["results"]:
+                lines.append(f"- {item['title']}: {item['content']} ({item['url']})")
+    return "\n".join(lines)
+
+
+def get_watchlist_stats() -> Dict[str, Any]:
+    """Watchlist and refresher statistics"""
+    return {
+        "enabled": WATCHLIST_ENABLED,
+        **watchlist_store.counts(),
+        "refresher": dict(_refresher.stats) if _refresher is not None else None,
+    }